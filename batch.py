@@ -0,0 +1,199 @@
+"""
+Version 1.02
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.02, 2026-10-17 cw: pandas erst beim Schreiben der Ergebnistabelle laden
+- 1.01, 2026-10-17 cw: Szenarien als Scenario-Objekte ohne Wechsel des Arbeitsverzeichnisses
+- 1.00, 2026-10-17 cw: Stapelverarbeitung mehrerer Parameterdateien im Prozesspool
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import json
+import logging
+import os
+import time
+import typing
+
+import optimization_infill
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+logging.basicConfig(
+        format="%(asctime)s.%(msecs)03d %(levelname)s {%(module)s} -> [%(funcName)s] %(message)s",
+        datefmt="%H:%M:%S",
+        level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spalten der Ergebnistabelle
+COLUMNS = ["scenario", "balises", "weighting", "infill_positions", "additional_runtime",
+           "wall_time", "error"]
+
+
+def load_scenarios(source: str) -> list[tuple[str, dict]]:
+    """
+    Lädt die Szenarien aus einem Ordner mit JSON-Dateien, einem Glob-Muster, einer einzelnen
+    JSON-Datei oder einer JSON-Lines-Datei (ein Szenario je Zeile).
+
+    Args:
+        source: Ordner, Glob-Muster oder Datei der Szenarien
+
+    Raises:
+        ValueError: keine Szenarien gefunden
+
+    Returns:
+        scenarios: Name und Parameter je Szenario
+    """
+
+    if os.path.isdir(source):
+        files = sorted(glob.glob(os.path.join(source, "*.json")))
+    else:
+        files = sorted(glob.glob(source))
+    scenarios = []
+    for file in files:
+        name = os.path.splitext(os.path.basename(file))[0]
+        with open(file) as infile:
+            if file.endswith(".jsonl"):
+                lines = [line for line in infile if line.strip()]
+                width = len(str(len(lines)))
+                for number, line in enumerate(lines, 1):
+                    data = json.loads(line)
+                    scenarios.append((data.pop("name", f"{name}_{number:0{width}d}"), data))
+            else:
+                scenarios.append((name, json.load(infile)))
+    if not scenarios:
+        raise ValueError(f"Keine Szenarien in '{source}' gefunden")
+    names = [name for name, _ in scenarios]
+    if len(set(names)) < len(names):
+        raise ValueError("Szenarionamen nicht eindeutig")
+
+    return scenarios
+
+
+def run_scenario(name: str, data: dict, directory: str, plot: bool) -> dict:
+    """
+    Führt ein Szenario in einem Prozess des Prozesspools aus. Die Parameter werden zusätzlich in
+    den Ordner des Szenarios geschrieben, Ausgaben landen in dessen Unterordner output.
+
+    Args:
+        name: Name des Szenarios
+        data: Parameter des Szenarios (Aufbau wie parameters.json)
+        directory: Ordner der Szenarioausgaben
+        plot: Plots erstellen (sonst werden die Plot-Parameter deaktiviert)
+
+    Raises:
+        none
+
+    Returns:
+        row: Zeile der Ergebnistabelle
+    """
+
+    tic = time.perf_counter()
+    row = dict.fromkeys(COLUMNS)
+    row["scenario"] = name
+    row["balises"] = data.get("track", {}).get("balises")
+    row["weighting"] = data.get("tech", {}).get("weighting")
+    if not plot and "tech" in data:
+        data["tech"]["plot_trajectories"] = False
+        data["tech"]["plot_3d"] = False
+    path = os.path.join(directory, name)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "parameters.json"), "w") as outfile:
+        json.dump(data, outfile, indent=4)
+    try:
+        result = optimization_infill.Scenario(data, path).run()
+        row["infill_positions"] = ";".join(str(position) for position
+                                           in result.infill_positions)
+        row["additional_runtime"] = round(result.min_loss_time, 2)
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    row["wall_time"] = round(time.perf_counter() - tic, 3)
+
+    return row
+
+
+def run_batch(source: str, output: str, workers: int = 1, plot: bool = False) -> "pd.DataFrame":
+    """
+    Führt alle Szenarien im Prozesspool aus und schreibt eine gemeinsame Ergebnistabelle als CSV
+    oder Parquet (nach Dateiendung).
+
+    Args:
+        source: Ordner, Glob-Muster oder Datei der Szenarien
+        output: Datei der Ergebnistabelle (.csv oder .parquet)
+        workers: Anzahl paralleler Prozesse
+        plot: Plots je Szenario erstellen
+
+    Raises:
+        ValueError: Anzahl Prozesse kleiner als 1
+        ValueError: Dateiendung der Ergebnistabelle nicht unterstützt
+
+    Returns:
+        table: Ergebnistabelle
+    """
+
+    if workers < 1:
+        raise ValueError("Anzahl Prozesse kleiner als 1")
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in [".csv", ".parquet"]:
+        raise ValueError(f"Dateiendung '{extension}' der Ergebnistabelle nicht unterstützt")
+    scenarios = load_scenarios(source)
+    output = os.path.abspath(output)
+    directory = os.path.join(os.path.dirname(output), "scenarios")
+    os.makedirs(directory, exist_ok=True)
+    logger.info(f"{len(scenarios)} Szenarien mit {workers} Prozessen")
+
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_scenario, name, data, directory, plot)
+                   for name, data in scenarios]
+        for future in futures:
+            rows.append(future.result())
+            if rows[-1]["error"]:
+                logger.error(f"Szenario {rows[-1]['scenario']}: {rows[-1]['error']}")
+            else:
+                logger.info(f"Szenario {rows[-1]['scenario']}: {rows[-1]['additional_runtime']} s "
+                            f"bei {rows[-1]['infill_positions']} m")
+
+    # pandas erst für die Ergebnistabelle laden, die Szenarien laufen ohne
+    import pandas as pd
+
+    table = pd.DataFrame(rows, columns=COLUMNS).astype({"balises": "Int64"})
+    if extension == ".csv":
+        table.to_csv(output, index=False)
+    else:
+        table.to_parquet(output, index=False)
+    logger.info(f"Ergebnistabelle: {output}")
+
+    return table
+
+
+def main() -> None:
+    """
+    Einstiegspunkt der Stapelverarbeitung über die Kommandozeile.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Optimierung mehrerer Szenarien")
+    parser.add_argument("source", help="Ordner, Glob-Muster, JSON- oder JSON-Lines-Datei")
+    parser.add_argument("-o", "--output", default="output/batch/results.csv",
+                        help="Ergebnistabelle (.csv oder .parquet)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Anzahl paralleler Prozesse")
+    parser.add_argument("--plot", action="store_true", help="Plots je Szenario erstellen")
+    args = parser.parse_args()
+    run_batch(args.source, args.output, args.workers, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Version 1.00
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.00, 2026-10-17 cw: Benchmark der Startzeit im Modus ohne Plots
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Wurzelordner des Repositorys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Module, die ohne Plots nicht geladen werden dürfen
+PLOT_MODULES = ["matplotlib", "pandas", "progress", "plots"]
+
+# Import des Optimierungsmoduls, Ausgabe: geladene Plot-Module
+IMPORT_CODE = """
+import sys
+import optimization_infill
+print(",".join(module for module in {modules} if module in sys.modules))
+"""
+# Import und grobe Optimierung ohne Plots, Ausgabe: geladene Plot-Module
+RUN_CODE = """
+import json, logging, sys
+import optimization_infill
+logging.disable(logging.INFO)
+with open({parameters!r}) as infile:
+    data = json.load(infile)
+data["tech"]["plot_trajectories"] = False
+data["tech"]["plot_3d"] = False
+data["tech"]["steps"] = {steps}
+optimization_infill.Scenario(data, {directory!r}).run()
+print(",".join(module for module in {modules} if module in sys.modules))
+"""
+
+
+def measure(code: str, repeat: int) -> tuple[list[float], list[str]]:
+    """
+    Führt den Code wiederholt in einem neuen Interpreter aus (Kaltstart) und misst die Dauer
+    einschließlich Interpreterstart.
+
+    Args:
+        code: auszuführender Python-Code, gibt die geladenen Plot-Module aus
+        repeat: Anzahl Wiederholungen
+
+    Raises:
+        RuntimeError: Code mit Fehler beendet
+
+    Returns:
+        times: Gesamtdauer je Wiederholung in s
+        modules: geladene Plot-Module
+    """
+
+    times = []
+    modules = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        process = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                 text=True)
+        times.append(time.perf_counter() - tic)
+        if process.returncode:
+            raise RuntimeError(process.stderr)
+        modules = [module for module in process.stdout.strip().split(",") if module]
+
+    return times, modules
+
+
+def main() -> None:
+    """
+    Misst die Startzeit des Modus ohne Plots (Import und grobe Optimierung) und prüft, dass
+    keine Plot-Module geladen werden. Bei Überschreitung des Zeitbudgets wird mit Code 1
+    beendet.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark der Startzeit ohne Plots")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Anzahl Kaltstarts")
+    parser.add_argument("-s", "--steps", type=int, default=50,
+                        help="Schrittweite der groben Optimierung in m")
+    parser.add_argument("-b", "--budget", type=float, default=0.5,
+                        help="Zeitbudget für Interpreterstart und Import (Median) in s")
+    args = parser.parse_args()
+
+    failed = False
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        parameters = os.path.join(ROOT, "parameters.json")
+        cases = {"import": IMPORT_CODE.format(modules=PLOT_MODULES),
+                 "run": RUN_CODE.format(modules=PLOT_MODULES, parameters=parameters,
+                                        steps=args.steps, directory=directory)}
+        for name, code in cases.items():
+            times, modules = measure(code, args.repeat)
+            results[name] = statistics.median(times)
+            print(json.dumps({"case": name, "median": round(statistics.median(times), 4),
+                              "min": round(min(times), 4), "plot_modules": modules}))
+            if modules:
+                print(f"{name}: Plot-Module geladen: {', '.join(modules)}")
+                failed = True
+    if results["import"] > args.budget:
+        print(f"import: Zeitbudget {args.budget} s überschritten")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Version 1.01
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.01, 2026-10-17 cw: Fälle mit Gradientenprofil (Kernel und Ende-zu-Ende)
+- 1.00, 2026-10-17 cw: Benchmarks der Bewegungsberechnung und der Optimierung
+"""
+
+import argparse
+import copy
+import datetime
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+# Wurzelordner des Repositorys
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import calc_movements as calc  # noqa: E402
+import constants  # noqa: E402
+
+# Anzahl Stufen der Beschleunigungskurven für die Mikro-Benchmarks
+RESOLUTIONS = [17, 65, 257, 1025]
+# Anzahl Elemente der Batch-Varianten
+BATCH_SIZE = 1000
+# Ende-zu-Ende: Länge des Abschnitts (Position der festen Infill-Balisengruppe) in m
+SECTIONS = [2000, 5000, 8000]
+BALISES = [2, 3]
+STEPS = [1, 5, 10]
+# Indication Point relativ zur Abschnittslänge, damit der gesamte Abschnitt durchsucht wird
+INDICATION_POINT_SHARE = 0.9
+# Gradientenprofil: Gradienten in ‰ je Abschnitt gleicher Länge über den Abschnitt (Steigungen,
+# damit die Bremskurven auch bei feiner Auflösung negativ bleiben)
+GRADIENT_PROFILE = [2, 0, 4, 1, 6, 3, 5, 1]
+
+
+def load_parameters() -> dict:
+    """
+    Lädt die Parameter des Standardszenarios aus parameters.json.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        data: Inhalt der Parameter-JSON
+    """
+
+    with open(os.path.join(ROOT, "parameters.json")) as infile:
+        return json.load(infile)
+
+
+def profiles(data: dict, resolution: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Interpoliert die Brems- und Anfahrkurve des Standardszenarios auf eine vorgegebene Anzahl
+    Stufen und rechnet die Geschwindigkeiten in m/s um.
+
+    Args:
+        data: Inhalt der Parameter-JSON
+        resolution: Anzahl Stufen der Kurven
+
+    Raises:
+        none
+
+    Returns:
+        deceleration: Stufenfunktion der Bremsverzögerung in m/s^2 über m/s
+        acceleration: Stufenfunktion der Anfahrbeschleunigung in m/s^2 über m/s
+    """
+
+    curves = []
+    for key in ["deceleration", "acceleration"]:
+        steps = np.asarray(data["train"][key]["steps"], dtype=float)
+        values = np.asarray(data["train"][key]["values"], dtype=float)
+        speeds = np.linspace(steps[0], steps[-1], resolution)
+        curves.append(np.array([speeds*constants.CONVERT_KPH_MPS,
+                                np.interp(speeds, steps, values)]))
+
+    return curves[0], curves[1]
+
+
+def measure(function, repeat: int) -> dict:
+    """
+    Misst die Dauer eines Aufrufs (Median über mehrere Wiederholungen) und den Spitzenwert des
+    allokierten Speichers eines einzelnen Aufrufs.
+
+    Args:
+        function: zu messende Funktion ohne Argumente
+        repeat: Anzahl Wiederholungen
+
+    Raises:
+        none
+
+    Returns:
+        result: Dauer je Aufruf in s (Median und Minimum), Spitzenspeicher in Byte
+    """
+
+    timer = timeit.Timer(function)
+    number = timer.autorange()[0]
+    times = [duration/number for duration in timer.repeat(repeat=repeat, number=number)]
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"median": statistics.median(times), "min": min(times), "peak_memory": peak}
+
+
+def kernel_cases(data: dict) -> list[tuple[str, int, object]]:
+    """
+    Erstellt die Mikro-Benchmarks der Bewegungsberechnung je Auflösung der Kurven.
+
+    Args:
+        data: Inhalt der Parameter-JSON
+
+    Raises:
+        none
+
+    Returns:
+        cases: Name, Auflösung und Funktion je Benchmark
+    """
+
+    speed = data["train"]["speed"] * constants.CONVERT_KPH_MPS
+    release = data["track"]["release_speed"] * constants.CONVERT_KPH_MPS
+    processing = data["train"]["processing_time"]
+    speeds = np.linspace(release, speed, BATCH_SIZE)
+    limits = np.linspace(0, 2000, BATCH_SIZE)
+    positions = np.linspace(0, 2000, BATCH_SIZE)
+    bounds = np.linspace(0, 2000, len(GRADIENT_PROFILE), endpoint=False)
+    cases = []
+    for resolution in RESOLUTIONS:
+        decel, accel = profiles(data, resolution)
+        decel_profile, accel_profile = calc.compile_profile(decel), calc.compile_profile(accel)
+        # Bremskurve je Abschnitt des Gradientenprofils
+        decels = []
+        for gradient in GRADIENT_PROFILE:
+            decels.append(decel.copy())
+            decels[-1][1, 1:] -= constants.G*gradient/1000
+        segmented = calc.compile_segments(bounds, decels)
+        cases += [
+            ("speed_change_open", resolution,
+             lambda accel=accel: calc.speed_change_open(0, speed, accel)),
+            ("speed_change_open/compiled", resolution,
+             lambda profile=accel_profile: calc.speed_change_open(0, speed, profile)),
+            ("speed_change_limit", resolution,
+             lambda decel=decel: calc.speed_change_limit(speed, release, decel, 500)),
+            ("speed_change_limit/compiled", resolution,
+             lambda profile=decel_profile: calc.speed_change_limit(speed, release, profile,
+                                                                   500)),
+            ("speed_change_fixed_time", resolution,
+             lambda decel=decel: calc.speed_change_fixed_time(speed, release, decel,
+                                                              processing, processing)),
+            ("speed_change_fixed_time/compiled", resolution,
+             lambda profile=decel_profile: calc.speed_change_fixed_time(
+                 speed, release, profile, processing, processing)),
+            (f"speed_change_open_batch/{BATCH_SIZE}", resolution,
+             lambda profile=accel_profile: calc.speed_change_open_batch(
+                 speeds*0, speeds, profile)),
+            (f"speed_change_limit_batch/{BATCH_SIZE}", resolution,
+             lambda profile=decel_profile: calc.speed_change_limit_batch(
+                 speeds*0+speed, speeds*0+release, profile, limits)),
+            (f"speed_change_fixed_time_batch/{BATCH_SIZE}", resolution,
+             lambda profile=decel_profile: calc.speed_change_fixed_time_batch(
+                 speeds, release, profile, processing, processing)),
+            (f"speed_change_limit_batch/{BATCH_SIZE}/segmented", resolution,
+             lambda profile=segmented: calc.speed_change_limit_batch(
+                 speeds*0+speed, speeds*0+release, profile, limits, 2000)),
+            (f"speed_change_fixed_time_batch/{BATCH_SIZE}/segmented", resolution,
+             lambda profile=segmented: calc.speed_change_fixed_time_batch(
+                 speeds, release, profile, processing, processing, positions)),
+        ]
+
+    return cases
+
+
+def scenario(data: dict, section: int, balises: int, steps: int, engine: str,
+             gradient_profile: bool = False) -> dict:
+    """
+    Erstellt die Parameter eines Ende-zu-Ende-Benchmarks aus dem Standardszenario.
+
+    Args:
+        data: Inhalt der Parameter-JSON
+        section: Position der festen Infill-Balisengruppe vor dem EoA in m
+        balises: Gesamtzahl der Infill-Balisengruppen
+        steps: Schrittweite der Balisenpositionierung in m
+        engine: Verfahren der Berechnung (LOOP oder VECTOR)
+        gradient_profile: Gradientenprofil über den Abschnitt statt ebener Strecke
+
+    Raises:
+        none
+
+    Returns:
+        data: Parameter des Benchmarks
+    """
+
+    data = copy.deepcopy(data)
+    data["track"]["balises"] = balises
+    data["track"]["balise_positions"] = [section] + [0]*(balises-1)
+    data["train"]["indication_point"] = int(section*INDICATION_POINT_SHARE)
+    data["tech"].update(steps=steps, engine=engine, workers=1, plot_trajectories=False,
+                        plot_3d=False, rotate_plot=False)
+    if gradient_profile:
+        length = section / len(GRADIENT_PROFILE)
+        data["track"]["gradient"] = {
+            "steps": [round(index*length) for index in range(len(GRADIENT_PROFILE))],
+            "values": GRADIENT_PROFILE}
+
+    return data
+
+
+def run_case(case: dict, repeat: int) -> dict:
+    """
+    Führt einen Ende-zu-Ende-Benchmark im aktuellen Prozess aus (aufgerufen in einem eigenen
+    Prozess, damit Zwischenspeicher und Speicherspitzen nicht zwischen den Fällen wirken).
+
+    Args:
+        case: Abschnitt, Anzahl Balisengruppen, Schrittweite, Verfahren und Gradientenprofil
+        repeat: Anzahl Wiederholungen
+
+    Raises:
+        none
+
+    Returns:
+        result: Dauer in s, Spitzenspeicher in Byte und Ergebnis der Optimierung
+    """
+
+    import optimization_infill
+
+    logging.disable(logging.INFO)
+    data = scenario(load_parameters(), case["section"], case["balises"], case["steps"],
+                    case["engine"], case.get("gradient_profile", False))
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeat):
+            tic = time.perf_counter()
+            result = optimization_infill.Scenario(copy.deepcopy(data), directory).run()
+            times.append(time.perf_counter() - tic)
+        tracemalloc.start()
+        optimization_infill.Scenario(copy.deepcopy(data), directory).run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"median": statistics.median(times), "min": min(times), "peak_memory": peak,
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "infill_positions": [int(position) for position in result.infill_positions],
+            "additional_runtime": round(float(result.min_loss_time), 4)}
+
+
+def metadata() -> dict:
+    """
+    Sammelt Angaben zur Umgebung für den Vergleich von Benchmark-Ergebnissen.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        meta: Zeitpunkt, Commit, Python-, numpy- und Plattformversion
+    """
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+                                capture_output=True).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """
+    Gibt das Verhältnis der Laufzeiten (Median) gegenüber einer früheren Ergebnisdatei aus.
+
+    Args:
+        results: aktuelle Ergebnisse
+        baseline: frühere Ergebnisse
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    for group in ["kernels", "end_to_end"]:
+        previous = {entry["name"]: entry for entry in baseline.get(group, [])}
+        for entry in results[group]:
+            if entry["name"] in previous:
+                ratio = entry["median"] / previous[entry["name"]]["median"]
+                print(f"{entry['name']:<58} {ratio:6.2f}x")
+
+
+def main() -> None:
+    """
+    Führt die Mikro-Benchmarks der Bewegungsberechnung und die Ende-zu-Ende-Benchmarks der
+    Optimierung aus und schreibt die Ergebnisse als JSON.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmarks der Infill-Optimierung")
+    parser.add_argument("-o", "--output",
+                        default=f"output/benchmarks/{time.strftime('%Y%m%d-%H%M%S')}_results.json",
+                        help="JSON-Datei der Ergebnisse")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Anzahl Wiederholungen")
+    parser.add_argument("-k", "--filter", default="", help="nur Fälle mit diesem Namensteil")
+    parser.add_argument("-e", "--engine", default="VECTOR", choices=["LOOP", "VECTOR"],
+                        help="Verfahren der Ende-zu-Ende-Benchmarks")
+    parser.add_argument("-c", "--compare", help="frühere JSON-Datei zum Vergleich")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Ende-zu-Ende-Fall in eigenem Prozess
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case), args.repeat)))
+        return
+
+    data = load_parameters()
+    results = {"meta": metadata(), "kernels": [], "end_to_end": []}
+    for name, resolution, function in kernel_cases(data):
+        name = f"{name}@{resolution}"
+        if args.filter in name:
+            results["kernels"].append({"name": name, "resolution": resolution,
+                                       **measure(function, args.repeat)})
+            print(json.dumps(results["kernels"][-1]))
+    for section, balises, steps, gradient_profile in itertools.product(
+            SECTIONS, BALISES, STEPS, [False, True]):
+        case = {"section": section, "balises": balises, "steps": steps, "engine": args.engine,
+                "gradient_profile": gradient_profile}
+        name = (f"optimize/{balises}bg/{section}m/steps{steps}/{args.engine}"
+                + ("/profile" if gradient_profile else ""))
+        if args.filter not in name:
+            continue
+        process = subprocess.run([sys.executable, os.path.abspath(__file__),
+                                  "--repeat", str(args.repeat),
+                                  "--run-case", json.dumps(case)],
+                                 capture_output=True, text=True, check=True)
+        results["end_to_end"].append({"name": name, **case,
+                                      **json.loads(process.stdout)})
+        print(json.dumps(results["end_to_end"][-1]))
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as outfile:
+        json.dump(results, outfile, indent=4)
+    print(f"Ergebnisse: {os.path.abspath(args.output)}")
+    if args.compare:
+        with open(args.compare) as infile:
+            compare(results, json.load(infile))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 """
-Version 1.03
+Version 1.08
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 1.08, 2026-10-17 cw: Zulässige Geschwindigkeit je Abschnitt (Streckengeschwindigkeitsprofil)
+- 1.07, 2026-10-17 cw: Abschnittsweise Profile entlang der Strecke (z.B. Gradientenprofil)
+- 1.06, 2026-10-17 cw: Zählung der Aufrufe für die Instrumentierung
+- 1.05, 2026-10-17 cw: Vektorisierte Kernel für Felder von Geschwindigkeiten und Distanzen
+- 1.04, 2026-10-17 cw: Vorkompilierte Stufenfunktionen mit binärer Suche
 - 1.03, 2024-04-08 cw: PEP 8 Konformität
 - 1.02, 2024-04-05 cw: Verbesserte ValueError-Meldungen
 - 1.01, 2024-03-25 cw: Kommentare & Codeoptimierung
@@ -12,7 +17,10 @@ Change History:
 import math
 import numpy as np
 
+import instrumentation
 
+
+@instrumentation.counted
 def cruise(distance: float, speed: float, time_minimum: float) -> tuple[float, float]:
     """
     Berechnet eine Fahrt mit konstanter Geschwindigkeit über definierte Strecke und Zeit.
@@ -46,6 +54,7 @@ def cruise(distance: float, speed: float, time_minimum: float) -> tuple[float, f
     return distance_travelled, time_elapsed
 
 
+@instrumentation.counted
 def processing(speed: float, time: float) -> tuple[float, float]:
     """
     Berechnet eine Fahrt mit konstanter Geschwindigkeit über definierte Zeit.
@@ -74,15 +83,1231 @@ def processing(speed: float, time: float) -> tuple[float, float]:
     return distance_travelled, time_elapsed
 
 
-def speed_change_open(initial_speed: float, target_speed: float, acceleration: np.ndarray
-                      ) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
+class CompiledProfile:
+    """
+    Vorkompilierte Stufenfunktion der Beschleunigung. Hält die über der Geschwindigkeit
+    kumulierten Distanzen und Zeiten vor, sodass jeder Geschwindigkeitswechsel über eine binäre
+    Suche und ein geschlossen berechnetes Teilstück bestimmt werden kann. Die Beschleunigung
+    values[i] gilt zwischen den Geschwindigkeiten speeds[i-1] und speeds[i].
+    """
+
+    def __init__(self, acceleration: np.ndarray) -> None:
+        """
+        Args:
+            acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s
+
+        Raises:
+            ValueError: Anzahl Geschwindigkeiten und Beschleunigungen nicht konsistent
+            ValueError: Geschwindigkeitsstufen nicht aufsteigend
+        """
+
+        speeds = np.array(acceleration[0], dtype=float)
+        values = np.array(acceleration[1], dtype=float)
+        # Datencheck
+        if len(speeds) != len(values):
+            raise ValueError("ungleiche Anzahl Elemente für Geschwindigkeit und Beschleunigung")
+        if np.any(np.diff(speeds) <= 0):
+            raise ValueError("Geschwindigkeitsstufen nicht aufsteigend")
+
+        self.speeds = speeds
+        self.values = values
+        self.min_speed = speeds[0]
+        self.max_speed = speeds[-1]
+        # Stufen ohne Beschleunigung können nicht durchfahren werden
+        blocked = np.zeros(len(speeds), dtype=bool)
+        blocked[1:] = values[1:] == 0
+        divisor = np.where(blocked, 1, values)
+        # Zeit und Distanz je Stufe
+        delta_time = np.zeros(len(speeds))
+        delta_distance = np.zeros(len(speeds))
+        delta_time[1:] = np.where(blocked[1:], 0, np.diff(speeds) / divisor[1:])
+        delta_distance[1:] = np.where(blocked[1:], 0, np.diff(speeds**2) / (2*divisor[1:]))
+        # kumulierte Werte an den Stufengrenzen
+        self.time = np.cumsum(delta_time)
+        self.distance = np.cumsum(delta_distance)
+        self.blocked = np.cumsum(blocked)
+        self._divisor = divisor
+
+    def segment(self, speed, rising: bool):
+        """
+        Bestimmt die Stufe, deren Beschleunigung ab einer Geschwindigkeit in Richtung des
+        Geschwindigkeitswechsels gilt.
+
+        Args:
+            speed: Geschwindigkeit(en) in m/s
+            rising: Geschwindigkeitswechsel steigend (True) oder fallend (False)
+
+        Raises:
+            none
+
+        Returns:
+            index: Index der Stufe(n)
+        """
+
+        index = np.searchsorted(self.speeds, speed, side="right" if rising else "left")
+
+        return np.clip(index, 1, len(self.speeds)-1)
+
+    def distance_at(self, speed, index):
+        """
+        Kumulierte Distanz von der untersten Stufengrenze bis zu einer Geschwindigkeit.
+
+        Args:
+            speed: Geschwindigkeit(en) in m/s
+            index: Index der Stufe(n), in der die Geschwindigkeit liegt
+
+        Raises:
+            none
+
+        Returns:
+            distance: kumulierte Distanz in m (vorzeichenbehaftet)
+        """
+
+        lower = self.speeds[index-1]
+
+        return self.distance[index-1] + (speed**2 - lower**2) / (2*self._divisor[index])
+
+    def time_at(self, speed, index):
+        """
+        Kumulierte Zeit von der untersten Stufengrenze bis zu einer Geschwindigkeit.
+
+        Args:
+            speed: Geschwindigkeit(en) in m/s
+            index: Index der Stufe(n), in der die Geschwindigkeit liegt
+
+        Raises:
+            none
+
+        Returns:
+            time: kumulierte Zeit in s (vorzeichenbehaftet)
+        """
+
+        lower = self.speeds[index-1]
+
+        return self.time[index-1] + (speed - lower) / self._divisor[index]
+
+    def change(self, initial_speed: float, exit_speed: float) -> tuple[float, float]:
+        """
+        Berechnet Distanz und Zeit eines Geschwindigkeitswechsels ohne markante Punkte.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            exit_speed: Geschwindigkeit am Ende in m/s
+
+        Raises:
+            ValueError: Geschwindigkeit außerhalb der Stufenfunktion
+            ValueError: Geschwindigkeitswechsel über Stufe ohne Beschleunigung
+
+        Returns:
+            distance_travelled: gefahrene Distanz in m
+            time_elapsed: verstrichene Zeit in s
+        """
+
+        if initial_speed == exit_speed:
+            return 0, 0
+        rising = exit_speed >= initial_speed
+        first = self.segment(initial_speed, rising)
+        last = self.segment(exit_speed, not rising)
+        self._check(initial_speed, exit_speed, first, last)
+        distance_travelled = (self.distance_at(exit_speed, last)
+                              - self.distance_at(initial_speed, first))
+        time_elapsed = self.time_at(exit_speed, last) - self.time_at(initial_speed, first)
+
+        return distance_travelled, time_elapsed
+
+    def steps(self, initial_speed: float, exit_speed: float) -> tuple[list, list, list]:
+        """
+        Erzeugt die markanten Punkte eines Geschwindigkeitswechsels.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            exit_speed: Geschwindigkeit am Ende in m/s
+
+        Raises:
+            ValueError: Geschwindigkeit außerhalb der Stufenfunktion
+            ValueError: Geschwindigkeitswechsel über Stufe ohne Beschleunigung
+
+        Returns:
+            distance_steps: markante Punkte - Distanzen in m
+            speed_steps: markante Punkte - Geschwindigkeiten in m/s
+            accel_steps: markante Punkte - Beschleunigungen in m/s^2
+        """
+
+        if initial_speed == exit_speed:
+            return [0], [initial_speed], []
+        rising = exit_speed >= initial_speed
+        first = self.segment(initial_speed, rising)
+        last = self.segment(exit_speed, not rising)
+        self._check(initial_speed, exit_speed, first, last)
+        # Stufengrenzen in Richtung des Geschwindigkeitswechsels
+        if rising:
+            bounds = np.arange(first, last)
+            segments = np.arange(first, last+1)
+        else:
+            bounds = np.arange(first-1, last-1, -1)
+            segments = np.arange(first, last-1, -1)
+        origin = self.distance_at(initial_speed, first)
+        distance_steps = [0, *(self.distance[bounds] - origin).tolist(),
+                          self.distance_at(exit_speed, last) - origin]
+        speed_steps = [initial_speed, *self.speeds[bounds].tolist(), exit_speed]
+        accel_steps = self.values[segments].tolist()
+
+        return distance_steps, speed_steps, accel_steps
+
+    def speed_after_distance(self, initial_speed: float, target_speed: float,
+                             distance: float) -> float:
+        """
+        Bestimmt die Geschwindigkeit nach einer Distanz, sofern die Zielgeschwindigkeit innerhalb
+        dieser Distanz nicht erreicht wird.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            target_speed: Zielgeschwindigkeit in m/s
+            distance: gefahrene Distanz in m
+
+        Raises:
+            none
+
+        Returns:
+            exit_speed: Geschwindigkeit nach der Distanz in m/s
+        """
+
+        rising = target_speed >= initial_speed
+        first = self.segment(initial_speed, rising)
+        last = self.segment(target_speed, not rising)
+        origin = self.distance_at(initial_speed, first)
+        # binäre Suche über die Stufengrenzen in Fahrtrichtung
+        if rising:
+            bounds = self.distance[first:last] - origin
+            index = first + np.searchsorted(bounds, distance, side="left")
+        else:
+            bounds = self.distance[last:first] - origin
+            index = first - np.searchsorted(bounds[::-1], distance, side="left")
+        # geschlossenes Teilstück innerhalb der Stufe
+        lower = self.speeds[index-1]
+        squared = 2*self._divisor[index]*(origin + distance - self.distance[index-1]) + lower**2
+
+        return math.sqrt(max(squared, 0))
+
+    def speed_after_time(self, initial_speed: float, target_speed: float, time: float) -> float:
+        """
+        Bestimmt die Geschwindigkeit nach einer Zeit, sofern die Zielgeschwindigkeit innerhalb
+        dieser Zeit nicht erreicht wird.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            target_speed: Zielgeschwindigkeit in m/s
+            time: verstrichene Zeit in s
+
+        Raises:
+            none
+
+        Returns:
+            exit_speed: Geschwindigkeit nach der Zeit in m/s
+        """
+
+        rising = target_speed >= initial_speed
+        first = self.segment(initial_speed, rising)
+        last = self.segment(target_speed, not rising)
+        origin = self.time_at(initial_speed, first)
+        # binäre Suche über die Stufengrenzen in Fahrtrichtung
+        if rising:
+            bounds = self.time[first:last] - origin
+            index = first + np.searchsorted(bounds, time, side="left")
+        else:
+            bounds = self.time[last:first] - origin
+            index = first - np.searchsorted(bounds[::-1], time, side="left")
+        # geschlossenes Teilstück innerhalb der Stufe
+        lower = self.speeds[index-1]
+
+        return lower + self._divisor[index]*(origin + time - self.time[index-1])
+
+    def change_batch(self, initial_speed, exit_speed) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Berechnet Distanzen und Zeiten elementweise für Felder von Geschwindigkeitswechseln.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            exit_speed: Geschwindigkeiten am Ende in m/s
+
+        Raises:
+            ValueError: Geschwindigkeit außerhalb der Stufenfunktion
+            ValueError: Geschwindigkeitswechsel über Stufe ohne Beschleunigung
+
+        Returns:
+            distance_travelled: gefahrene Distanzen in m
+            time_elapsed: verstrichene Zeiten in s
+        """
+
+        initial_speed, exit_speed = np.broadcast_arrays(np.asarray(initial_speed, dtype=float),
+                                                        np.asarray(exit_speed, dtype=float))
+        rising = exit_speed >= initial_speed
+        first = np.where(rising, self.segment(initial_speed, True),
+                         self.segment(initial_speed, False))
+        last = np.where(rising, self.segment(exit_speed, False), self.segment(exit_speed, True))
+        # Datencheck
+        moving = initial_speed != exit_speed
+        if np.any(moving & ((np.minimum(initial_speed, exit_speed) < self.min_speed)
+                            | (np.maximum(initial_speed, exit_speed) > self.max_speed))):
+            raise ValueError("Geschwindigkeitswechsel außerhalb der Stufenfunktion")
+        low, high = np.minimum(first, last), np.maximum(first, last)
+        if np.any(moving & (self.blocked[high] - self.blocked[low-1] > 0)):
+            raise ValueError("Geschwindigkeitswechsel über Stufe ohne Beschleunigung")
+        # Differenzen der kumulierten Werte
+        distance_travelled = np.where(moving, self.distance_at(exit_speed, last)
+                                      - self.distance_at(initial_speed, first), 0)
+        time_elapsed = np.where(moving, self.time_at(exit_speed, last)
+                                - self.time_at(initial_speed, first), 0)
+
+        return distance_travelled, time_elapsed
+
+    def speed_after_distance_batch(self, initial_speed, distance) -> np.ndarray:
+        """
+        Bestimmt elementweise die Geschwindigkeit nach einer Distanz ohne Zielgeschwindigkeit.
+        Setzt eine Stufenfunktion mit einheitlichem Vorzeichen der Beschleunigung voraus.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            distance: gefahrene Distanzen in m
+
+        Raises:
+            none
+
+        Returns:
+            exit_speed: Geschwindigkeiten nach der Distanz in m/s
+        """
+
+        initial_speed = np.asarray(initial_speed, dtype=float)
+        goal = self.distance_at(initial_speed, self.segment(initial_speed, True)) + distance
+        index = self._search(self.distance, goal)
+        lower = self.speeds[index-1]
+        squared = 2*self._divisor[index]*(goal - self.distance[index-1]) + lower**2
+
+        return np.sqrt(np.maximum(squared, 0))
+
+    def speed_after_time_batch(self, initial_speed, time) -> np.ndarray:
+        """
+        Bestimmt elementweise die Geschwindigkeit nach einer Zeit ohne Zielgeschwindigkeit.
+        Setzt eine Stufenfunktion mit einheitlichem Vorzeichen der Beschleunigung voraus.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            time: verstrichene Zeiten in s
+
+        Raises:
+            none
+
+        Returns:
+            exit_speed: Geschwindigkeiten nach der Zeit in m/s
+        """
+
+        initial_speed = np.asarray(initial_speed, dtype=float)
+        goal = self.time_at(initial_speed, self.segment(initial_speed, True)) + time
+        index = self._search(self.time, goal)
+        lower = self.speeds[index-1]
+
+        return lower + self._divisor[index]*(goal - self.time[index-1])
+
+    def _search(self, cumulative: np.ndarray, goal) -> np.ndarray:
+        """
+        Binäre Suche der Stufe, in der ein kumulierter Wert erreicht wird.
+        """
+
+        # ab der ersten Stufengrenze, da die unterste Stufe im Gefälle beim Bremsen das
+        # Vorzeichen wechseln kann
+        if cumulative[-1] < cumulative[1]:  # Bremskurve: kumulierte Werte fallend
+            index = 1 + np.searchsorted(-cumulative[1:], -goal, side="left")
+        else:
+            index = 1 + np.searchsorted(cumulative[1:], goal, side="left")
+
+        return np.minimum(index, len(cumulative)-1)
+
+    def _check(self, initial_speed: float, exit_speed: float, first: int, last: int) -> None:
+        """
+        Prüft, ob ein Geschwindigkeitswechsel innerhalb der Stufenfunktion durchführbar ist.
+        """
+
+        if not (self.min_speed <= min(initial_speed, exit_speed)
+                and max(initial_speed, exit_speed) <= self.max_speed):
+            raise ValueError(f"Geschwindigkeitswechsel {initial_speed} m/s -> {exit_speed} m/s "
+                             "außerhalb der Stufenfunktion")
+        low, high = min(first, last), max(first, last)
+        if self.blocked[high] - self.blocked[low-1] > 0:
+            raise ValueError(f"Geschwindigkeitswechsel {initial_speed} m/s -> {exit_speed} m/s "
+                             "über Stufe ohne Beschleunigung")
+
+
+class SegmentedProfile:
+    """
+    Stufenfunktionen der Beschleunigung je Abschnitt eines Streckenprofils (z.B. Gradienten).
+    Positionen zählen in m vor dem EoA und fallen in Fahrtrichtung. Abschnitt k gilt von
+    bounds[k] bis bounds[k+1], der erste Abschnitt reicht unbegrenzt hinter das EoA. Jeder
+    Abschnitt hält ein vorkompiliertes Profil, sodass eine Bewegung über mehrere Abschnitte
+    abschnittsweise mit den Kerneln der einzelnen Profile integriert wird.
+    """
+
+    def __init__(self, bounds: np.ndarray, profiles: list[CompiledProfile]) -> None:
+        """
+        Args:
+            bounds: Anfangspositionen der Abschnitte in m vor dem EoA (aufsteigend)
+            profiles: vorkompiliertes Profil je Abschnitt
+
+        Raises:
+            ValueError: Anzahl Abschnitte und Profile nicht konsistent
+            ValueError: Anfangspositionen nicht aufsteigend
+        """
+
+        bounds = np.array(bounds, dtype=float)
+        # Datencheck
+        if len(bounds) != len(profiles) or len(bounds) == 0:
+            raise ValueError("ungleiche Anzahl Abschnitte und Stufenfunktionen")
+        if np.any(np.diff(bounds) <= 0):
+            raise ValueError("Anfangspositionen der Abschnitte nicht aufsteigend")
+
+        bounds[0] = -np.inf
+        self.bounds = bounds
+        self.profiles = list(profiles)
+        self.min_speed = max(profile.min_speed for profile in self.profiles)
+        self.max_speed = min(profile.max_speed for profile in self.profiles)
+
+    def segment(self, position):
+        """
+        Bestimmt den Abschnitt, der ab einer Position in Fahrtrichtung befahren wird.
+
+        Args:
+            position: Position(en) in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            index: Index des Abschnitts (der Abschnitte)
+        """
+
+        return np.maximum(np.searchsorted(self.bounds, position, side="left") - 1, 0)
+
+    def limit(self, initial_speed: float, target_speed: float, distance_limit: float,
+              position: float) -> tuple[float, float, float, list, list, list]:
+        """
+        Geschwindigkeitswechsel mit Distanzlimit ab einer Position über die Abschnitte (siehe
+        speed_change_limit), ohne Limit bei distance_limit = inf.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            target_speed: Zielgeschwindigkeit in m/s
+            distance_limit: Distanzlimit in m
+            position: Position zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Geschwindigkeitswechsel außerhalb der Stufenfunktion
+
+        Returns:
+            distance_travelled: gefahrene Distanz in m
+            time_elapsed: verstrichene Zeit in s
+            exit_speed: Geschwindigkeit am Ende in m/s
+            distance_steps: markante Punkte - Distanzen in m
+            speed_steps: markante Punkte - Geschwindigkeiten in m/s
+            accel_steps: markante Punkte - Beschleunigungen in m/s^2
+        """
+
+        distance_travelled, time_elapsed, exit_speed = 0, 0, initial_speed
+        distance_steps, speed_steps, accel_steps = [0], [initial_speed], []
+        for index in range(int(self.segment(position)), -1, -1):
+            if exit_speed == target_speed or distance_travelled >= distance_limit:
+                break
+            length = min(position - distance_travelled - self.bounds[index],
+                         distance_limit - distance_travelled)
+            if length <= 0:
+                continue
+            distance, time, exit_speed, distance_part, speed_part, accel_part = \
+                speed_change_limit(exit_speed, target_speed, self.profiles[index], length)
+            # markante Punkte des Abschnitts anhängen
+            distance_steps.extend(distance_travelled + step for step in distance_part[1:])
+            speed_steps.extend(speed_part[1:])
+            accel_steps.extend(accel_part)
+            distance_travelled += distance
+            time_elapsed += time
+
+        return distance_travelled, time_elapsed, exit_speed, distance_steps, speed_steps, \
+            accel_steps
+
+    def fixed_time(self, initial_speed: float, target_speed: float, time_fixed: float,
+                   processing_time: float, position: float) -> tuple[
+                       float, float, float, float, list, list, list]:
+        """
+        Geschwindigkeitswechsel mit Zeitlimit ab einer Position über die Abschnitte (siehe
+        speed_change_fixed_time). Bis zum Abschnitt, in dem die Zielgeschwindigkeit oder das
+        Zeitlimit erreicht wird, wird jeder Abschnitt vollständig durchfahren.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            target_speed: Zielgeschwindigkeit in m/s
+            time_fixed: Zeitvorgabe für die Dauer des Vorgangs in s
+            processing_time: Verarbeitungszeit der OBU in s
+            position: Position zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Geschwindigkeitswechsel außerhalb der Stufenfunktion
+
+        Returns:
+            distance_travelled: gefahrene Distanz in m
+            time_elapsed: verstrichene Zeit in s
+            exit_speed: Geschwindigkeit am Ende in m/s
+            time_cruise: Beharrungsfahrzeit nach Beendigung des Geschwindigkeitswechsels in s
+            distance_steps: markante Punkte - Distanzen in m
+            speed_steps: markante Punkte - Geschwindigkeiten in m/s
+            accel_steps: markante Punkte - Beschleunigungen in m/s^2
+        """
+
+        first = int(self.segment(position))
+        # ohne Geschwindigkeitswechsel unabhängig vom Abschnitt
+        if time_fixed == 0 or initial_speed == target_speed:
+            return speed_change_fixed_time(initial_speed, target_speed, self.profiles[first],
+                                           time_fixed, processing_time)
+        distance_travelled, time_elapsed, time_cruise, speed = 0, 0, 0, initial_speed
+        distance_steps, speed_steps, accel_steps = [0], [initial_speed], []
+        for index in range(first, -1, -1):
+            length = position - distance_travelled - self.bounds[index]
+            if length <= 0:
+                continue
+            profile = self.profiles[index]
+            distance, time, exit_speed, distance_part, speed_part, accel_part = \
+                speed_change_limit(speed, target_speed, profile, length)
+            finished = exit_speed == target_speed or time >= time_fixed - time_elapsed
+            if finished:  # Ende des Vorgangs im Abschnitt
+                distance, time, exit_speed, time_cruise, distance_part, speed_part, \
+                    accel_part = speed_change_fixed_time(speed, target_speed, profile,
+                                                         time_fixed - time_elapsed,
+                                                         processing_time - time_elapsed)
+            # markante Punkte des Abschnitts anhängen
+            distance_steps.extend(distance_travelled + step for step in distance_part[1:])
+            speed_steps.extend(speed_part[1:])
+            accel_steps.extend(accel_part)
+            distance_travelled += distance
+            time_elapsed += time
+            speed = exit_speed
+            if finished:
+                break
+
+        return distance_travelled, time_elapsed, exit_speed, time_cruise, distance_steps, \
+            speed_steps, accel_steps
+
+    def limit_batch(self, initial_speed, target_speed, distance_limit, position
+                    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Elementweise Variante von limit ohne markante Punkte. Je Abschnitt werden alle Elemente,
+        die ihn noch befahren, gemeinsam mit dem Kernel des Abschnittsprofils berechnet.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            target_speed: Zielgeschwindigkeiten in m/s
+            distance_limit: Distanzlimits in m
+            position: Positionen zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Geschwindigkeitswechsel außerhalb der Stufenfunktion
+
+        Returns:
+            distance_travelled: gefahrene Distanzen in m
+            time_elapsed: verstrichene Zeiten in s
+            exit_speed: Geschwindigkeiten am Ende in m/s
+        """
+
+        initial_speed, target_speed, distance_limit, position = (
+            array.astype(float) for array in np.broadcast_arrays(
+                initial_speed, target_speed, distance_limit, position))
+        distance_travelled = np.zeros_like(initial_speed)
+        time_elapsed = np.zeros_like(initial_speed)
+        exit_speed = initial_speed.copy()
+        first = self.segment(position)
+        done = exit_speed == target_speed
+        for index in range(int(np.max(first, initial=0)), -1, -1):
+            length = np.minimum(position - distance_travelled - self.bounds[index],
+                                distance_limit - distance_travelled)
+            active = ~done & (first >= index) & (length > 0)
+            if not np.any(active):
+                continue
+            distance, time, speed = speed_change_limit_batch(
+                exit_speed[active], target_speed[active], self.profiles[index], length[active])
+            distance_travelled[active] += distance
+            time_elapsed[active] += time
+            exit_speed[active] = speed
+            done = (exit_speed == target_speed) | (distance_travelled >= distance_limit)
+
+        return distance_travelled, time_elapsed, exit_speed
+
+    def fixed_time_batch(self, initial_speed, target_speed: float, time_fixed: float,
+                         processing_time: float, position) -> tuple[np.ndarray, np.ndarray,
+                                                                    np.ndarray, np.ndarray]:
+        """
+        Elementweise Variante von fixed_time ohne markante Punkte. Elemente, die die
+        Zielgeschwindigkeit oder das Zeitlimit in einem Abschnitt erreichen, werden dort wie in
+        speed_change_fixed_time_batch abgeschlossen, alle übrigen fahren in den nächsten
+        Abschnitt.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            target_speed: Zielgeschwindigkeit in m/s
+            time_fixed: Zeitvorgabe für die Dauer des Vorgangs in s
+            processing_time: Verarbeitungszeit der OBU in s
+            position: Positionen zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Verarbeitungszeit kürzer als vollständiger Geschwindigkeitswechsel
+
+        Returns:
+            distance_travelled: gefahrene Distanzen in m
+            time_elapsed: verstrichene Zeiten in s
+            exit_speed: Geschwindigkeiten am Ende in m/s
+            time_cruise: Beharrungsfahrzeiten nach Beendigung des Geschwindigkeitswechsels in s
+        """
+
+        initial_speed, position = (array.astype(float) for array in np.broadcast_arrays(
+            initial_speed, position))
+        # ohne Geschwindigkeitswechsel unabhängig vom Abschnitt
+        if time_fixed == 0:
+            return speed_change_fixed_time_batch(initial_speed, target_speed, self.profiles[0],
+                                                 time_fixed, processing_time)
+        # Zielgeschwindigkeit bereits erreicht: Beharrungsfahrt
+        done = initial_speed == target_speed
+        zeros = np.zeros_like(initial_speed)
+        distance_travelled = np.where(done, time_fixed*target_speed, zeros)
+        time_elapsed = np.where(done, time_fixed, zeros)
+        time_cruise = np.where(done, time_fixed, zeros)
+        exit_speed = initial_speed.copy()
+        first = self.segment(position)
+        for index in range(int(np.max(first, initial=0)), -1, -1):
+            active = ~done & (first >= index)
+            if not np.any(active):
+                continue
+            profile = self.profiles[index]
+            speed = exit_speed[active]
+            length = np.maximum(position[active] - distance_travelled[active]
+                                - self.bounds[index], 0)
+            time_remaining = time_fixed - time_elapsed[active]
+            distance, time, speed_limit = speed_change_limit_batch(speed, target_speed, profile,
+                                                                   length)
+            finished = (speed_limit == target_speed) | (time >= time_remaining)
+            # Abschluss im Abschnitt: vollständiger oder abgebrochener Geschwindigkeitswechsel
+            distance_change, time_change = profile.change_batch(speed, target_speed)
+            complete = finished & (time_change <= time_remaining)
+            time_processing_remaining = processing_time - time_elapsed[active] - time_change
+            if np.any(complete & (time_processing_remaining < 0)):
+                raise ValueError(f"Wert für 'time' negativ "
+                                 f"({np.min(time_processing_remaining)} s)")
+            partial = finished & ~complete
+            partial_speed = np.where(partial, profile.speed_after_time_batch(
+                speed, np.where(partial, time_remaining, 0)), speed)
+            partial_distance = profile.change_batch(speed, partial_speed)[0]
+            # Zusammenführen der Fälle (nicht abgeschlossen: Abschnitt vollständig durchfahren)
+            distance = np.select(
+                [complete, partial],
+                [distance_change + time_processing_remaining*target_speed, partial_distance],
+                distance)
+            time = np.select([complete, partial],
+                             [time_change + time_processing_remaining, time_remaining], time)
+            speed = np.select([complete, partial], [target_speed, partial_speed], speed_limit)
+            distance_travelled[active] += distance
+            time_elapsed[active] += time
+            exit_speed[active] = speed
+            time_cruise[active] = np.where(complete, time_processing_remaining, 0)
+            done[active] = finished
+
+        return distance_travelled, time_elapsed, exit_speed, time_cruise
+
+
+class LineSpeedProfile:
+    """
+    Zulässige Geschwindigkeit je Abschnitt der Strecke (Streckengeschwindigkeit) mit den
+    Stufenfunktionen von Bremsen und Anfahren. Positionen zählen wie bei SegmentedProfile in m vor
+    dem EoA, der erste Abschnitt reicht unbegrenzt hinter das EoA. Die Fahrt ohne Behinderung
+    beginnt am Beginn des Betrachtungsraumes mit der zulässigen Geschwindigkeit, beschleunigt nach
+    einer Anhebung und bremst vor einer Absenkung, sodass diese zu Beginn ihres Abschnitts
+    eingehalten ist. Je Teilabschnitt (Grenzen der Geschwindigkeiten und der Stufenfunktionen)
+    werden Geschwindigkeiten, Längen und Zeiten dieser Fahrt vorberechnet und die Zeiten über die
+    Teilabschnitte kumuliert. Als Anfahrprofil in speed_change_open endet das Beschleunigen, sobald
+    die Fahrt ohne Behinderung erreicht ist.
+    """
+
+    def __init__(self, bounds: np.ndarray, speeds: np.ndarray, deceleration, acceleration,
+                 origin: float) -> None:
+        """
+        Args:
+            bounds: Anfangspositionen der Abschnitte in m vor dem EoA (aufsteigend)
+            speeds: zulässige Geschwindigkeit je Abschnitt in m/s
+            deceleration: Bremsen als CompiledProfile oder SegmentedProfile
+            acceleration: Anfahren als CompiledProfile oder SegmentedProfile
+            origin: Beginn des Betrachtungsraumes in m vor dem EoA
+
+        Raises:
+            ValueError: Anzahl Abschnitte und Geschwindigkeiten nicht konsistent
+            ValueError: Anfangspositionen nicht aufsteigend
+            ValueError: zulässige Geschwindigkeit nicht positiv
+            ValueError: zulässige Geschwindigkeit außerhalb der Stufenfunktionen
+        """
+
+        bounds = np.array(bounds, dtype=float)
+        speeds = np.array(speeds, dtype=float)
+        deceleration = compile_profile(deceleration)
+        acceleration = compile_profile(acceleration)
+        # Datencheck
+        if len(bounds) != len(speeds) or len(bounds) == 0:
+            raise ValueError("ungleiche Anzahl Abschnitte und Geschwindigkeiten")
+        if np.any(np.diff(bounds) <= 0):
+            raise ValueError("Anfangspositionen der Abschnitte nicht aufsteigend")
+        if np.any(speeds <= 0):
+            raise ValueError(f"zulässige Geschwindigkeit nicht positiv ({np.min(speeds)} m/s)")
+        if np.max(speeds) > min(deceleration.max_speed, acceleration.max_speed):
+            raise ValueError(f"zulässige Geschwindigkeit ({np.max(speeds)} m/s) außerhalb der "
+                             "Stufenfunktionen")
+
+        bounds[0] = -np.inf
+        self.origin = float(origin)
+        self.min_speed = acceleration.min_speed
+        self.max_speed = acceleration.max_speed
+        # Teilabschnitte in Fahrtrichtung ab dem Beginn des Betrachtungsraumes
+        limits = {float(start) for profile in (deceleration, acceleration)
+                  if isinstance(profile, SegmentedProfile) for start in profile.bounds}
+        limits = sorted({start for start in limits | set(bounds.tolist())
+                         if -np.inf < start < self.origin}, reverse=True)
+        self.starts = np.array([self.origin, *limits])
+        self.lengths = self.starts - np.append(self.starts[1:], -np.inf)
+        sections = np.maximum(np.searchsorted(bounds, self.starts, side="left") - 1, 0)
+        self.speeds = speeds[sections]
+        self.decelerations = [section_profile(deceleration, start) for start in self.starts]
+        self.accelerations = [section_profile(acceleration, start) for start in self.starts]
+        count = len(self.starts)
+        # zulässige Geschwindigkeit am Ende und zu Beginn je Teilabschnitt (Bremsen vor Absenkung)
+        self.exit_limits = np.empty(count)
+        entry_limits = np.empty(count)
+        following = np.inf
+        for index in range(count-1, -1, -1):
+            self.exit_limits[index] = min(self.speeds[index], following)
+            entry_limits[index] = self.limit(index, self.lengths[index])
+            following = entry_limits[index]
+        # Fahrt ohne Behinderung je Teilabschnitt: Beschleunigen, Beharren, Bremsen
+        self.entry = np.empty(count)
+        self.peak = np.empty(count)
+        self.accel_length = np.empty(count)
+        self.cruise_length = np.empty(count)
+        self.accel_time = np.empty(count)
+        self.cruise_time = np.empty(count)
+        self.exit = np.empty(count)
+        self.time = np.zeros(count)
+        speed = entry_limits[0]
+        for index in range(count):
+            peak, accel_length, brake_length, reached = (
+                value[0] for value in self.shape(index, [speed], [self.lengths[index]]))
+            self.entry[index] = speed
+            self.peak[index] = peak
+            self.accel_length[index] = accel_length
+            self.cruise_length[index] = max(self.lengths[index] - accel_length - brake_length, 0)
+            self.accel_time[index] = self.accelerations[index].change(speed, peak)[1]
+            self.cruise_time[index] = self.cruise_length[index] / peak
+            speed = self.exit_limits[index] if reached else peak
+            self.exit[index] = speed
+            if index + 1 < count:
+                self.time[index+1] = (self.time[index] + self.accel_time[index]
+                                      + self.cruise_time[index]
+                                      + self.decelerations[index].change(peak, speed)[1])
+
+    def piece(self, position):
+        """
+        Bestimmt den Teilabschnitt, der ab einer Position in Fahrtrichtung befahren wird.
+
+        Args:
+            position: Position(en) in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            index: Index des Teilabschnitts (der Teilabschnitte)
+        """
+
+        ascending = self.starts[::-1]
+        index = len(ascending) - 1 - np.searchsorted(ascending, position, side="left")
+
+        return np.clip(index, 0, len(ascending)-1)
+
+    def limit(self, index: int, length) -> np.ndarray:
+        """
+        Zulässige Geschwindigkeit in einer Distanz vor dem Ende eines Teilabschnitts, aus der die
+        zulässige Geschwindigkeit am Ende durch Bremsen noch eingehalten wird.
+
+        Args:
+            index: Index des Teilabschnitts
+            length: Distanz(en) bis zum Ende des Teilabschnitts in m
+
+        Raises:
+            none
+
+        Returns:
+            speed: zulässige Geschwindigkeit(en) in m/s
+        """
+
+        speed, exit_limit = self.speeds[index], self.exit_limits[index]
+        length = np.asarray(length, dtype=float)
+        braking = self.decelerations[index].change(speed, exit_limit)[0]
+        # Geschwindigkeit, aus der über die Distanz auf die Geschwindigkeit am Ende gebremst wird
+        before = self.decelerations[index].speed_after_distance_batch(
+            exit_limit, -np.minimum(length, braking))
+
+        return np.where(length >= braking, speed, np.minimum(before, speed))
+
+    def shape(self, index: int, initial_speed, length) -> tuple[np.ndarray, np.ndarray,
+                                                                np.ndarray, np.ndarray]:
+        """
+        Beschleunigen unterhalb der zulässigen Geschwindigkeit über die Distanz bis zum Ende eines
+        Teilabschnitts. Trifft die Anfahrkurve die zulässige Geschwindigkeit oder die Bremskurve
+        vor einer Absenkung, ist die Fahrt ohne Behinderung erreicht. Da Bremsen und Anfahren
+        innerhalb eines Teilabschnitts in v^2 abschnittsweise linear sind, wird der Schnittpunkt
+        zwischen den Stufen beider Funktionen geschlossen bestimmt.
+
+        Args:
+            index: Index des Teilabschnitts
+            initial_speed: Ausgangsgeschwindigkeiten in m/s (höchstens zulässige Geschwindigkeit)
+            length: Distanzen bis zum Ende des Teilabschnitts in m
+
+        Raises:
+            none
+
+        Returns:
+            peak: höchste Geschwindigkeiten im Teilabschnitt in m/s
+            accel_length: Distanzen des Beschleunigens in m
+            brake_length: Distanzen des Bremsens auf die Geschwindigkeit am Ende in m
+            reached: Fahrt ohne Behinderung erreicht
+        """
+
+        acceleration, deceleration = self.accelerations[index], self.decelerations[index]
+        speed, exit_limit = self.speeds[index], self.exit_limits[index]
+        initial_speed, length = (array.astype(float) for array in np.broadcast_arrays(
+            np.asarray(initial_speed, dtype=float), np.asarray(length, dtype=float)))
+        peak = np.full_like(initial_speed, speed)
+        # Beschleunigen bis zur zulässigen Geschwindigkeit, Beharren und Bremsen vor Absenkung
+        cruise = (acceleration.change_batch(initial_speed, speed)[0]
+                  + deceleration.change(speed, exit_limit)[0] <= length)
+        # Ende des Teilabschnitts unterhalb der zulässigen Geschwindigkeit am Ende
+        below = ~cruise & (initial_speed < exit_limit)
+        below[below] = (acceleration.change_batch(initial_speed[below], exit_limit)[0]
+                        > length[below])
+        peak[below] = acceleration.speed_after_distance_batch(initial_speed[below], length[below])
+        # Schnittpunkt der Anfahrkurve mit der Bremskurve vor der Absenkung
+        meet = ~cruise & ~below
+        if np.any(meet):
+            speed_meet, length_meet = initial_speed[meet], length[meet]
+            low = np.maximum(speed_meet, exit_limit)
+            grid = np.union1d(acceleration.speeds, deceleration.speeds)
+            candidates = np.column_stack([low, np.clip(grid, low[:, None], speed),
+                                          np.full_like(low, speed)])
+            distance = (acceleration.change_batch(speed_meet[:, None], candidates)[0]
+                        + deceleration.change_batch(candidates, exit_limit)[0])
+            rows = np.arange(len(low))
+            lower = np.maximum(np.sum(distance <= length_meet[:, None], axis=1) - 1, 0)
+            upper = np.minimum(lower + 1, candidates.shape[1] - 1)
+            span = distance[rows, upper] - distance[rows, lower]
+            squared_lower = candidates[rows, lower]**2
+            squared_upper = candidates[rows, upper]**2
+            squared = squared_lower + np.divide(
+                (length_meet - distance[rows, lower]) * (squared_upper - squared_lower), span,
+                out=np.zeros_like(span), where=span > 0)
+            peak[meet] = np.sqrt(np.clip(squared, squared_lower, squared_upper))
+        accel_length = np.where(below, length, acceleration.change_batch(initial_speed, peak)[0])
+        brake_length = np.where(below, 0, deceleration.change_batch(peak, exit_limit)[0])
+
+        return peak, accel_length, brake_length, ~below
+
+    def state_batch(self, position) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Geschwindigkeit und Zeit der Fahrt ohne Behinderung an Positionen.
+
+        Args:
+            position: Positionen in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            speed: Geschwindigkeiten in m/s
+            time: Zeiten ab dem Beginn des Betrachtungsraumes in s
+        """
+
+        position = np.asarray(position, dtype=float)
+        index = self.piece(position)
+        offset = self.starts[index] - position
+        speed = np.empty_like(offset)
+        time = np.empty_like(offset)
+        for piece in np.unique(index):
+            mask = index == piece
+            acceleration = self.accelerations[piece]
+            deceleration = self.decelerations[piece]
+            peak = self.peak[piece]
+            length = offset[mask]
+            accelerating = length < self.accel_length[piece]
+            braking = length > self.accel_length[piece] + self.cruise_length[piece]
+            # Beharren mit zulässiger Geschwindigkeit
+            value = np.full(length.shape, peak)
+            elapsed = self.accel_time[piece] + (length - self.accel_length[piece]) / peak
+            # Beschleunigen zu Beginn des Teilabschnitts
+            if np.any(accelerating):
+                value[accelerating] = acceleration.speed_after_distance_batch(
+                    self.entry[piece], length[accelerating])
+                elapsed[accelerating] = acceleration.change_batch(
+                    self.entry[piece], value[accelerating])[1]
+            # Bremsen vor einer Absenkung am Ende des Teilabschnitts
+            if np.any(braking):
+                value[braking] = deceleration.speed_after_distance_batch(
+                    peak, length[braking] - self.accel_length[piece] - self.cruise_length[piece])
+                elapsed[braking] = (self.accel_time[piece] + self.cruise_time[piece]
+                                    + deceleration.change_batch(peak, value[braking])[1])
+            speed[mask] = value
+            time[mask] = self.time[piece] + elapsed
+
+        return speed, time
+
+    def run(self, distance: float, position: float) -> tuple[float, float, list, list, list]:
+        """
+        Fahrt ohne Behinderung ab einer Position über eine Distanz (siehe free_run).
+
+        Args:
+            distance: Distanz in m
+            position: Position zu Beginn in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            distance_travelled: gefahrene Distanz in m
+            time_elapsed: verstrichene Zeit in s
+            distance_steps: markante Punkte - Distanzen in m
+            speed_steps: markante Punkte - Geschwindigkeiten in m/s
+            accel_steps: markante Punkte - Beschleunigungen in m/s^2
+        """
+
+        end = position - distance
+        speed, time = self.state_batch([position, end])
+        # markante Punkte der Phasen je Teilabschnitt (Position, Geschwindigkeit, Beschleunigung
+        # bis zum nächsten Punkt)
+        points = []
+        for index in range(int(self.piece(position)), int(self.piece(end)) + 1):
+            start = self.starts[index]
+            cruise_start = start - self.accel_length[index]
+            steps = self.accelerations[index].steps(self.entry[index], self.peak[index])
+            points.extend((start - step, value, accel) for step, value, accel in zip(*steps))
+            points.append((cruise_start, self.peak[index], 0))
+            steps = self.decelerations[index].steps(self.peak[index], self.exit[index])
+            points.extend((cruise_start - self.cruise_length[index] - step, value, accel)
+                          for step, value, accel in zip(*steps))
+        # Intervalle zwischen Beginn und Ende der Fahrt
+        distance_steps, speed_steps, accel_steps = [0], [float(speed[0])], []
+        for point, (location, value, accel) in enumerate(points):
+            following = points[point+1][0] if point + 1 < len(points) else -np.inf
+            if following >= position or location <= end or following == location:
+                continue
+            if location < position:
+                distance_steps.append(position - location)
+                speed_steps.append(float(value))
+            accel_steps.append(accel)
+        distance_steps.append(distance)
+        speed_steps.append(float(speed[1]))
+
+        return distance, float(time[1] - time[0]), distance_steps, speed_steps, accel_steps
+
+    def cruise_batch(self, distance, speed, time_minimum, position
+                     ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Beharrungsfahrt ab einer Position (siehe cruise_limit_batch). Unterschreitet die Fahrt
+        ohne Behinderung vor einer Absenkung die Geschwindigkeit, folgt der Zug ab dort der
+        Fahrt ohne Behinderung.
+
+        Args:
+            distance: maximale Distanzen in m
+            speed: Geschwindigkeiten in m/s
+            time_minimum: minimale Fahrzeiten in s
+            position: Positionen zu Beginn in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            distance_travelled: gefahrene Distanzen in m
+            time_elapsed: verstrichene Zeiten in s
+            exit_speed: Geschwindigkeiten am Ende in m/s
+        """
+
+        distance, speed, time_minimum, position = (
+            array.astype(float) for array in np.broadcast_arrays(
+                distance, speed, time_minimum, position))
+        distance_travelled, time_elapsed = cruise_batch(distance, speed, time_minimum)
+        exit_speed = speed.copy()
+        meet = self.meet_batch(speed, position)
+        slower = meet < distance_travelled
+        if np.any(slower):
+            end = position[slower] - distance_travelled[slower]
+            speeds, times = self.state_batch(np.concatenate([position[slower] - meet[slower],
+                                                             end]))
+            exit_speed[slower] = speeds[len(end):]
+            time_elapsed[slower] = (meet[slower] / speed[slower] + times[len(end):]
+                                    - times[:len(end)])
+
+        return distance_travelled, time_elapsed, exit_speed
+
+    def meet_batch(self, speed, position) -> np.ndarray:
+        """
+        Distanz ab einer Position, nach der die Fahrt ohne Behinderung vor einer Absenkung unter
+        eine Geschwindigkeit bremst (inf, falls nicht).
+
+        Args:
+            speed: Geschwindigkeiten in m/s
+            position: Positionen in m vor dem EoA
+
+        Raises:
+            none
+
+        Returns:
+            distance: Distanzen in m
+        """
+
+        speed, position = (array.astype(float) for array in np.broadcast_arrays(
+            np.asarray(speed, dtype=float), np.asarray(position, dtype=float)))
+        first = self.piece(position)
+        meet = np.full_like(speed, np.inf)
+        for index in range(int(np.min(first, initial=len(self.starts))), len(self.starts)):
+            active = np.isinf(meet) & (first <= index) & (self.exit[index] < speed)
+            if not np.any(active):
+                continue
+            brake_start = self.starts[index] - self.accel_length[index] - self.cruise_length[index]
+            braking = self.decelerations[index].change_batch(
+                self.peak[index], np.minimum(speed[active], self.peak[index]))[0]
+            meet[active] = np.maximum(position[active] - brake_start + braking, 0)
+
+        return meet
+
+    def open_batch(self, initial_speed, position) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Beschleunigen ab einer Position bis zum Erreichen der Fahrt ohne Behinderung über die
+        Teilabschnitte (siehe speed_change_open_batch).
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeiten in m/s
+            position: Positionen zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Ausgangsgeschwindigkeit über der zulässigen Geschwindigkeit
+
+        Returns:
+            distance_travelled: gefahrene Distanzen in m
+            time_elapsed: verstrichene Zeiten in s
+            exit_speed: Geschwindigkeiten am Ende in m/s
+        """
+
+        initial_speed, position = (array.astype(float) for array in np.broadcast_arrays(
+            np.asarray(initial_speed, dtype=float), np.asarray(position, dtype=float)))
+        first = self.piece(position)
+        length = position - np.append(self.starts[1:], -np.inf)[first]
+        # Datencheck (Rundungsfehler bis zur relativen Toleranz werden begrenzt)
+        limit = np.empty_like(initial_speed)
+        for index in np.unique(first):
+            limit[first == index] = self.limit(index, length[first == index])
+        if np.any(initial_speed > limit * (1 + 1e-9)):
+            raise ValueError(f"Ausgangsgeschwindigkeit über der zulässigen Geschwindigkeit "
+                             f"({np.max(initial_speed - limit)} m/s)")
+        exit_speed = np.minimum(initial_speed, limit)
+        distance_travelled = np.zeros_like(initial_speed)
+        time_elapsed = np.zeros_like(initial_speed)
+        done = np.zeros(initial_speed.shape, dtype=bool)
+        for index in range(int(np.min(first, initial=len(self.starts))), len(self.starts)):
+            active = ~done & (first <= index)
+            if not np.any(active):
+                continue
+            remaining = np.where(first[active] == index, length[active], self.lengths[index])
+            peak, accel_length, _, reached = self.shape(index, exit_speed[active], remaining)
+            distance_travelled[active] += np.where(reached, accel_length, remaining)
+            time_elapsed[active] += self.accelerations[index].change_batch(
+                exit_speed[active], peak)[1]
+            exit_speed[active] = peak
+            done[active] = reached
+
+        return distance_travelled, time_elapsed, exit_speed
+
+    def open(self, initial_speed: float, position: float
+             ) -> tuple[float, float, list, list, list]:
+        """
+        Variante von open_batch für einen Geschwindigkeitswechsel mit markanten Punkten.
+
+        Args:
+            initial_speed: Ausgangsgeschwindigkeit in m/s
+            position: Position zu Beginn in m vor dem EoA
+
+        Raises:
+            ValueError: Ausgangsgeschwindigkeit über der zulässigen Geschwindigkeit
+
+        Returns:
+            distance_travelled: gefahrene Distanz in m
+            time_elapsed: verstrichene Zeit in s
+            distance_steps: markante Punkte - Distanzen in m
+            speed_steps: markante Punkte - Geschwindigkeiten in m/s
+            accel_steps: markante Punkte - Beschleunigungen in m/s^2
+        """
+
+        distance_travelled, time_elapsed, exit_speed = (
+            float(value[0]) for value in self.open_batch([initial_speed], [position]))
+        distance_steps, speed_steps, accel_steps = [0], [initial_speed], []
+        speed, travelled = min(initial_speed, exit_speed), 0
+        for index in range(int(self.piece(position)), len(self.starts)):
+            if travelled >= distance_travelled:
+                break
+            length = min(position - travelled - (self.starts[index+1]
+                                                 if index + 1 < len(self.starts) else -np.inf),
+                         distance_travelled - travelled)
+            if length <= 0:
+                continue
+            acceleration = self.accelerations[index]
+            peak = (exit_speed if travelled + length >= distance_travelled
+                    else float(acceleration.speed_after_distance_batch(speed, length)))
+            steps = acceleration.steps(speed, peak)
+            distance_steps.extend(travelled + step for step in steps[0][1:])
+            speed_steps.extend(steps[1][1:])
+            accel_steps.extend(steps[2])
+            travelled += length
+            speed = peak
+
+        return distance_travelled, time_elapsed, distance_steps, speed_steps, accel_steps
+
+
+def compile_profile(acceleration) -> CompiledProfile | SegmentedProfile | LineSpeedProfile:
+    """
+    Liefert das vorkompilierte Profil einer Stufenfunktion der Beschleunigung. Ist die Eingabe
+    bereits vorkompiliert (auch abschnittsweise), wird sie unverändert zurückgegeben.
+
+    Args:
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile,
+            SegmentedProfile oder LineSpeedProfile
+
+    Raises:
+        ValueError: Stufenfunktion nicht konsistent
+
+    Returns:
+        profile: vorkompiliertes Profil
+    """
+
+    if isinstance(acceleration, (CompiledProfile, SegmentedProfile, LineSpeedProfile)):
+        return acceleration
+
+    return CompiledProfile(acceleration)
+
+
+def compile_segments(bounds: np.ndarray, accelerations: list[np.ndarray]
+                     ) -> CompiledProfile | SegmentedProfile:
+    """
+    Kompiliert die Stufenfunktionen der Beschleunigung je Abschnitt eines Streckenprofils.
+    Aufeinanderfolgende Abschnitte mit gleicher Stufenfunktion werden zusammengefasst, gleiche
+    Stufenfunktionen nur einmal kompiliert. Bleibt ein Abschnitt, wird das einfache Profil
+    zurückgegeben.
+
+    Args:
+        bounds: Anfangspositionen der Abschnitte in m vor dem EoA (aufsteigend)
+        accelerations: Stufenfunktion der Beschleunigung in m/s^2 über m/s je Abschnitt
+
+    Raises:
+        ValueError: Anzahl Abschnitte und Stufenfunktionen nicht konsistent
+        ValueError: Stufenfunktion nicht konsistent
+
+    Returns:
+        profile: vorkompiliertes Profil
     """
-    Berechnet einen Geschwindigkeitswechsel zwischen zwei Geschwindigkeiten ohne Begrenzung.
+
+    if len(bounds) != len(accelerations) or len(bounds) == 0:
+        raise ValueError("ungleiche Anzahl Abschnitte und Stufenfunktionen")
+    compiled = {}
+    starts, profiles, previous = [], [], None
+    for start, acceleration in zip(bounds, accelerations):
+        key = np.asarray(acceleration, dtype=float).tobytes()
+        if key == previous:
+            continue
+        if key not in compiled:
+            compiled[key] = CompiledProfile(acceleration)
+        starts.append(start)
+        profiles.append(compiled[key])
+        previous = key
+    if len(profiles) == 1:
+        return profiles[0]
+
+    return SegmentedProfile(starts, profiles)
+
+
+def section_profile(profile, position: float) -> CompiledProfile:
+    """
+    Liefert das vorkompilierte Profil des Abschnitts, der ab einer Position in Fahrtrichtung
+    befahren wird.
+
+    Args:
+        profile: CompiledProfile oder SegmentedProfile
+        position: Position in m vor dem EoA
+
+    Raises:
+        none
+
+    Returns:
+        profile: vorkompiliertes Profil des Abschnitts
+    """
+
+    if isinstance(profile, SegmentedProfile):
+        return profile.profiles[int(profile.segment(position))]
+
+    return profile
+
+
+def compile_line_speed(bounds: np.ndarray, speeds: np.ndarray, deceleration, acceleration,
+                       origin: float) -> float | LineSpeedProfile:
+    """
+    Kompiliert die zulässigen Geschwindigkeiten je Abschnitt der Strecke. Aufeinanderfolgende
+    Abschnitte mit gleicher Geschwindigkeit werden zusammengefasst. Bleibt ein Abschnitt, wird die
+    konstante Geschwindigkeit zurückgegeben und die Kernel rechnen mit Beharrungsfahrten.
+
+    Args:
+        bounds: Anfangspositionen der Abschnitte in m vor dem EoA (aufsteigend)
+        speeds: zulässige Geschwindigkeit je Abschnitt in m/s
+        deceleration: Bremsen als CompiledProfile oder SegmentedProfile
+        acceleration: Anfahren als CompiledProfile oder SegmentedProfile
+        origin: Beginn des Betrachtungsraumes in m vor dem EoA
+
+    Raises:
+        ValueError: Anzahl Abschnitte und Geschwindigkeiten nicht konsistent
+        ValueError: zulässige Geschwindigkeit nicht positiv
+
+    Returns:
+        speed: zulässige Geschwindigkeit in m/s oder LineSpeedProfile
+    """
+
+    if len(bounds) != len(speeds) or len(bounds) == 0:
+        raise ValueError("ungleiche Anzahl Abschnitte und Geschwindigkeiten")
+    keep = np.ones(len(speeds), dtype=bool)
+    keep[1:] = np.diff(speeds) != 0
+    if np.count_nonzero(keep) == 1:
+        if speeds[0] <= 0:
+            raise ValueError(f"zulässige Geschwindigkeit nicht positiv ({speeds[0]} m/s)")
+        return speeds[0]
+
+    return LineSpeedProfile(np.asarray(bounds)[keep], np.asarray(speeds)[keep], deceleration,
+                            acceleration, origin)
+
+
+@instrumentation.counted
+def speed_change_open(initial_speed: float, target_speed: float, acceleration: np.ndarray,
+                      position: float = 0) -> tuple[float, float, np.ndarray, np.ndarray,
+                                                    np.ndarray]:
+    """
+    Berechnet einen Geschwindigkeitswechsel zwischen zwei Geschwindigkeiten ohne Begrenzung. Bei
+    LineSpeedProfile endet das Beschleunigen mit Erreichen der Fahrt ohne Behinderung.
 
     Args:
         initial_speed: Ausgangsgeschwindigkeit in m/s
         target_speed: Zielgeschwindigkeit in m/s
-        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile,
+            SegmentedProfile oder LineSpeedProfile
+        position: Position zu Beginn in m vor dem EoA (nur bei SegmentedProfile und
+            LineSpeedProfile relevant)
 
     Raises:
         ValueError: Ausgangsgeschwindigkeit negativ
@@ -97,62 +1322,34 @@ def speed_change_open(initial_speed: float, target_speed: float, acceleration: n
         accel_steps: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    profile = compile_profile(acceleration)
     # Datencheck
     if initial_speed < 0:
         raise ValueError(f"Wert für 'initial_speed'  negativ ({initial_speed} m/s)")
     if target_speed < 0:
         raise ValueError(f"Wert für 'target_speed' negativ ({target_speed} m/s)")
-    if np.max(acceleration[0, :]) < target_speed:
+    if profile.max_speed < target_speed:
         raise ValueError(f"Zielgeschwindigkeit ({target_speed} m/s) nicht erreichbar")
+    # Streckenprofil: abschnittsweise ohne Distanzlimit
+    if isinstance(profile, SegmentedProfile):
+        distance_travelled, time_elapsed, _, distance_steps, speed_steps, \
+            accel_steps = profile.limit(initial_speed, target_speed, math.inf, position)
+        return distance_travelled, time_elapsed, distance_steps, speed_steps, accel_steps
+    # Streckengeschwindigkeit: abschnittsweise bis zur Fahrt ohne Behinderung
+    if isinstance(profile, LineSpeedProfile):
+        return profile.open(initial_speed, position)
 
-    # Index in Liste der Beschleunigungen bestimmen
-    if target_speed >= initial_speed:
-        index = np.argmax(acceleration[0] > initial_speed)
-    else:
-        index = np.argmin(acceleration[0] < initial_speed)
-
-    # Initialisierung
-    speed = initial_speed
-    time_elapsed = 0
-    distance_travelled = 0
-    distance_steps = [0]
-    speed_steps = [initial_speed]
-    accel_steps = []
-    # Iteration bis Zielgeschwindigkeit erreicht ist
-    while speed != target_speed:
-        # Geschwindigkeitsdifferenz bis Zielgeschwindigkeit
-        if target_speed >= initial_speed:
-            delta_speed = np.minimum(acceleration[0, index], target_speed) - speed
-        else:
-            delta_speed = np.maximum(acceleration[0, index-1], target_speed) - speed
-
-        # Zeit und Distanz bis Geschwindigkeitswechsel durchgeführt ist
-        delta_time = delta_speed / acceleration[1, index]
-        delta_distance = 0.5*acceleration[1, index]*(delta_time**2) + speed*delta_time
-        # Geschwindigkeit nach Iteration
-        if target_speed >= initial_speed:
-            speed = np.minimum(acceleration[0, index], target_speed)
-        else:
-            speed = np.maximum(acceleration[0, index-1], target_speed)
-
-        # Iterationsergebnisse sichern
-        time_elapsed += delta_time
-        distance_travelled += delta_distance
-        distance_steps.append(distance_steps[-1] + delta_distance)
-        speed_steps.append(speed)
-        accel_steps.append(acceleration[1, index])
-        # Index in Liste der Beschleunigungswerte
-        if target_speed >= initial_speed:
-            index += 1
-        else:
-            index -= 1
+    # Summen und markante Punkte aus dem vorkompilierten Profil
+    distance_travelled, time_elapsed = profile.change(initial_speed, target_speed)
+    distance_steps, speed_steps, accel_steps = profile.steps(initial_speed, target_speed)
 
     return distance_travelled, time_elapsed, distance_steps, speed_steps, accel_steps
 
 
+@instrumentation.counted
 def speed_change_limit(initial_speed: float, target_speed: float, acceleration: np.ndarray,
-                       distance_limit: float) -> tuple[float, float, float, np.ndarray,
-                                                       np.ndarray, np.ndarray]:
+                       distance_limit: float, position: float = 0
+                       ) -> tuple[float, float, float, np.ndarray, np.ndarray, np.ndarray]:
     """
     Berechnet einen Geschwindigkeitswechsel zwischen zwei Geschwindigkeiten mit Distanzlimit. Mit
     Erreichen des Limit wird keine weitere Geschwindigkeitsänderung mehr vorgenommen. Wird die
@@ -161,8 +1358,10 @@ def speed_change_limit(initial_speed: float, target_speed: float, acceleration:
     Args:
         initial_speed: Ausgangsgeschwindigkeit in m/s
         target_speed: Zielgeschwindigkeit in m/s
-        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile oder
+            SegmentedProfile
         distance_limit: Distanzlimit in m
+        position: Position zu Beginn in m vor dem EoA (nur bei SegmentedProfile relevant)
 
     Raises:
         ValueError: Ausgangsgeschwindigkeit negativ
@@ -178,6 +1377,7 @@ def speed_change_limit(initial_speed: float, target_speed: float, acceleration:
         accel_steps: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    profile = compile_profile(acceleration)
     # Datencheck
     if initial_speed < 0:
         raise ValueError(f"Wert für 'initial_speed' negativ ({initial_speed} m/s)")
@@ -185,39 +1385,34 @@ def speed_change_limit(initial_speed: float, target_speed: float, acceleration:
         raise ValueError(f"Wert für 'target_speed' negativ ({target_speed} m/s)")
     if distance_limit < 0:
         raise ValueError(f"Wert für 'distance_limit' negativ ({distance_limit} m)")
+    # Streckenprofil: abschnittsweise
+    if isinstance(profile, SegmentedProfile):
+        return profile.limit(initial_speed, target_speed, distance_limit, position)
 
     # Vergleichsrechnung Geschwindigkeitswechsel ohne Restriktion der Distanz
-    distance_travelled, time_elapsed, distance_steps, speed_steps, \
-        accel_steps = speed_change_open(initial_speed, target_speed, acceleration)
+    distance_open = profile.change(initial_speed, target_speed)[0]
 
-    if distance_travelled <= distance_limit:  # Vorgegebene Restriktion ist nicht relevant
+    if distance_open <= distance_limit:  # Vorgegebene Restriktion ist nicht relevant
+        distance_travelled, time_elapsed, distance_steps, speed_steps, \
+            accel_steps = speed_change_open(initial_speed, target_speed, profile)
         exit_speed = target_speed
     else:  # vorgegebene Restruktion ist relevant
-        # markante Punkte des offenen Geschwindigkeitswechsels einkürzen
-        trunc = np.searchsorted(distance_steps, distance_limit)
-        distance_steps = distance_steps[0:trunc]
-        speed_steps = speed_steps[0:trunc]
-        accel_steps = accel_steps[0:trunc]
+        # Geschwindigkeit bei Erreichen des Distanzlimits
+        exit_speed = profile.speed_after_distance(initial_speed, target_speed, distance_limit)
         distance_travelled = distance_limit
-        # Reststück berechnen
-        delta_distance = distance_travelled - distance_steps[-1]
-        delta_time = -speed_steps[-1]/accel_steps[-1] - math.sqrt(
-            (speed_steps[-1]/accel_steps[-1])**2+2*delta_distance/accel_steps[-1])
-        exit_speed = speed_steps[-1] + accel_steps[-1]*delta_time
-        # Ende des Geschwindigkeitswechsels speichern
-        speed_steps.append(exit_speed)
-        distance_steps.append(distance_travelled)
-        # Fahrzeit berechnen
-        time_elapsed = 0
-        for i in range(len(speed_steps)-1):
-            time_elapsed = time_elapsed + (speed_steps[i+1]-speed_steps[i])/accel_steps[i]
+        time_elapsed = profile.change(initial_speed, exit_speed)[1]
+        # markante Punkte bis zum Distanzlimit
+        distance_steps, speed_steps, accel_steps = profile.steps(initial_speed, exit_speed)
+        distance_steps[-1] = distance_travelled
 
     return distance_travelled, time_elapsed, exit_speed, distance_steps, speed_steps, accel_steps
 
 
+@instrumentation.counted
 def speed_change_fixed_time(initial_speed: float, target_speed: float, acceleration: np.ndarray,
-                            time_fixed: float, processing_time: float) -> tuple[
-                                float, float, float, float, np.ndarray, np.ndarray, np.ndarray]:
+                            time_fixed: float, processing_time: float, position: float = 0
+                            ) -> tuple[float, float, float, float, np.ndarray, np.ndarray,
+                                       np.ndarray]:
     """
     Berechnet einen Geschwindigkeitswechsel zwischen zwei Geschwindigkeit mit Zeitlimit. Mit
     Erreichen des Limit wird keine weitere Geschwindigkeitsänderung mehr vorgenommen.  Wird die
@@ -227,9 +1422,11 @@ def speed_change_fixed_time(initial_speed: float, target_speed: float, accelerat
     Args:
         initial_speed: Ausgangsgeschwindigkeit in m/s
         target_speed: Zielgeschwindigkeit in m/s
-        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile oder
+            SegmentedProfile
         time_fixed: Zeitvorgabe für die Dauer des Vorgangs in s
         processing_time: Verarbeitungszeit der OBU in s
+        position: Position zu Beginn in m vor dem EoA (nur bei SegmentedProfile relevant)
 
     Raises:
         ValueError: Ausgangsgeschwindigkeit negativ
@@ -247,6 +1444,7 @@ def speed_change_fixed_time(initial_speed: float, target_speed: float, accelerat
         accel_steps: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    profile = compile_profile(acceleration)
     # Datencheck
     if initial_speed < 0:
         raise ValueError(f"Wert für 'initial_speed' negativ ({initial_speed} m/s)")
@@ -254,6 +1452,10 @@ def speed_change_fixed_time(initial_speed: float, target_speed: float, accelerat
         raise ValueError(f"Wert für 'target_speed' negativ ({target_speed} m/s)")
     if time_fixed < 0:
         raise ValueError(f"Wert für 'time_fixed' negativ ({time_fixed} s)")
+    # Streckenprofil: abschnittsweise
+    if isinstance(profile, SegmentedProfile):
+        return profile.fixed_time(initial_speed, target_speed, time_fixed, processing_time,
+                                  position)
 
     # Initialisierung
     distance_steps = [0]
@@ -284,11 +1486,13 @@ def speed_change_fixed_time(initial_speed: float, target_speed: float, accelerat
         return distance_travelled, time_elapsed, target_speed, time_cruise, distance_steps, \
             speed_steps, accel_steps
 
-    # vollständigen Geschwindigkeitswechsel berechnen
-    distance_speed_change, time_speed_change, distance_steps_change, speed_steps_change, \
-        accel_steps_change = speed_change_open(initial_speed, target_speed, acceleration)
+    # Dauer des vollständigen Geschwindigkeitswechsels
+    time_speed_change = profile.change(initial_speed, target_speed)[1]
 
     if time_speed_change <= time_fixed:  # vollständiger Geschwindigkeitswechsel möglich
+        # vollständigen Geschwindigkeitswechsel berechnen
+        distance_speed_change, time_speed_change, distance_steps_change, speed_steps_change, \
+            accel_steps_change = speed_change_open(initial_speed, target_speed, profile)
         # Beharrungsfahrt nach Ende Geschwindigkeitswechsel
         exit_speed = target_speed
         time_processing_remaining = processing_time - time_speed_change
@@ -305,35 +1509,359 @@ def speed_change_fixed_time(initial_speed: float, target_speed: float, accelerat
         time_elapsed = time_speed_change + time_process
         time_cruise = time_process
     else:  # vollständiger Geschwindigkeitswechsel nicht möglich
-        # Initialisierung
         time_cruise = 0
-        incremental_time = 0
-        test_time = 0
-        trunc = 0
-        # Iteration bis Zeitlimit erreicht ist
-        while test_time < time_fixed:
-            incremental_time = test_time
-            test_time = incremental_time + ((speed_steps_change[trunc+1]-speed_steps_change[trunc])
-                                            / accel_steps_change[trunc])
-            trunc += 1
-
-        # markante Punkte berechnen
-        distance_steps_change = distance_steps_change[0:trunc]
-        speed_steps_change = speed_steps_change[0:trunc]
-        accel_steps_change = accel_steps_change[0:trunc]
-        delta_time = time_fixed - incremental_time
-        delta_speed = speed_steps_change[-1] + accel_steps_change[-1]*delta_time
-        delta_distance = (distance_steps_change[-1] + speed_steps_change[-1]*delta_time
-                          + 0.5*accel_steps_change[-1]*(delta_time**2))
-        # markante Punkte speichern
-        distance_steps_change.append(delta_distance)
-        speed_steps_change.append(delta_speed)
-        distance_steps = distance_steps_change
-        speed_steps = speed_steps_change
-        accel_steps = accel_steps_change
         # Zustand nach Ablauf des Zeitlimits
+        exit_speed = profile.speed_after_time(initial_speed, target_speed, time_fixed)
+        # markante Punkte bis zum Zeitlimit
+        distance_steps, speed_steps, accel_steps = profile.steps(initial_speed, exit_speed)
         distance_travelled = distance_steps[-1]
-        exit_speed = speed_steps[-1]
 
     return distance_travelled, time_elapsed, exit_speed, time_cruise, distance_steps, \
         speed_steps, accel_steps
+
+
+@instrumentation.counted
+def free_run(distance: float, speed, position: float = 0
+             ) -> tuple[float, float, list, list, list]:
+    """
+    Berechnet eine Fahrt ohne Behinderung mit der zulässigen Geschwindigkeit über eine Distanz.
+
+    Args:
+        distance: Distanz in m
+        speed: zulässige Geschwindigkeit in m/s oder LineSpeedProfile
+        position: Position zu Beginn in m vor dem EoA (nur bei LineSpeedProfile relevant)
+
+    Raises:
+        ValueError: Distanz negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanz in m
+        time_elapsed: verstrichene Zeit in s
+        distance_steps: markante Punkte - Distanzen in m
+        speed_steps: markante Punkte - Geschwindigkeiten in m/s
+        accel_steps: markante Punkte - Beschleunigungen in m/s^2
+    """
+
+    # Streckengeschwindigkeit: Differenz der vorberechneten Zeiten
+    if isinstance(speed, LineSpeedProfile):
+        if distance < 0:
+            raise ValueError(f"Wert für 'distance' negativ ({distance} m)")
+        return speed.run(distance, position)
+
+    distance_travelled, time_elapsed = cruise(distance, speed, 0)
+
+    return distance_travelled, time_elapsed, [0, distance_travelled], [speed, speed], [0]
+
+
+@instrumentation.counted
+def cruise_limit(distance: float, speed: float, time_minimum: float, line_speed,
+                 position: float = 0) -> tuple[float, float, float, list, list, list]:
+    """
+    Berechnet eine Beharrungsfahrt über definierte Strecke und Zeit, die durch die zulässige
+    Geschwindigkeit begrenzt ist. Bremst die Fahrt ohne Behinderung vor einer Absenkung unter die
+    Geschwindigkeit, folgt der Zug ab dort der Fahrt ohne Behinderung.
+
+    Args:
+        distance: maximale Distanz in m
+        speed: Geschwindigkeit in m/s
+        time_minimum: minimale Fahrzeit in s
+        line_speed: zulässige Geschwindigkeit in m/s oder LineSpeedProfile
+        position: Position zu Beginn in m vor dem EoA (nur bei LineSpeedProfile relevant)
+
+    Raises:
+        ValueError: Distanz negativ
+        ValueError: Geschwindigkeit negativ
+        ValueError: Zeit negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanz in m
+        time_elapsed: verstrichene Zeit in s
+        exit_speed: Geschwindigkeit am Ende in m/s
+        distance_steps: markante Punkte - Distanzen in m
+        speed_steps: markante Punkte - Geschwindigkeiten in m/s
+        accel_steps: markante Punkte - Beschleunigungen in m/s^2
+    """
+
+    distance_travelled, time_elapsed = cruise(distance, speed, time_minimum)
+    # Streckengeschwindigkeit: Übergang in die Fahrt ohne Behinderung
+    if isinstance(line_speed, LineSpeedProfile):
+        meet = float(line_speed.meet_batch(speed, position))
+        if meet < distance_travelled:
+            _, time_free, distance_steps, speed_steps, accel_steps = line_speed.run(
+                distance_travelled - meet, position - meet)
+            return distance_travelled, meet/speed + time_free, speed_steps[-1], \
+                [0, *(meet + step for step in distance_steps)], [speed, *speed_steps], \
+                [0, *accel_steps]
+
+    return distance_travelled, time_elapsed, speed, [0, distance_travelled], [speed, speed], [0]
+
+
+@instrumentation.counted
+def cruise_batch(distance: np.ndarray, speed: np.ndarray, time_minimum: np.ndarray
+                 ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von cruise für Felder von Distanzen, Geschwindigkeiten und Zeiten.
+
+    Args:
+        distance: maximale Distanzen in m
+        speed: Geschwindigkeiten in m/s
+        time_minimum: minimale Fahrzeiten in s
+
+    Raises:
+        ValueError: Distanz negativ
+        ValueError: Geschwindigkeit negativ
+        ValueError: Zeit negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+    """
+
+    # Datencheck
+    if np.any(np.asarray(distance) < 0):
+        raise ValueError(f"Wert für 'distance' negativ ({np.min(distance)} m)")
+    if np.any(np.asarray(speed) < 0):
+        raise ValueError(f"Wert für 'speed' negativ ({np.min(speed)} m/s)")
+    if np.any(np.asarray(time_minimum) < 0):
+        raise ValueError(f"Wert für 'time_minimum' negativ ({np.min(time_minimum)} s)")
+    # Berechnung
+    time_elapsed = np.maximum(distance/speed, time_minimum)
+    distance_travelled = time_elapsed * speed
+
+    return distance_travelled, time_elapsed
+
+
+@instrumentation.counted
+def speed_change_open_batch(initial_speed: np.ndarray, target_speed: np.ndarray,
+                            acceleration: np.ndarray, position: np.ndarray = 0
+                            ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von speed_change_open ohne markante Punkte.
+
+    Args:
+        initial_speed: Ausgangsgeschwindigkeiten in m/s
+        target_speed: Zielgeschwindigkeiten in m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile,
+            SegmentedProfile oder LineSpeedProfile
+        position: Positionen zu Beginn in m vor dem EoA (nur bei SegmentedProfile und
+            LineSpeedProfile relevant)
+
+    Raises:
+        ValueError: Ausgangsgeschwindigkeit negativ
+        ValueError: Zielgeschwindigkeit negativ
+        ValueError: Zielgeschwindigkeit nicht erreichbar
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+    """
+
+    profile = compile_profile(acceleration)
+    # Datencheck
+    if np.any(np.asarray(initial_speed) < 0):
+        raise ValueError(f"Wert für 'initial_speed' negativ ({np.min(initial_speed)} m/s)")
+    if np.any(np.asarray(target_speed) < 0):
+        raise ValueError(f"Wert für 'target_speed' negativ ({np.min(target_speed)} m/s)")
+    if np.any(profile.max_speed < np.asarray(target_speed)):
+        raise ValueError(f"Zielgeschwindigkeit ({np.max(target_speed)} m/s) nicht erreichbar")
+    # Streckenprofil: abschnittsweise ohne Distanzlimit
+    if isinstance(profile, SegmentedProfile):
+        return profile.limit_batch(initial_speed, target_speed, math.inf, position)[:2]
+    # Streckengeschwindigkeit: abschnittsweise bis zur Fahrt ohne Behinderung
+    if isinstance(profile, LineSpeedProfile):
+        return profile.open_batch(initial_speed, position)[:2]
+
+    return profile.change_batch(initial_speed, target_speed)
+
+
+@instrumentation.counted
+def speed_change_limit_batch(initial_speed: np.ndarray, target_speed: np.ndarray,
+                             acceleration: np.ndarray, distance_limit: np.ndarray,
+                             position: np.ndarray = 0
+                             ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von speed_change_limit ohne markante Punkte.
+
+    Args:
+        initial_speed: Ausgangsgeschwindigkeiten in m/s
+        target_speed: Zielgeschwindigkeiten in m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile oder
+            SegmentedProfile
+        distance_limit: Distanzlimits in m
+        position: Positionen zu Beginn in m vor dem EoA (nur bei SegmentedProfile relevant)
+
+    Raises:
+        ValueError: Ausgangsgeschwindigkeit negativ
+        ValueError: Zielgeschwindigkeit negativ
+        ValueError: Distanzlimit negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+        exit_speed: Geschwindigkeiten am Ende in m/s
+    """
+
+    profile = compile_profile(acceleration)
+    # Datencheck
+    if np.any(np.asarray(initial_speed) < 0):
+        raise ValueError(f"Wert für 'initial_speed' negativ ({np.min(initial_speed)} m/s)")
+    if np.any(np.asarray(target_speed) < 0):
+        raise ValueError(f"Wert für 'target_speed' negativ ({np.min(target_speed)} m/s)")
+    if np.any(np.asarray(distance_limit) < 0):
+        raise ValueError(f"Wert für 'distance_limit' negativ ({np.min(distance_limit)} m)")
+    # Streckenprofil: abschnittsweise
+    if isinstance(profile, SegmentedProfile):
+        return profile.limit_batch(initial_speed, target_speed, distance_limit, position)
+
+    # Vergleichsrechnung Geschwindigkeitswechsel ohne Restriktion der Distanz
+    distance_open, time_open = profile.change_batch(initial_speed, target_speed)
+    limited = distance_open > distance_limit
+    # Geschwindigkeit bei Erreichen des Distanzlimits
+    exit_speed = np.where(limited, profile.speed_after_distance_batch(initial_speed,
+                                                                      distance_limit),
+                          target_speed)
+    distance_travelled = np.where(limited, distance_limit, distance_open)
+    time_elapsed = np.where(limited, profile.change_batch(initial_speed, exit_speed)[1], time_open)
+
+    return distance_travelled, time_elapsed, exit_speed
+
+
+@instrumentation.counted
+def speed_change_fixed_time_batch(initial_speed: np.ndarray, target_speed: float,
+                                  acceleration: np.ndarray, time_fixed: float,
+                                  processing_time: float, position: np.ndarray = 0
+                                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von speed_change_fixed_time ohne markante Punkte.
+
+    Args:
+        initial_speed: Ausgangsgeschwindigkeiten in m/s
+        target_speed: Zielgeschwindigkeit in m/s
+        acceleration: Stufenfunktion der Beschleunigung in m/s^2 über m/s, CompiledProfile oder
+            SegmentedProfile
+        time_fixed: Zeitvorgabe für die Dauer des Vorgangs in s
+        processing_time: Verarbeitungszeit der OBU in s
+        position: Positionen zu Beginn in m vor dem EoA (nur bei SegmentedProfile relevant)
+
+    Raises:
+        ValueError: Ausgangsgeschwindigkeit negativ
+        ValueError: Zielgeschwindigkeit negativ
+        ValueError: Zeitlimit negativ
+        ValueError: Verarbeitungszeit kürzer als vollständiger Geschwindigkeitswechsel
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+        exit_speed: Geschwindigkeiten am Ende in m/s
+        time_cruise: Beharrungsfahrzeiten nach Beendigung des Geschwindigkeitswechsels in s
+    """
+
+    profile = compile_profile(acceleration)
+    initial_speed = np.asarray(initial_speed, dtype=float)
+    # Datencheck
+    if np.any(initial_speed < 0):
+        raise ValueError(f"Wert für 'initial_speed' negativ ({np.min(initial_speed)} m/s)")
+    if target_speed < 0:
+        raise ValueError(f"Wert für 'target_speed' negativ ({target_speed} m/s)")
+    if time_fixed < 0:
+        raise ValueError(f"Wert für 'time_fixed' negativ ({time_fixed} s)")
+    # Streckenprofil: abschnittsweise
+    if isinstance(profile, SegmentedProfile):
+        return profile.fixed_time_batch(initial_speed, target_speed, time_fixed, processing_time,
+                                        position)
+
+    # Dauer 0s
+    if time_fixed == 0:
+        zeros = np.zeros_like(initial_speed)
+        return zeros, zeros + time_fixed, initial_speed, zeros
+
+    # Zielgeschwindigkeit bereits erreicht: Beharrungsfahrt
+    reached = initial_speed == target_speed
+    # vollständiger Geschwindigkeitswechsel möglich
+    distance_change, time_change = profile.change_batch(initial_speed, target_speed)
+    complete = ~reached & (time_change <= time_fixed)
+    time_processing_remaining = processing_time - time_change
+    if np.any(complete & (time_processing_remaining < 0)):
+        raise ValueError(f"Wert für 'time' negativ ({np.min(time_processing_remaining)} s)")
+    # vollständiger Geschwindigkeitswechsel nicht möglich: Zustand nach Ablauf des Zeitlimits
+    partial = ~reached & ~complete
+    partial_speed = profile.speed_after_time_batch(initial_speed, time_fixed)
+    partial_speed = np.where(partial, partial_speed, initial_speed)
+    partial_distance = profile.change_batch(initial_speed, partial_speed)[0]
+
+    # Zusammenführen der drei Fälle
+    distance_travelled = np.select(
+        [reached, complete],
+        [time_fixed*target_speed, distance_change + time_processing_remaining*target_speed],
+        partial_distance)
+    time_elapsed = np.select([reached, complete],
+                             [time_fixed, time_change + time_processing_remaining], time_fixed)
+    exit_speed = np.select([reached, complete], [target_speed, target_speed], partial_speed)
+    time_cruise = np.select([reached, complete], [time_fixed, time_processing_remaining], 0)
+
+    return distance_travelled, time_elapsed, exit_speed, time_cruise
+
+
+@instrumentation.counted
+def free_run_batch(distance: np.ndarray, speed, position: np.ndarray = 0
+                   ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von free_run ohne markante Punkte.
+
+    Args:
+        distance: Distanzen in m
+        speed: zulässige Geschwindigkeit in m/s oder LineSpeedProfile
+        position: Positionen zu Beginn in m vor dem EoA (nur bei LineSpeedProfile relevant)
+
+    Raises:
+        ValueError: Distanz negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+    """
+
+    # Streckengeschwindigkeit: Differenz der vorberechneten Zeiten
+    if isinstance(speed, LineSpeedProfile):
+        distance, position = (array.astype(float) for array in np.broadcast_arrays(
+            distance, position))
+        if np.any(distance < 0):
+            raise ValueError(f"Wert für 'distance' negativ ({np.min(distance)} m)")
+        time = speed.state_batch(np.concatenate([position, position - distance]))[1]
+        return distance, time[len(distance):] - time[:len(distance)]
+
+    return cruise_batch(distance, speed, 0)
+
+
+@instrumentation.counted
+def cruise_limit_batch(distance: np.ndarray, speed: np.ndarray, time_minimum: np.ndarray,
+                       line_speed, position: np.ndarray = 0
+                       ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Elementweise Variante von cruise_limit ohne markante Punkte.
+
+    Args:
+        distance: maximale Distanzen in m
+        speed: Geschwindigkeiten in m/s
+        time_minimum: minimale Fahrzeiten in s
+        line_speed: zulässige Geschwindigkeit in m/s oder LineSpeedProfile
+        position: Positionen zu Beginn in m vor dem EoA (nur bei LineSpeedProfile relevant)
+
+    Raises:
+        ValueError: Distanz negativ
+        ValueError: Geschwindigkeit negativ
+        ValueError: Zeit negativ
+
+    Returns:
+        distance_travelled: gefahrene Distanzen in m
+        time_elapsed: verstrichene Zeiten in s
+        exit_speed: Geschwindigkeiten am Ende in m/s
+    """
+
+    # Streckengeschwindigkeit: Übergang in die Fahrt ohne Behinderung
+    if isinstance(line_speed, LineSpeedProfile):
+        return line_speed.cruise_batch(distance, speed, time_minimum, position)
+
+    distance_travelled, time_elapsed = cruise_batch(distance, speed, time_minimum)
+
+    return distance_travelled, time_elapsed, np.full_like(time_elapsed, speed)
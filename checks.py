@@ -1,8 +1,12 @@
 """
-Version 1.02
+Version 1.06
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 1.06, 2026-10-17 cw: Profil der Streckengeschwindigkeit, Bremsung ab IP mit Geschwindigkeit am IP
+- 1.05, 2026-10-17 cw: Bremsung ab IP über das Gradientenprofil
+- 1.04, 2026-10-17 cw: Beliebige Anzahl Infill-Balisengruppen ab 2
+- 1.03, 2026-10-17 cw: Prüfung der Anzahl Prozesse für die parallele Suche
 - 1.02, 2024-04-08 cw: PEP 8 Konformität
 - 1.01, 2024-04-05 cw: Zusätzliche Prüfung, ob zwischen IP & EOA auf 0 km/h gebremst werden kann
 - 1.00, 2023-07-12 cw: Initialer Stand mit Dokumentation und Versionierung
@@ -22,11 +26,14 @@ def checks(input, totals) -> None:
         totals: Klasse der verrechneten Parameter
 
     Raises:
-        ValueError: Anzahl Balisengruppen nicht 2 oder 3
+        ValueError: Anzahl Balisengruppen kleiner als 2
+        ValueError: Anzahl Balisenpositionen kleiner als Anzahl Balisengruppen
+        ValueError: Streckengeschwindigkeit kleiner als Release Speed
         ValueError: Bremsbeschleunigung größer als 0
         ValueError: Anfahrbeschleunigung kleiner als 0
         ValueError: Mindestbeharrungsfahrzeit negativ
         ValueError: Verarbeitungszeit negativ
+        ValueError: Anzahl Prozesse kleiner als 1
         ValueError: resultierende Bremsbeschleunigung größer als 0
         ValueError: resultierende Anfahrbeschleunigung kleiner als 0
         ValueError: Indication Point und Bremsbeschleunigung nicht kompatibel
@@ -36,8 +43,14 @@ def checks(input, totals) -> None:
     """
 
     # direkte Prüfung der Inputdaten
-    if input.track_balises not in [2, 3]:
+    if not isinstance(input.track_balises, int) or input.track_balises < 2:
         raise ValueError("Anzahl zusätzlicher Infill-Balisengruppen nicht unterstützt")
+    if len(input.track_balise_positions) < input.track_balises:
+        raise ValueError(f"Anzahl Balisenpositionen ({len(input.track_balise_positions)}) kleiner "
+                         f"als Anzahl Balisengruppen ({input.track_balises})")
+    if np.min(input.track_line_speed_profile[1]) < input.track_release_speed:
+        raise ValueError(f"Streckengeschwindigkeit ({np.min(input.track_line_speed_profile[1])} "
+                         f"km/h) kleiner als Release Speed ({input.track_release_speed} km/h)")
     if np.max(input.train_deceleration[1]) > 0:
         raise ValueError("Bremsbeschleunigung größer als 0")
     if np.min(input.train_acceleration[1]) < 0:
@@ -46,6 +59,8 @@ def checks(input, totals) -> None:
         raise ValueError(f"Mindestbeharrungsfahrzeit negativ ({input.train_min_cruise_time} s)")
     if input.train_processing_time < 0:
         raise ValueError(f"Verarbeitungszeit negativ ({input.train_processing_time} s)")
+    if not isinstance(input.tech_workers, int) or input.tech_workers < 1:
+        raise ValueError(f"Anzahl Prozesse kleiner als 1 ({input.tech_workers})")
 
     # Prüfung der verarbeiteten Inputdaten
     if np.max(totals.train_deceleration[1]) > 0:
@@ -54,6 +69,6 @@ def checks(input, totals) -> None:
         raise ValueError("Anfahrvermögen zu gering oder Steigung zu groß")
 
     # Prüfung, ob ab IP Bremsung bis 0 km/h vor EOA möglich ist
-    if calc.speed_change_open(totals.train_speed, 0,
-                              totals.train_deceleration)[0] > input.train_indication_point:
+    if calc.speed_change_open(totals.train_approach_speed, 0, totals.train_deceleration_profile,
+                              input.train_indication_point)[0] > input.train_indication_point:
         raise ValueError("Bremsung auf 0 km/h ab IP nicht möglich. Parameter überprüfen")
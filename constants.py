@@ -1,8 +1,9 @@
 """
-Version 1.01
+Version 1.02
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 1.02, 2026-10-17 cw: Toleranz der adaptiven Trajektoriendarstellung
 - 1.01, 2024-04-08 cw: PEP 8 Konformität
 - 1.00, 2023-07-12 cw: Initialer Stand mit Versionierung
 """
@@ -11,3 +12,4 @@ CONVERT_KPH_MPS = 1/3.6  # Faktor von km/h zu m/s
 CONVERT_MPS_KPH = 3.6  # Faktor von m/s zu km/h
 G = 9.81  # m/s^2 - Erdbeschleunigung
 SCALE = 100  # cm/m - Skalierung für Plots
+RENDER_TOLERANCE = 0.05  # km/h - maximale Abweichung der geplotteten Trajektorien
@@ -0,0 +1,186 @@
+"""
+Version 1.03
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.03, 2026-10-17 cw: Signaturen mit Geschwindigkeit am IP und zulässiger Geschwindigkeit
+- 1.02, 2026-10-17 cw: Signaturen aus verrechneten Größen (maßgebende Geschwindigkeit, Kurven)
+- 1.01, 2026-10-17 cw: Beschleunigen abhängig von der Mindestbeharrungsfahrt (Startposition)
+- 1.00, 2026-10-17 cw: Abschnittsergebnisse je Infill-Position für die inkrementelle Optimierung
+"""
+
+import copy
+import json
+import numpy as np
+
+# Abschnitte der Trajektorie bei Aufwertung vor dem Indication Point, die Stufenfunktionen
+# auswerten, mit den Parametern der Parameter-JSON, von denen sie direkt abhängen (Reihenfolge der
+# Parameterstudie), den Größen, aus denen ihre Signatur gebildet wird (verrechnete Größen aus
+# Totals als "totals.name"), und den vorgelagerten Abschnitten, deren Ergebnisse sie verwenden.
+# Annäherung, Beharrungsfahrten und Summen sind elementweise und werden stets neu berechnet.
+STAGES = {
+    # Bremsen vom Indication Point bis zur Infill-Balisengruppe (inkl. Bremskurve und Gradiente,
+    # Geschwindigkeit am IP hängt über den Betrachtungsraum von den Balisenpositionen ab)
+    "decel": (["track.line_speed", "track.release_speed", "track.gradient",
+               "track.balise_positions", "train.speed", "train.deceleration",
+               "train.rotating_mass", "train.indication_point"],
+              ["totals.train_approach_speed", "totals.track_release_speed",
+               "totals.train_deceleration_sections", "train.indication_point"], []),
+    # Bremsen während der Verarbeitungszeit
+    "process": (["train.processing_time"], ["train.processing_time"], ["decel"]),
+    # Beschleunigen auf die zulässige Geschwindigkeit (Startposition im Gradientenprofil hängt
+    # von der Beharrungsfahrt ab, bei einem Profil der Streckengeschwindigkeit enthalten die
+    # zulässigen Geschwindigkeiten die Bremskurven vor Absenkungen)
+    "accel": (["train.acceleration", "train.min_cruise_time"],
+              ["totals.train_acceleration_sections", "totals.track_speed_sections",
+               "train.min_cruise_time"], ["process"]),
+}
+
+
+def signatures(input_data: dict, totals) -> dict[str, str]:
+    """
+    Bestimmt je Abschnitt eine Signatur aus den Größen, von denen der Abschnitt einschließlich
+    seiner vorgelagerten Abschnitte abhängt. Verrechnete Größen werden aus totals gelesen, sodass
+    z.B. eine geänderte Balisenposition mit anderer maßgebender Geschwindigkeit erkannt wird.
+
+    Args:
+        input_data: Inhalt der Parameter-JSON
+        totals: verrechnete Größen des Szenarios (optimization_infill.Totals)
+
+    Raises:
+        none
+
+    Returns:
+        signatures: Signatur je Abschnitt
+    """
+
+    result = {}
+    for name, (_, quantities, upstream) in STAGES.items():
+        values = [getattr(totals, key) if section == "totals" else input_data[section].get(key)
+                  for section, key in (quantity.split(".") for quantity in quantities)]
+        result[name] = json.dumps([values, [result[stage] for stage in upstream]],
+                                  sort_keys=True, default=lambda value: np.asarray(value).tolist())
+
+    return result
+
+
+def apply_delta(input_data: dict, delta: dict) -> dict:
+    """
+    Übernimmt geänderte Parameter in eine Kopie des Inhalts einer Parameter-JSON. Verschachtelte
+    Abschnitte werden zusammengeführt, alle übrigen Werte ersetzt.
+
+    Args:
+        input_data: Inhalt der Parameter-JSON
+        delta: geänderte Parameter im Aufbau der Parameter-JSON, z.B. {"train": {"speed": 140}}
+
+    Raises:
+        ValueError: Änderung ist kein Abschnitt der Parameter-JSON
+
+    Returns:
+        input_data: Inhalt der Parameter-JSON mit Änderungen
+    """
+
+    def merge(target: dict, changes: dict) -> None:
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                merge(target[key], value)
+            else:
+                target[key] = copy.deepcopy(value)
+
+    if not isinstance(delta, dict):
+        raise ValueError("Änderung der Parameter ist kein Abschnitt der Parameter-JSON")
+    data = copy.deepcopy(input_data)
+    merge(data, delta)
+
+    return data
+
+
+class StageTables:
+    """
+    Speichert die Ergebnisse der Abschnitte einer Trajektorie je ganzzahliger Infill-Position.
+    Jeder Abschnitt wird je Position nur einmal berechnet. Mit adopt() werden die Tabellen eines
+    anderen Szenarios übernommen, soweit die Signatur des Abschnitts übereinstimmt.
+    """
+
+    def __init__(self, input_data: dict, totals) -> None:
+        """
+        Initialisiert leere Tabellen.
+
+        Args:
+            input_data: Inhalt der Parameter-JSON
+            totals: verrechnete Größen des Szenarios (optimization_infill.Totals)
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        self.signatures = signatures(input_data, totals)
+        # je Abschnitt: berechnete Positionen und Ergebnisfelder je Position
+        self.tables = {}
+
+    def adopt(self, previous) -> list[str]:
+        """
+        Übernimmt die Tabellen der Abschnitte mit gleicher Signatur.
+
+        Args:
+            previous: Tabellen des vorherigen Szenarios
+
+        Raises:
+            none
+
+        Returns:
+            adopted: Namen der übernommenen Abschnitte
+        """
+
+        adopted = [name for name in previous.tables
+                   if previous.signatures[name] == self.signatures[name]]
+        for name in adopted:
+            filled, values = previous.tables[name]
+            self.tables[name] = (filled.copy(), [array.copy() for array in values])
+
+        return adopted
+
+    def evaluate(self, name: str, positions: np.ndarray, function, *arguments) -> tuple:
+        """
+        Liefert die Ergebnisse eines Abschnitts je Position und berechnet nur die noch fehlenden
+        Positionen. Nicht ganzzahlige Positionen werden ohne Tabelle berechnet.
+
+        Args:
+            name: Name des Abschnitts
+            positions: Positionen der Infill-Balisengruppe vor dem EoA in m
+            function: Berechnung des Abschnitts, gibt ein Tupel von Feldern je Position zurück
+            arguments: Argumente der Berechnung je Position (Felder in Länge von positions)
+
+        Raises:
+            none
+
+        Returns:
+            values: Ergebnisfelder des Abschnitts je Position
+        """
+
+        positions = np.asarray(positions)
+        index = positions.astype(np.int64)
+        if len(index) == 0 or np.any(index != positions):
+            return function(*arguments)
+        size = int(np.max(index)) + 1
+        filled, values = self.tables.get(name, (np.zeros(0, dtype=bool), None))
+        # Tabellen bis zur größten Position erweitern
+        if len(filled) < size:
+            filled = np.concatenate([filled, np.zeros(size-len(filled), dtype=bool)])
+            if values is not None:
+                values = [np.concatenate([array, np.full(size-len(array), np.nan)])
+                          for array in values]
+        missing = ~filled[index]
+        if np.any(missing):
+            computed = function(*(argument[missing] for argument in arguments))
+            if values is None:
+                values = [np.full(size, np.nan) for _ in computed]
+            for array, value in zip(values, computed):
+                array[index[missing]] = value
+            filled[index[missing]] = True
+        self.tables[name] = (filled, values)
+
+        return tuple(array[index] for array in values)
@@ -0,0 +1,246 @@
+"""
+Version 1.00
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.00, 2026-10-17 cw: Phasenzeiten und Aufrufzähler der Optimierung
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Anzahl aktiver Messungen über alle Threads (schnelle Prüfung in den gezählten Funktionen)
+_active = 0
+# aktive Messung je Thread
+_state = threading.local()
+_lock = threading.Lock()
+
+
+class Metrics:
+    """"
+    Sammelt Phasenzeiten sowie Anzahl und Dauer der Aufrufe gezählter Funktionen einer
+    Optimierung. Ist die Messung deaktiviert, sind alle Methoden ohne Wirkung.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Initialisiert die Messwerte.
+
+        Args:
+            enabled: Messung aktiv
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        self.enabled = enabled
+        self.phases = []
+        self.calls = collections.Counter()
+        self.call_time = collections.Counter()
+        self._stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Misst die Dauer einer Phase. Verschachtelte Phasen werden mit dem Pfad der übergeordneten
+        Phasen benannt (z.B. "optimize_2/export").
+
+        Args:
+            name: Name der Phase
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        tic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": path, "duration": time.perf_counter() - tic})
+            self._stack.pop()
+
+    def add(self, name: str, duration: float) -> None:
+        """
+        Ergänzt eine bereits gemessene Phase.
+
+        Args:
+            name: Name der Phase
+            duration: Dauer in s
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        if self.enabled:
+            self.phases.append({"name": name, "duration": duration})
+
+    def merge(self, metrics) -> None:
+        """
+        Übernimmt die Aufrufzähler einer Messung aus einem anderen Prozess.
+
+        Args:
+            metrics: Messung des anderen Prozesses
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        self.calls.update(metrics.calls)
+        self.call_time.update(metrics.call_time)
+
+    def to_dict(self) -> dict:
+        """
+        Fasst die Messwerte für die Ausgabe als JSON zusammen.
+
+        Args:
+            none
+
+        Raises:
+            none
+
+        Returns:
+            metrics: Phasen, Aufrufe und Dauer der Aufrufe je Funktion
+        """
+
+        return {"phases": self.phases,
+                "calls": dict(sorted(self.calls.items())),
+                "call_time": {name: self.call_time[name] for name in sorted(self.call_time)}}
+
+    def write(self, path: str) -> None:
+        """
+        Schreibt die Messwerte als JSON und gibt die Phasenzeiten aus.
+
+        Args:
+            path: Zieldatei
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        if not self.enabled:
+            return
+        for phase in self.phases:
+            logger.info(f"Phase {phase['name']}: {phase['duration']:.3f} s")
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as outfile:
+            json.dump(self.to_dict(), outfile, indent=4)
+
+
+@contextlib.contextmanager
+def activate(metrics: Metrics):
+    """
+    Aktiviert die Zählung der Aufrufe für den aktuellen Thread.
+
+    Args:
+        metrics: Messung, in die gezählt wird
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    global _active
+    if not metrics.enabled:
+        yield
+        return
+    previous = getattr(_state, "metrics", None)
+    _state.metrics = metrics
+    with _lock:
+        _active += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _active -= 1
+        _state.metrics = previous
+
+
+def phase(name: str):
+    """
+    Dekorator, der die Dauer einer Funktion als Phase in der Messung des Szenarios (erstes
+    Argument mit Attribut metrics) erfasst.
+
+    Args:
+        name: Name der Phase
+
+    Raises:
+        none
+
+    Returns:
+        decorator: Dekorator der Funktion
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(scenario, *args, **kwargs):
+            with scenario.metrics.phase(name):
+                return function(scenario, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def counted(function):
+    """
+    Dekorator, der Anzahl und Dauer der Aufrufe einer Funktion in der aktiven Messung zählt.
+    Ohne aktive Messung bleibt nur eine Prüfung einer globalen Variable.
+
+    Args:
+        function: zu zählende Funktion
+
+    Raises:
+        none
+
+    Returns:
+        wrapper: gezählte Funktion
+    """
+
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return function(*args, **kwargs)
+        metrics = getattr(_state, "metrics", None)
+        if metrics is None:
+            return function(*args, **kwargs)
+        tic = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.calls[name] += 1
+            metrics.call_time[name] += time.perf_counter() - tic
+
+    return wrapper
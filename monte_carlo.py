@@ -0,0 +1,514 @@
+"""
+Version 1.01
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.01, 2026-10-17 cw: Ungültige Ziehungen überspringen und in der Zusammenfassung zählen
+- 1.00, 2026-10-17 cw: Robustheit der Anordnungen über Stichproben streuender Zugparameter
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import time
+
+import checks
+import incremental
+import optimization_infill
+
+logging.basicConfig(
+        format="%(asctime)s.%(msecs)03d %(levelname)s {%(module)s} -> [%(funcName)s] %(message)s",
+        datefmt="%H:%M:%S",
+        level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Verteilungen mit Anzahl und Bedeutung ihrer Parameter
+DISTRIBUTIONS = {"normal": ["mean", "std"], "uniform": ["low", "high"],
+                 "triangular": ["low", "mode", "high"]}
+# Stufenfunktionen des Zuges, deren Werte mit der Ziehung als Faktor skaliert werden
+CURVES = ["deceleration", "acceleration"]
+# ganzzahlige Zugparameter (Positionen in m), deren Ziehungen gerundet werden
+INTEGERS = ["indication_point"]
+# Perzentile der Fahrzeitverluste je Anordnung
+PERCENTILES = [50, 90, 95]
+# maximale Anzahl Elemente (Ziehungen x Anordnungen) eines Blocks der Verlustmatrix
+BLOCK_SIZE = 2**22
+
+
+def parse_distribution(text: str) -> tuple[str, tuple[str, list[float]]]:
+    """
+    Liest die Verteilung eines Zugparameters im Format "train.parameter=verteilung:p1:p2[:p3]",
+    z.B. "train.processing_time=normal:1.5:0.3" (Mittelwert, Standardabweichung),
+    "train.rotating_mass=uniform:6:12" (untere und obere Grenze) oder
+    "train.deceleration=triangular:0.9:1:1.05" (Grenzen und Modus). Bei den Brems- und
+    Anfahrkurven ist die Ziehung ein Faktor auf alle Beschleunigungswerte.
+
+    Args:
+        text: Verteilung des Parameters
+
+    Raises:
+        ValueError: Format ungültig
+        ValueError: Verteilung nicht unterstützt
+        ValueError: Parameter der Verteilung ungültig
+
+    Returns:
+        name: Name des Parameters (train.parameter)
+        distribution: Verteilung und ihre Parameter
+    """
+
+    name, _, values = text.partition("=")
+    section, _, key = name.strip().partition(".")
+    kind, *parameters = values.split(":")
+    if section != "train" or not key or not values:
+        raise ValueError(f"Verteilung '{text}' ungültig (Format train.parameter=verteilung:"
+                         f"p1:p2[:p3], verteilung in {list(DISTRIBUTIONS)})")
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Verteilung '{kind}' nicht unterstützt ({list(DISTRIBUTIONS)})")
+    if len(parameters) != len(DISTRIBUTIONS[kind]):
+        raise ValueError(f"Verteilung '{kind}' von '{name}' erwartet die Parameter "
+                         f"{':'.join(DISTRIBUTIONS[kind])}")
+    try:
+        parameters = [float(parameter) for parameter in parameters]
+    except ValueError as error:
+        raise ValueError(f"Parameter der Verteilung von '{name}' ungültig") from error
+    if kind == "normal" and parameters[1] < 0:
+        raise ValueError(f"Standardabweichung von '{name}' negativ")
+    if kind != "normal" and parameters != sorted(parameters):
+        raise ValueError(f"Grenzen der Verteilung von '{name}' nicht aufsteigend")
+
+    return f"{section}.{key}", (kind, parameters)
+
+
+def sample(distributions: dict[str, tuple], draws: int, seed: int | None = None
+           ) -> dict[str, np.ndarray]:
+    """
+    Zieht alle Stichproben je Parameter vektorisiert. Negative Ziehungen werden auf 0 begrenzt.
+
+    Args:
+        distributions: Verteilung und ihre Parameter je Parameter
+        draws: Anzahl Ziehungen
+        seed: Startwert des Zufallszahlengenerators (None = zufällig)
+
+    Raises:
+        ValueError: Anzahl Ziehungen kleiner als 1
+
+    Returns:
+        samples: Ziehungen je Parameter
+    """
+
+    if draws < 1:
+        raise ValueError("Anzahl Ziehungen kleiner als 1")
+    generator = np.random.default_rng(seed)
+    samples = {}
+    for name, (kind, parameters) in distributions.items():
+        values = getattr(generator, kind)(*parameters, size=draws)
+        samples[name] = np.maximum(values, 0)
+
+    return samples
+
+
+def draw_train(train: dict, samples: dict[str, np.ndarray], index: int) -> dict:
+    """
+    Bildet die Änderungen des Abschnitts 'train' einer Ziehung. Positionen werden auf ganze Meter
+    gerundet, Brems- und Anfahrkurven mit der Ziehung skaliert.
+
+    Args:
+        train: Abschnitt 'train' des Basisszenarios
+        samples: Ziehungen je Parameter
+        index: Nummer der Ziehung
+
+    Raises:
+        none
+
+    Returns:
+        delta: geänderte Parameter des Zuges
+    """
+
+    delta = {}
+    for name, values in samples.items():
+        key = name.split(".", 1)[1]
+        value = float(values[index])
+        if key in CURVES:
+            delta[key] = {"steps": train[key]["steps"],
+                          "values": [step * value for step in train[key]["values"]]}
+        elif key in INTEGERS:
+            delta[key] = round(value)
+        else:
+            delta[key] = value
+
+    return delta
+
+
+def draw_scenarios(data: dict, samples: dict[str, np.ndarray], balises: int,
+                   directory: str) -> tuple[list[tuple], int]:
+    """
+    Erstellt je Ziehung ein Szenario, prüft die Daten und berechnet die Trajektorien bei
+    Aufwertung am EoA und an der festen Infill-Balisengruppe (wie im Flottenmodus). Ziehungen,
+    deren Daten die Checks nicht bestehen (z.B. Bremsung ab IP nicht möglich), werden
+    übersprungen.
+
+    Args:
+        data: Inhalt der Parameter-JSON
+        samples: Ziehungen je Parameter
+        balises: Gesamtzahl der Infill-Balisengruppen
+        directory: Ordner der Ausgaben der Szenarien
+
+    Raises:
+        ValueError: Daten keiner Ziehung gültig
+
+    Returns:
+        draws: Szenario, Bereiche der freien Balisengruppen und Funktion der
+            Fahrzeitverlängerungen je gültiger Ziehung
+        skipped: Anzahl übersprungener Ziehungen
+    """
+
+    count = len(next(iter(samples.values())))
+    draws = []
+    for index in range(count):
+        delta = draw_train(data["train"], samples, index)
+        try:
+            scenario = optimization_infill.Scenario(
+                incremental.apply_delta(data, {"train": delta}), directory)
+            checks.checks(scenario.input, scenario.totals)
+            s_target, t_total_infill_1 = optimization_infill.reference_trajectories(scenario)
+        except ValueError as error:
+            values = ", ".join(f"{name}={values[index]:g}" for name, values in samples.items())
+            logger.debug(f"Ziehung {index} ({values}) übersprungen: {error}")
+            continue
+        ranges, evaluate = optimization_infill.search_problem(scenario, balises, s_target,
+                                                              t_total_infill_1)
+        draws.append((scenario, ranges, evaluate))
+    skipped = count - len(draws)
+    if not draws:
+        raise ValueError(f"Daten keiner der {count} Ziehungen gültig")
+    if skipped:
+        logger.warning(f"{skipped} von {count} Ziehungen ungültig und übersprungen")
+
+    return draws, skipped
+
+
+def evaluate_positions(draws: list[tuple], positions: np.ndarray
+                       ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Berechnet die Fahrzeitverlängerungen und Fahrzeiten aller Ziehungen für ein Feld von
+    Positionen, je Ziehung in einem vektorisierten Aufruf. Die Abschnittstabellen der Szenarien
+    werden danach verworfen, damit der Speicher nicht mit der Anzahl Ziehungen wächst.
+
+    Args:
+        draws: Ziehungen (siehe draw_scenarios())
+        positions: Positionen vor dem EoA in m (aufsteigend, eindeutig)
+
+    Raises:
+        none
+
+    Returns:
+        delta: Fahrzeitverlängerungen in s je Ziehung und Position
+        running_time: Fahrzeiten bis zur Aufwertung in s je Ziehung und Position
+    """
+
+    delta = np.empty((len(draws), len(positions)))
+    running_time = np.empty((len(draws), len(positions)))
+    for index, (scenario, _, evaluate) in enumerate(draws):
+        delta[index], running_time[index] = evaluate(positions)
+        scenario.stages.tables.clear()
+
+    return delta, running_time
+
+
+def layout_losses(points: np.ndarray, delta: np.ndarray, running_time: np.ndarray, weights,
+                  start: int, running_time_start: np.ndarray, running_time_end: np.ndarray,
+                  delta_end: np.ndarray, group_distance: int) -> np.ndarray:
+    """
+    Berechnet den gewichteten Fahrzeitverlust je Ziehung und Anordnung in einem Aufruf. Die
+    Abschnitte werden wie in search.combination_loss() vom EoA aus aufsummiert, zusätzlich über
+    die Ziehungen als erste Achse.
+
+    Args:
+        points: Positionen der freien Balisengruppen je Anordnung (absteigend je Zeile)
+        delta: Fahrzeitverlängerungen in s je Ziehung, Anordnung und freier Balisengruppe
+        running_time: Fahrzeiten bis zur Aufwertung in s (Form wie delta)
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        start: Position der festen Infill-Balisengruppe vor dem EoA in m
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe je Ziehung
+        running_time_end: Fahrzeit bis zum Erreichen des EoA je Ziehung
+        delta_end: Fahrzeitverlängerung bei Aufwertung am EoA je Ziehung
+        group_distance: Mindestabstand zwischen Balisengruppen in m
+
+    Raises:
+        none
+
+    Returns:
+        loss: gewichteter Fahrzeitverlust je Ziehung und Anordnung (unzulässig = inf)
+    """
+
+    count, levels = points.shape
+    distances = [np.full(count, start), *points.T, np.zeros(count, dtype=int)]
+    running_times = [running_time_start[:, None], *np.moveaxis(running_time, -1, 0),
+                     running_time_end[:, None]]
+    deltas = [*np.moveaxis(delta, -1, 0), delta_end[:, None]]
+    weighted = 0
+    total = 0
+    for level in range(levels, -1, -1):  # Target -> IF -> IF
+        factor = weights(distances[level], distances[level+1], running_times[level],
+                         running_times[level+1])
+        weighted = weighted + factor * deltas[level]
+        total = total + factor
+    feasible = np.all(np.diff(points, axis=1) <= -group_distance, axis=1)
+
+    return np.where(feasible, weighted / total, np.inf)
+
+
+def layout_statistics(draws: list[tuple], points: np.ndarray, percentiles: list[float]
+                      ) -> np.ndarray:
+    """
+    Berechnet Erwartungswert, Standardabweichung und Perzentile des gewichteten
+    Fahrzeitverlusts über alle Ziehungen je Anordnung. Die Verlustmatrix wird in Blöcken von
+    Anordnungen berechnet, sodass ihr Speicher begrenzt bleibt.
+
+    Args:
+        draws: Ziehungen (siehe draw_scenarios())
+        points: Positionen der freien Balisengruppen je Anordnung (absteigend je Zeile)
+        percentiles: Perzentile in %
+
+    Raises:
+        none
+
+    Returns:
+        statistics: Erwartungswert, Standardabweichung und Perzentile in s je Anordnung
+            (Zeilen) bei unzulässiger Anordnung inf
+    """
+
+    positions = np.unique(points)
+    delta, running_time = evaluate_positions(draws, positions)
+    reference = draws[0][0]
+    context = (functools.partial(optimization_infill.chain_weights, reference),
+               reference.input.track_infill_1,
+               np.array([scenario.running_time_intervals[1] for scenario, *_ in draws]),
+               np.array([scenario.running_time_intervals[-1] for scenario, *_ in draws]),
+               np.array([scenario.result.delta_target for scenario, *_ in draws]),
+               reference.input.track_balise_group_distance)
+    statistics = np.full((len(points), 2 + len(percentiles)), np.inf)
+    size = max(1, BLOCK_SIZE // len(draws))
+    for begin in range(0, len(points), size):
+        block = points[begin:begin+size]
+        index = np.searchsorted(positions, block)
+        loss = layout_losses(block, delta[:, index], running_time[:, index], *context)
+        feasible = np.isfinite(loss[0])
+        if not np.any(feasible):
+            continue
+        loss = loss[:, feasible]
+        rows = begin + np.flatnonzero(feasible)
+        statistics[rows, 0] = np.mean(loss, axis=0)
+        statistics[rows, 1] = np.std(loss, axis=0)
+        if percentiles:
+            statistics[rows, 2:] = np.percentile(loss, percentiles, axis=0).T
+
+    return statistics
+
+
+def optimize_expected(draws: list[tuple], steps: int, percentiles: list[float]
+                      ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sucht die Anordnung mit dem geringsten erwarteten gewichteten Fahrzeitverlust über alle
+    Ziehungen. Wie in run() wird zunächst mit Schrittweite steps und danach mit 1 m um das
+    Ergebnis gesucht, bei Gleichstand wird wie in optimize() die größere Position gewählt.
+
+    Args:
+        draws: Ziehungen (siehe draw_scenarios())
+        steps: Schrittweite der groben Suche in m
+        percentiles: Perzentile in %
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+
+    Returns:
+        best: Positionen der freien Balisengruppen der optimalen Anordnung
+        points: Positionen der freien Balisengruppen aller berechneten Anordnungen
+        statistics: Erwartungswert, Standardabweichung und Perzentile je berechneter Anordnung
+    """
+
+    # Bereiche der freien Balisengruppen, die für alle Ziehungen zulässig sind
+    levels = len(draws[0][1])
+    ranges = [(max(draw[1][level][0] for draw in draws),
+               min(draw[1][level][1] for draw in draws)) for level in range(levels)]
+    if any(lower > upper for lower, upper in ranges):
+        raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+    best = None
+    evaluated = []
+    for envelope in [None, steps]:
+        if envelope is None:  # grobe Suche über alle Bereiche
+            grids = [np.unique(np.append(np.arange(lower, upper + 1, steps), upper))
+                     for lower, upper in ranges]
+        else:  # feine Suche mit 1 m um das Ergebnis der groben Suche
+            grids = [np.arange(max(lower, point - envelope), min(upper, point + envelope) + 1)
+                     for (lower, upper), point in zip(ranges, best)]
+        points = np.array(list(itertools.product(*grids)), dtype=int).reshape(-1, levels)
+        statistics = layout_statistics(draws, points, percentiles)
+        expected = statistics[:, 0]
+        if not np.any(np.isfinite(expected)):
+            raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+        evaluated.append((points, statistics))
+        # letztes Minimum in Reihenfolge der Positionen
+        candidates = np.flatnonzero(expected == np.min(expected))
+        best = points[candidates[np.lexsort(points[candidates].T[::-1])[-1]]]
+    points = np.vstack([points for points, _ in evaluated])
+    statistics = np.vstack([statistics for _, statistics in evaluated])
+    # Anordnungen beider Durchläufe nur einmal
+    points, index = np.unique(points, axis=0, return_index=True)
+
+    return best, points, statistics[index]
+
+
+def run_monte_carlo(data: dict, distributions: dict[str, tuple], output: str, draws: int = 1000,
+                    seed: int | None = None, percentiles: list[float] = PERCENTILES
+                    ) -> pd.DataFrame:
+    """
+    Bewertet die Anordnungen der Infill-Balisengruppen über Stichproben streuender
+    Zugparameter. Je Ziehung werden die Fahrzeitverlängerungen aller Kandidaten in einem
+    vektorisierten Aufruf berechnet, die gewichteten Fahrzeitverluste aller Ziehungen und
+    Anordnungen als Matrix. Gesucht wird die im Erwartungswert optimale Anordnung; zum Vergleich
+    wird die Anordnung der Optimierung mit den Punktwerten des Basisszenarios bewertet. Es wird
+    eine Tabelle aller berechneten Anordnungen (Erwartungswert, Standardabweichung, Perzentile)
+    als CSV oder Parquet sowie eine Zusammenfassung als JSON geschrieben.
+
+    Args:
+        data: Inhalt der Parameter-JSON des Basisszenarios
+        distributions: Verteilung und ihre Parameter je Zugparameter
+        output: Datei der Ergebnistabelle (.csv oder .parquet)
+        draws: Anzahl Ziehungen
+        seed: Startwert des Zufallszahlengenerators (None = zufällig)
+        percentiles: Perzentile in %
+
+    Raises:
+        ValueError: Dateiendung der Ergebnistabelle nicht unterstützt
+        ValueError: Parameter nicht im Abschnitt 'train'
+        ValueError: Anzahl Infill-Balisengruppen nicht 2 oder 3
+        ValueError: Daten keiner Ziehung gültig oder keine zulässige Anordnung
+
+    Returns:
+        table: Ergebnistabelle
+    """
+
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in [".csv", ".parquet"]:
+        raise ValueError(f"Dateiendung '{extension}' der Ergebnistabelle nicht unterstützt")
+    if not distributions:
+        raise ValueError("Keine Verteilungen angegeben")
+    for name in distributions:
+        if name.split(".", 1)[1] not in data["train"]:
+            raise ValueError(f"Parameter '{name}' nicht in den Parametern enthalten")
+    balises = data["track"]["balises"]
+    if balises not in [2, 3]:
+        raise ValueError("Monte-Carlo-Bewertung nur für 2 oder 3 Infill-Balisengruppen")
+    data = incremental.apply_delta(data, {"tech": {"plot_trajectories": False,
+                                                   "plot_3d": False}})
+    data.pop("fleet", None)
+
+    tic = time.perf_counter()
+    samples = sample(distributions, draws, seed)
+    logging.getLogger(optimization_infill.__name__).setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        scenarios, skipped = draw_scenarios(data, samples, balises, directory)
+        logger.info(f"{len(scenarios)} Ziehungen in {time.perf_counter() - tic:0.2f} Sekunden "
+                    f"vorbereitet")
+        best, points, statistics = optimize_expected(scenarios, data["tech"]["steps"],
+                                                     percentiles)
+        # Anordnung der Optimierung mit Punktwerten unter denselben Ziehungen
+        nominal = optimization_infill.Scenario(data, directory).run()
+        nominal_points = np.array([nominal.infill_positions[1:balises]], dtype=int)
+        nominal_statistics = layout_statistics(scenarios, nominal_points, percentiles)[0]
+    duration = time.perf_counter() - tic
+
+    columns = ["expected", "std", *(f"p{percentile:g}" for percentile in percentiles)]
+    infill_1 = data["track"]["balise_positions"]
+    table = pd.DataFrame(points, columns=[f"infill_{level}" for level in range(2, balises+1)])
+    table.insert(0, "infill_1", max(infill_1))
+    table[columns] = statistics
+    table = table[np.isfinite(table["expected"])].sort_values(
+        "expected", kind="stable", ignore_index=True)
+    output = os.path.abspath(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    if extension == ".csv":
+        table.to_csv(output, index=False)
+    else:
+        table.to_parquet(output, index=False)
+    logger.info(f"Ergebnistabelle: {output}")
+
+    # Zusammenfassung
+    best_statistics = statistics[np.flatnonzero(np.all(points == best, axis=1))[0]]
+    summary = {
+        "draws": draws,
+        "skipped": skipped,
+        "seed": seed,
+        "distributions": {name: {"distribution": kind,
+                                 **dict(zip(DISTRIBUTIONS[kind], parameters))}
+                          for name, (kind, parameters) in distributions.items()},
+        "expected_optimum": {"infill_positions": [max(infill_1), *best.tolist()],
+                             **{column: round(float(value), 2) for column, value
+                                in zip(columns, best_statistics)}},
+        "nominal_optimum": {"infill_positions": [int(position) for position
+                                                 in nominal.infill_positions],
+                            "additional_runtime": round(float(nominal.min_loss_time), 2),
+                            **{column: round(float(value), 2) for column, value
+                               in zip(columns, nominal_statistics)}},
+        "layouts": len(table),
+        "wall_time": round(duration, 3)
+    }
+    path = f"{os.path.splitext(output)[0]}_summary.json"
+    with open(path, "w") as outfile:
+        json.dump(summary, outfile, indent=4)
+    expected, nominal = summary["expected_optimum"], summary["nominal_optimum"]
+    spread = ", ".join(f"{column} {expected[column]} s" for column in columns[1:])
+    logger.info(f"Optimum im Erwartungswert: {expected['infill_positions']} m mit "
+                f"{expected['expected']} s ({spread})")
+    logger.info(f"Optimum mit Punktwerten: {nominal['infill_positions']} m mit "
+                f"{nominal['expected']} s im Erwartungswert")
+    logger.info(f"Dauer: {duration:0.2f} Sekunden, Zusammenfassung: {path}")
+
+    return table
+
+
+def main() -> None:
+    """
+    Einstiegspunkt der Monte-Carlo-Bewertung über die Kommandozeile.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Monte-Carlo-Bewertung der Infill-Balisengruppen")
+    parser.add_argument("parameters", nargs="?", default="parameters.json",
+                        help="Parameter-JSON des Basisszenarios")
+    parser.add_argument("-d", "--distribution", action="append", required=True,
+                        help="Verteilung eines Zugparameters, z.B. "
+                             "train.processing_time=normal:1.5:0.3, "
+                             "train.rotating_mass=uniform:6:12 oder "
+                             "train.deceleration=triangular:0.9:1:1.05 (mehrfach angeben)")
+    parser.add_argument("-n", "--draws", type=int, default=1000, help="Anzahl Ziehungen")
+    parser.add_argument("-s", "--seed", type=int, help="Startwert des Zufallszahlengenerators")
+    parser.add_argument("-q", "--percentiles", default=",".join(map(str, PERCENTILES)),
+                        help="Perzentile in %% (kommagetrennt)")
+    parser.add_argument("-o", "--output", default="output/monte_carlo/results.csv",
+                        help="Ergebnistabelle (.csv oder .parquet)")
+    args = parser.parse_args()
+    with open(args.parameters) as infile:
+        data = json.load(infile)
+    distributions = dict(parse_distribution(text) for text in args.distribution)
+    percentiles = [float(value) for value in args.percentiles.split(",") if value.strip()]
+    run_monte_carlo(data, distributions, args.output, args.draws, args.seed, percentiles)
+
+
+if __name__ == "__main__":
+    main()
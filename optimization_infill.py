@@ -1,8 +1,34 @@
 """
-Version 0.11
+Version 0.37
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 0.37, 2026-10-17 cw: Profile der Streckengeschwindigkeit (Fahrt ohne Behinderung als Referenz)
+- 0.36, 2026-10-17 cw: Suche mit Zeitbudget ohne Plots, Überschreitung der Frist im Ergebnis
+- 0.35, 2026-10-17 cw: Verlustkurve bei zwei Balisengruppen für den Zwischenspeicher
+- 0.34, 2026-10-17 cw: Profile der Streckengeschwindigkeit abweisen, Signaturen aus Totals
+- 0.33, 2026-10-17 cw: Vorkompilierte Kurven je Schlüssel aus Zug und Gradiente übernehmen
+- 0.32, 2026-10-17 cw: Unbekannte Parameter in Einträgen der Flotte abweisen
+- 0.31, 2026-10-17 cw: Suche mit Zeitbudget, bisher bestes Ergebnis mit Abdeckung und Lücke
+- 0.30, 2026-10-17 cw: Abschnittsweise Gradienten- und Geschwindigkeitsprofile entlang der Strecke
+- 0.29, 2026-10-17 cw: Exaktes Pruning der Suche bei drei Balisengruppen mit unteren Schranken
+- 0.28, 2026-10-17 cw: Flottenmodus mit Verkehrsanteilen mehrerer Zugtypen
+- 0.27, 2026-10-17 cw: Kontinuierliche Suche der Positionen ohne Raster
+- 0.26, 2026-10-17 cw: Inkrementelle Optimierung mit Abschnittsergebnissen je Position
+- 0.25, 2026-10-17 cw: Zwischenspeicher der Ergebnisse auf der Festplatte je Szenario-Hash
+- 0.24, 2026-10-17 cw: Phasenzeiten, Aufrufzähler und Debug-Ausgaben nur bei aktivem Level
+- 0.23, 2026-10-17 cw: Format der Rotation des 3D-Plots (Einzelbilder oder Animation)
+- 0.22, 2026-10-17 cw: Verlustfläche als gepacktes Dreieck in einer Memory-Map, nur bei Bedarf
+- 0.21, 2026-10-17 cw: Plot-Module und pandas erst bei Bedarf laden (Start ohne Plots)
+- 0.20, 2026-10-17 cw: Szenario-Objekt statt Klassenvariablen, kein Dateizugriff beim Import
+- 0.19, 2026-10-17 cw: Nicht blockierender Einstiegspunkt run() für die Stapelverarbeitung
+- 0.18, 2026-10-17 cw: Adaptive Suche mit Schranken als Alternative zum zweistufigen Verfahren
+- 0.17, 2026-10-17 cw: Beliebige Anzahl Infill-Balisengruppen per dynamischer Programmierung
+- 0.16, 2026-10-17 cw: Parallele Suche im Prozesspool
+- 0.15, 2026-10-17 cw: Vektorisierte Berechnung der Verlustfläche bei drei Balisengruppen
+- 0.14, 2026-10-17 cw: Vektorisierte Berechnung der Verlustkurve bei zwei Balisengruppen
+- 0.13, 2026-10-17 cw: Vorkompilierte Brems- und Anfahrkurven
+- 0.12, 2026-10-17 cw: Zwischenspeicher der Trajektorien je Infill-Position
 - 0.11, 2024-04-08 cw: Einheitliche Dateinamenpräfixe & PEP 8 Konformität
 - 0.10, 2024-04-04 cw: Bugfix Berücksichtigung Gradiente
 - 0.09, 2024-04-02 cw: Lokalisierung
@@ -16,18 +42,26 @@ Change History:
 - 0.01, 2023-07-11 cw: Erster Stand mit begonnener Dokumentation
 """
 
+import argparse
+import concurrent.futures
 import enum
+import functools
+import hashlib
+import itertools
 import json
 import logging
 import numpy as np
 import os
-import pandas as pd
 import time
 
 import calc_movements as calc
 import checks
 import constants
-import plots
+import incremental
+import instrumentation
+import result_cache
+import results_store
+import search
 
 
 logging.basicConfig(
@@ -36,11 +70,6 @@ logging.basicConfig(
         level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    os.chdir("./infill_optimization")
-except:
-    pass
-
 
 class Weighting(enum.Enum):
     """"
@@ -52,133 +81,463 @@ class Weighting(enum.Enum):
     EQUAL = 3  # Abschnitt gleich gewichten
 
 
-class Input:
+class Engine(enum.Enum):
     """"
-    Liest die Parameter-JSON ein und hält die Input-Parameter in Variablen vor.
+    Beinhaltet die möglichen Verfahren zur Berechnung der Fahrzeitverluste über alle Positionen.
     """
 
-    # Datei parameter.json laden
-    try:
-        file = open("./parameters.json")
-        input_data = json.load(file)
-        file.close()
-    except:
-        logger.error("Datei 'parameters.json' wurde nicht gefunden.")
-        input("Enter zum Beenden...")
-        exit()
+    LOOP = 1  # skalare Schleife über alle Kombinationen
+    VECTOR = 2  # vektorisierte Berechnung über Felder von Positionen
 
-    # Parameter im Abschnitt 'track' laden
-    try:
-        input_track = input_data["track"]
-        track_line_speed = input_track["line_speed"]
-        track_release_speed = input_track["release_speed"]
-        track_gradient = input_track["gradient"]
-        track_balises = input_track["balises"]
-        track_balise_group_distance = input_track["balise_group_distance"]
-        track_balise_positions = input_track["balise_positions"]
-        track_balise_positions.sort(reverse=True)
-        track_infill_1 = track_balise_positions[0]
-        track_infill_2 = track_balise_positions[1]
-        track_infill_3 = track_balise_positions[2] if track_balises > 2 else np.nan
-    except:
-        logger.error("Parameter 'track' konnten nicht alle geladen werden.")
-        input("Enter zum Beenden...")
-        exit()
 
-    # Parameter im Abschnitt 'train' laden
-    try:
-        input_train = input_data["train"]
-        train_speed = input_train["speed"]
-        train_deceleration = np.array([input_train["deceleration"]["steps"],
-                                       input_train["deceleration"]["values"]])
-        train_acceleration = np.array([input_train["acceleration"]["steps"],
-                                       input_train["acceleration"]["values"]])
-        train_rotating_mass = input_train["rotating_mass"]
-        train_indication_point = input_train["indication_point"]
-        train_min_cruise_time = input_train["min_cruise_time"]
-        train_processing_time = input_train["processing_time"]
-    except:
-        logger.error("Parameter 'train' konnten nicht alle geladen werden.")
-        input("Parameter 'train' konnten nicht alle geladen werden.")
-        exit()
+class Search(enum.Enum):
+    """"
+    Beinhaltet die möglichen Suchverfahren bei zwei oder drei Infill-Balisengruppen.
+    """
 
-    # Parameter im Abschnitt 'tech' laden
-    try:
-        input_tech = input_data["tech"]
-        tech_steps = input_tech["steps"]
-        tech_weighting = Weighting[input_tech["weighting"]]
-        tech_plot_2d = input_tech["plot_trajectories"]
-        tech_plot_3d = input_tech["plot_3d"]
-        tech_rotate_plot = input_tech["rotate_plot"] if tech_plot_3d else False
-        tech_locale = input_tech["locale"]
-    except:
-        logger.error("Parameter 'tech' konnten nicht alle geladen werden.")
-        input("Parameter 'tech' konnten nicht alle geladen werden.")
-        exit()
+    TWO_PASS = 1  # grobe Suche mit tech_steps, danach feine Suche um das Ergebnis
+    ADAPTIVE = 2  # adaptive Verfeinerung mit unteren Schranken bis 1 m
+    CONTINUOUS = 3  # Brent-Verfahren bzw. Koordinatensuche ohne Raster (Zentimeterbereich)
+    ANYTIME = 4  # grobes Raster, dann Verfeinerung um die besten Kombinationen bis zum Zeitbudget
 
-    timestr = time.strftime('%Y%m%d-%H%M%S')
 
+def track_profile(value) -> np.ndarray:
+    """
+    Liest einen Streckenparameter als konstanten Wert oder als abschnittsweises Profil
+    {"steps": [...], "values": [...]} über der Position vor dem EoA. values[i] gilt ab steps[i]
+    bis steps[i+1], der erste Wert auch hinter dem EoA, der letzte bis zum Beginn des
+    Betrachtungsraumes.
 
-class Totals:
-    """"
-    Hält die Variablen verrechneter Eingangsgrößen vor.
-    """
-
-    # Kopie des input erstellen
-    train_deceleration = Input.train_deceleration
-    train_acceleration = Input.train_acceleration
-    # Geschwindigkeiten in m/s konvertieren
-    train_deceleration[0] = train_deceleration[0]*constants.CONVERT_KPH_MPS
-    train_acceleration[0] = train_acceleration[0]*constants.CONVERT_KPH_MPS
-    train_speed = np.minimum(Input.track_line_speed, Input.train_speed) * constants.CONVERT_KPH_MPS
-    track_release_speed = Input.track_release_speed * constants.CONVERT_KPH_MPS
-    # Beschleunigungen mit rotierenden Massen und Gradiente korrigieren
-    train_deceleration[1, 1:] = (Input.train_deceleration[1, 1:]
-                                 - constants.G/(1+Input.train_rotating_mass/100)
-                                 * Input.track_gradient/1000)
-    train_acceleration[1, 1:] = (Input.train_acceleration[1, 1:]
-                                 - constants.G/(1+Input.train_rotating_mass/100)
-                                 * Input.track_gradient/1000)
-    # Rundung des Betrachtungsraumes
-    track_distance_origin_target = np.ceil((np.maximum(Input.track_infill_1,
-                                                       Input.train_indication_point)+1)/250) * 250
-
-
-class Output:
+    Args:
+        value: Wert oder Profil des Parameters
+
+    Raises:
+        ValueError: Anzahl Positionen und Werte nicht konsistent
+        ValueError: Profil beginnt nicht am EoA
+        ValueError: Positionen nicht aufsteigend
+
+    Returns:
+        profile: Anfangspositionen der Abschnitte in m vor dem EoA und Werte je Abschnitt
+    """
+
+    if not isinstance(value, dict):
+        return np.array([[0], [value]], dtype=float)
+    if len(value["steps"]) != len(value["values"]) or not value["steps"]:
+        raise ValueError("ungleiche Anzahl Elemente für Positionen und Werte des Profils")
+    profile = np.array([value["steps"], value["values"]], dtype=float)
+    if profile[0, 0] != 0:
+        raise ValueError("Profil beginnt nicht am EoA (Position 0 m)")
+    if np.any(np.diff(profile[0]) <= 0):
+        raise ValueError("Positionen des Profils nicht aufsteigend")
+
+    return profile
+
+
+class Input:
     """"
-    Hält die Ausgabewerte in Variablen vor.
+    Hält die Input-Parameter eines Szenarios in Variablen vor.
     """
 
-    results = np.empty((Input.track_infill_1, Input.track_infill_1))
-    results[:] = np.nan
-    distance_infill_1 = []
-    best_distance_infill_2 = []
-    best_distance_infill_3 = []
-    distance_target = []
-    speed_infill_1 = []
-    best_speed_infill_2 = []
-    best_speed_infill_3 = []
-    speed_target = []
-    delta_target = 0
-    best_delta_infill_2 = 0
-    best_delta_infill_3 = 0
-    min_loss_time = float("inf")
-    infill_distance_1 = float("inf")
-    infill_distance_2 = float("inf")
+    def __init__(self, input_data: dict, directory: str = ".") -> None:
+        """
+        Übernimmt die Parameter aus dem Inhalt einer Parameter-JSON.
+
+        Args:
+            input_data: Inhalt der Parameter-JSON
+            directory: Ordner, in dessen Unterordner output die Ausgaben geschrieben werden
+
+        Raises:
+            ValueError: Parameter 'track' unvollständig
+            ValueError: Parameter 'train' unvollständig
+            ValueError: Parameter 'tech' unvollständig
+
+        Returns:
+            none
+        """
+
+        self.input_data = input_data
+        self.output_directory = os.path.join(directory, "output")
+
+        # Parameter im Abschnitt 'track' laden
+        try:
+            input_track = input_data["track"]
+            self.track_line_speed = input_track["line_speed"]
+            # Wert oder abschnittsweises Profil über der Position vor dem EoA
+            self.track_line_speed_profile = track_profile(self.track_line_speed)
+            self.track_release_speed = input_track["release_speed"]
+            self.track_gradient = input_track["gradient"]
+            # Wert oder abschnittsweises Profil über der Position vor dem EoA
+            self.track_gradient_profile = track_profile(self.track_gradient)
+            self.track_balises = input_track["balises"]
+            self.track_balise_group_distance = input_track["balise_group_distance"]
+            self.track_balise_positions = sorted(input_track["balise_positions"], reverse=True)
+            self.track_infill_1 = self.track_balise_positions[0]
+            self.track_infill_2 = self.track_balise_positions[1]
+            self.track_infill_3 = (self.track_balise_positions[2] if self.track_balises > 2
+                                   else np.nan)
+        except Exception as error:
+            raise ValueError("Parameter 'track' konnten nicht alle geladen werden.") from error
+
+        # Parameter im Abschnitt 'train' laden
+        try:
+            input_train = input_data["train"]
+            self.train_speed = input_train["speed"]
+            self.train_deceleration = np.array([input_train["deceleration"]["steps"],
+                                                input_train["deceleration"]["values"]])
+            self.train_acceleration = np.array([input_train["acceleration"]["steps"],
+                                                input_train["acceleration"]["values"]])
+            self.train_rotating_mass = input_train["rotating_mass"]
+            self.train_indication_point = input_train["indication_point"]
+            self.train_min_cruise_time = input_train["min_cruise_time"]
+            self.train_processing_time = input_train["processing_time"]
+        except Exception as error:
+            raise ValueError("Parameter 'train' konnten nicht alle geladen werden.") from error
+
+        # Parameter im Abschnitt 'tech' laden
+        try:
+            input_tech = input_data["tech"]
+            self.tech_steps = input_tech["steps"]
+            self.tech_weighting = Weighting[input_tech["weighting"]]
+            self.tech_plot_2d = input_tech["plot_trajectories"]
+            self.tech_plot_3d = input_tech["plot_3d"]
+            self.tech_rotate_plot = input_tech["rotate_plot"] if self.tech_plot_3d else False
+            self.tech_rotate_format = input_tech.get("rotate_format", "png")
+            if self.tech_rotate_format not in ["png", "gif", "mp4"]:
+                raise ValueError(f"Format '{self.tech_rotate_format}' nicht unterstützt")
+            self.tech_locale = input_tech["locale"]
+            self.tech_engine = Engine[input_tech.get("engine", Engine.VECTOR.name)]
+            self.tech_workers = input_tech.get("workers", 1)
+            self.tech_search = Search[input_tech.get("search", Search.TWO_PASS.name)]
+            self.tech_export_surface = input_tech.get("export_surface") or ""
+            self.tech_metrics = input_tech.get("metrics", False)
+            self.tech_cache = input_tech.get("cache") or ""
+            self.tech_cache_limit = input_tech.get("cache_limit", 256)
+            self.tech_prune = input_tech.get("prune", False)
+            self.tech_time_budget = input_tech.get("time_budget", 10)
+            if self.tech_export_surface not in ["", "npy", "npz"]:
+                raise ValueError(f"Format '{self.tech_export_surface}' nicht unterstützt")
+            if self.tech_cache_limit <= 0:
+                raise ValueError("Größe des Zwischenspeichers nicht positiv")
+            if self.tech_time_budget <= 0:
+                raise ValueError("Zeitbudget der Suche nicht positiv")
+        except Exception as error:
+            raise ValueError("Parameter 'tech' konnten nicht alle geladen werden.") from error
+
+        # optionale Flotte mit Verkehrsanteilen, Einträge ergänzen den Abschnitt 'train'
+        try:
+            self.fleet = []
+            for number, entry in enumerate(input_data.get("fleet") or [], 1):
+                entry = dict(entry)
+                name = str(entry.pop("name", f"train_{number}"))
+                share = float(entry.pop("share"))
+                if share <= 0:
+                    raise ValueError(f"Verkehrsanteil von '{name}' nicht positiv")
+                # Einträge ergänzen 'train' direkt (nicht verschachtelt wie in route.py)
+                unknown = sorted(set(entry) - set(input_train))
+                if unknown:
+                    raise ValueError(f"Parameter {unknown} von '{name}' nicht im Abschnitt "
+                                     f"'train' enthalten")
+                self.fleet.append((name, share, incremental.apply_delta(input_train, entry)))
+            names = [name for name, _, _ in self.fleet]
+            if len(set(names)) < len(names):
+                raise ValueError("Namen der Züge nicht eindeutig")
+            total = sum(share for _, share, _ in self.fleet)
+            self.fleet = [(name, share / total, train) for name, share, train in self.fleet]
+        except Exception as error:
+            raise ValueError("Parameter 'fleet' konnten nicht alle geladen werden.") from error
+
+        self.timestr = time.strftime('%Y%m%d-%H%M%S')
+
+
+def curve_key(input: Input, gradient: float) -> str:
+    """
+    Bildet den Schlüssel der korrigierten Brems- und Anfahrkurven aus allen Parametern, von denen
+    sie abhängen (Stufenfunktionen des Zuges, rotierende Massen und Gradiente).
 
+    Args:
+        input: Input-Parameter des Szenarios
+        gradient: Gradiente in ‰
+
+    Raises:
+        none
+
+    Returns:
+        key: SHA-256 der Parameter als Hex-String
+    """
+
+    text = json.dumps([input.train_deceleration.tolist(), input.train_acceleration.tolist(),
+                       input.train_rotating_mass, float(gradient)])
+
+    return hashlib.sha256(text.encode()).hexdigest()
 
-# Speicherort der Fahrzeiten vor/zwischen/nach den Balisengruppen
-match Input.track_balises:
-    case 2: running_time_intervals = [0, 0, 0, 0]
-    case 3: running_time_intervals = [0, 0, 0, 0, 0]
 
+class Totals:
+    """"
+    Hält die Variablen verrechneter Eingangsgrößen eines Szenarios vor.
+    """
+
+    def __init__(self, input: Input, curves: dict | None = None) -> None:
+        """
+        Verrechnet die Input-Parameter. Die Felder aus Input bleiben dabei unverändert. Bei
+        konstanter Gradiente werden vorkompilierte Stufenfunktionen aus curves übernommen, falls
+        ihr Schlüssel (siehe curve_key()) enthalten ist. Bei einem Profil der
+        Streckengeschwindigkeit beschleunigt der Zug mit einem LineSpeedProfile.
+
+        Args:
+            input: Input-Parameter des Szenarios
+            curves: korrigierte und vorkompilierte Brems- und Anfahrkurven je Schlüssel
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        # Kopie des input erstellen
+        self.train_deceleration = input.train_deceleration.astype(float)
+        self.train_acceleration = input.train_acceleration.astype(float)
+        # Geschwindigkeiten in m/s konvertieren
+        self.train_deceleration[0] = self.train_deceleration[0]*constants.CONVERT_KPH_MPS
+        self.train_acceleration[0] = self.train_acceleration[0]*constants.CONVERT_KPH_MPS
+        # Rundung des Betrachtungsraumes
+        self.track_distance_origin_target = np.ceil((np.maximum(
+            input.track_infill_1, input.train_indication_point)+1)/250) * 250
+        # zulässige Geschwindigkeit je Abschnitt des Profils (höchstens Geschwindigkeit des
+        # Zuges), maßgebend ist die höchste
+        speed_bounds, line_speeds = input.track_line_speed_profile
+        speeds = np.minimum(line_speeds, input.train_speed) * constants.CONVERT_KPH_MPS
+        self.train_speed = np.max(speeds)
+        self.track_release_speed = input.track_release_speed * constants.CONVERT_KPH_MPS
+        bounds, gradients = input.track_gradient_profile
+        # vorkompilierte Stufenfunktionen übernehmen (z.B. gemeinsame Kurven einer Strecke)
+        key = curve_key(input, gradients[0]) if curves and len(gradients) == 1 else None
+        if key in (curves or {}):
+            self.train_deceleration, self.train_acceleration, \
+                self.train_deceleration_profile, self.train_acceleration_profile = curves[key]
+            self.train_deceleration_sections = (bounds, [self.train_deceleration])
+            self.train_acceleration_sections = (bounds, [self.train_acceleration])
+        else:
+            # Beschleunigungen je Abschnitt des Gradientenprofils mit rotierenden Massen und
+            # Gradiente korrigieren
+            decelerations, accelerations = [], []
+            for gradient in gradients:
+                deceleration = self.train_deceleration.copy()
+                acceleration = self.train_acceleration.copy()
+                deceleration[1, 1:] = (deceleration[1, 1:]
+                                       - constants.G/(1+input.train_rotating_mass/100)
+                                       * gradient/1000)
+                acceleration[1, 1:] = (acceleration[1, 1:]
+                                       - constants.G/(1+input.train_rotating_mass/100)
+                                       * gradient/1000)
+                decelerations.append(deceleration)
+                accelerations.append(acceleration)
+            # Stufenfunktionen des ungünstigsten Abschnitts (stärkstes Gefälle bzw. Steigung)
+            self.train_deceleration = decelerations[np.argmin(gradients)]
+            self.train_acceleration = accelerations[np.argmax(gradients)]
+            # korrigierte Stufenfunktionen je Abschnitt (Signaturen der inkrementellen
+            # Optimierung)
+            self.train_deceleration_sections = (bounds, decelerations)
+            self.train_acceleration_sections = (bounds, accelerations)
+            # vorkompilierte Stufenfunktionen für die Bewegungsberechnung (je Abschnitt)
+            self.train_deceleration_profile = calc.compile_segments(bounds, decelerations)
+            self.train_acceleration_profile = calc.compile_segments(bounds, accelerations)
+        # zulässige Geschwindigkeit als Wert oder mit vorberechneter Fahrt ohne Behinderung
+        self.train_speed_profile = calc.compile_line_speed(
+            speed_bounds, speeds, self.train_deceleration_profile,
+            self.train_acceleration_profile, self.track_distance_origin_target)
+        self.track_speed_sections = (speed_bounds, speeds)
+        # Geschwindigkeit am Indication Point zu Beginn des Bremsens
+        self.train_approach_speed = self.train_speed
+        if isinstance(self.train_speed_profile, calc.LineSpeedProfile):
+            self.train_approach_speed = float(self.train_speed_profile.state_batch(
+                input.train_indication_point)[0])
+            # Anfahren bis zur Fahrt ohne Behinderung, die vor Absenkungen bremst
+            self.train_acceleration_profile = self.train_speed_profile
+            self.track_speed_sections = (speed_bounds, speeds, self.train_deceleration_sections)
+
+
+class Result:
+    """"
+    Hält die Ausgabewerte einer Optimierung in Variablen vor.
+    """
 
-def infill_at_target(distance_limit: float) -> tuple[float, float, np.ndarray, np.ndarray,
-                                                     np.ndarray]:
+    def __init__(self, input: Input) -> None:
+        """
+        Initialisiert die Ausgabewerte.
+
+        Args:
+            input: Input-Parameter des Szenarios
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        # Verlustfläche bei drei Balisengruppen, wird erst bei Bedarf angelegt
+        self.results = None
+        # Verlustkurve bei zwei Balisengruppen (Index = Position - 1, NaN = nicht berechnet)
+        self.loss_curve = None
+        self.distance_infill_1 = []
+        self.best_distance_infill_2 = []
+        self.best_distance_infill_3 = []
+        self.distance_target = []
+        self.speed_infill_1 = []
+        self.best_speed_infill_2 = []
+        self.best_speed_infill_3 = []
+        self.speed_target = []
+        self.accel_infill_1 = []
+        self.best_accel_infill_2 = []
+        self.best_accel_infill_3 = []
+        self.accel_target = []
+        self.best_factors = []
+        self.delta_target = 0
+        self.best_delta_infill_2 = 0
+        self.best_delta_infill_3 = 0
+        self.min_loss_time = float("inf")
+        self.infill_positions = []
+        self.infill_distance_1 = float("inf")
+        self.infill_distance_2 = float("inf")
+        # Aufschlüsselung je Zug im Flottenmodus
+        self.fleet = []
+        # übersprungene und insgesamt zulässige Kombinationen beim Pruning (tech_prune)
+        self.pruning = {"pruned": 0, "combinations": 0}
+        # Abdeckung und Optimalitätslücke der Suche mit Zeitbudget (tech_search ANYTIME)
+        self.anytime = {}
+        self.duration = 0
+
+
+class Scenario:
+    """"
+    Fasst Input-Parameter, verrechnete Größen, Ergebnis und Zwischenspeicher eines Szenarios
+    zusammen. Der gesamte Zustand einer Optimierung liegt in der Instanz, sodass mehrere Szenarien
+    in einem Prozess oder in Threads berechnet werden können.
+    """
+
+    def __init__(self, input_data: dict, directory: str = ".", curves: dict | None = None
+                 ) -> None:
+        """
+        Erstellt ein Szenario aus dem Inhalt einer Parameter-JSON.
+
+        Args:
+            input_data: Inhalt der Parameter-JSON
+            directory: Ordner, in dessen Unterordner output die Ausgaben geschrieben werden
+            curves: vorkompilierte Brems- und Anfahrkurven je Schlüssel (siehe Totals)
+
+        Raises:
+            ValueError: Parameter unvollständig
+
+        Returns:
+            none
+        """
+
+        tic = time.perf_counter()
+        self.input = Input(input_data, directory)
+        self.totals = Totals(self.input, curves)
+        self.result = Result(self.input)
+        # Speicherort der Fahrzeiten vor/zwischen/nach den Balisengruppen
+        self.running_time_intervals = [0] * (self.input.track_balises + 2)
+        # Zwischenspeicher der Trajektorien je Infill-Position (über alle Durchläufe)
+        self.trajectory_cache = {}
+        # Abschnittsergebnisse je Infill-Position (für die inkrementelle Optimierung)
+        self.stages = incremental.StageTables(input_data, self.totals)
+        # Phasenzeiten und Aufrufzähler (nur mit tech_metrics)
+        self.metrics = instrumentation.Metrics(bool(self.input.tech_metrics))
+        self.metrics.add("input", time.perf_counter() - tic)
+
+    @classmethod
+    def from_file(cls, path: str = "./parameters.json", directory: str = "."):
+        """
+        Erstellt ein Szenario aus einer Parameter-JSON.
+
+        Args:
+            path: Pfad der Parameter-JSON
+            directory: Ordner, in dessen Unterordner output die Ausgaben geschrieben werden
+
+        Raises:
+            FileNotFoundError: Parameter-JSON nicht gefunden
+            ValueError: Parameter unvollständig
+
+        Returns:
+            scenario: Szenario
+        """
+
+        tic = time.perf_counter()
+        with open(path) as file:
+            input_data = json.load(file)
+        duration = time.perf_counter() - tic
+        scenario = cls(input_data, directory)
+        scenario.metrics.add("load", duration)
+
+        return scenario
+
+    def run(self) -> Result:
+        """
+        Führt die Optimierung des Szenarios aus (siehe run()).
+
+        Args:
+            none
+
+        Raises:
+            ValueError: Daten ungültig oder keine zulässige Anordnung
+
+        Returns:
+            result: Ergebnis der Optimierung
+        """
+
+        return run(self)
+
+    def reoptimize(self, delta: dict, directory: str | None = None):
+        """
+        Optimiert das Szenario mit geänderten Parametern erneut. Die Abschnittsergebnisse je
+        Infill-Position, die nicht von den geänderten Parametern abhängen, werden übernommen,
+        z.B. bleibt das Bremsen bis zur Infill-Balisengruppe bei geänderter processing_time,
+        min_cruise_time oder Anfahrkurve erhalten.
+
+        Args:
+            delta: geänderte Parameter im Aufbau der Parameter-JSON, z.B.
+                {"train": {"processing_time": 2.0}}
+            directory: Ordner der Ausgaben (None = Ordner dieses Szenarios)
+
+        Raises:
+            ValueError: Daten ungültig oder keine zulässige Anordnung
+
+        Returns:
+            scenario: neues Szenario mit Ergebnis in scenario.result
+        """
+
+        if directory is None:
+            directory = os.path.dirname(self.input.output_directory)
+        scenario = Scenario(incremental.apply_delta(self.input.input_data, delta), directory)
+        adopted = scenario.stages.adopt(self.stages)
+        logger.info(f"Übernommene Abschnitte: {', '.join(adopted) if adopted else 'keine'}")
+        scenario.run()
+
+        return scenario
+
+
+# maximale Anzahl Elemente eines Blocks der Verlustfläche
+SURFACE_BLOCK_SIZE = 2**22
+# Mindestanzahl Positionen der ersten freien Infill-Balisengruppe für die parallele Suche
+PARALLEL_MIN_POSITIONS = 256
+# Anzahl Teilbereiche je Prozess bei der parallelen Suche
+PARALLEL_CHUNKS_PER_WORKER = 4
+# Anzahl Positionen der zweiten freien Infill-Balisengruppe je Block beim Pruning
+PRUNE_BLOCK_SIZE = 32
+# Anzahl Blöcke der ersten Berechnung beim Pruning (danach jeweils verdoppelt)
+PRUNE_FIRST_BLOCKS = 64
+
+
+@instrumentation.counted
+def infill_at_target(scenario: Scenario, distance_limit: float
+                     ) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
     """
     Berechnet die Trajektorie bei Aufwertung an der letzten Balisengruppe am End of Authority.
 
     Args:
+        scenario: Szenario
         distanceLimit: maximal zur Verfügung stehende Distanz für den Geschwindigkeitswechsel in m
 
     Raises:
@@ -193,69 +552,74 @@ def infill_at_target(distance_limit: float) -> tuple[float, float, np.ndarray, n
         accel_info: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    input, totals = scenario.input, scenario.totals
     # Datencheck
     if distance_limit < 0:
         raise ValueError(f"Wert für 'distance_limit' negativ ({distance_limit} m)")
+    # Fahrt mit zulässiger Geschwindigkeit bis Indication Point
+    s_approach, t_approach, s_approach_steps, v_approach_steps, a_approach_steps = \
+        calc.free_run(totals.track_distance_origin_target - input.train_indication_point,
+                      totals.train_speed_profile, totals.track_distance_origin_target)
     # Initialisierung
     distance_info = [0]
-    speed_info = [Totals.train_speed]
+    speed_info = [v_approach_steps[0]]
     accel_info = []
-    # Beharrungsfahrt bis Indication Point
-    s_approach, t_approach = calc.cruise(Totals.track_distance_origin_target
-                                         - Input.train_indication_point, Totals.train_speed, 0)
     # Bremsen bis auf Release Speed zwischen Indication Point und EoA
     s_decel, t_decel, s_decel_steps, v_decel_steps, a_decel_steps = calc.speed_change_open(
-        Totals.train_speed, Totals.track_release_speed, Totals.train_deceleration)
+        totals.train_approach_speed, totals.track_release_speed,
+        totals.train_deceleration_profile, input.train_indication_point)
     # Prüfung ob Zielgeschwindigkeit überhaupt erreichbar ist
     if s_decel > distance_limit:
         raise ValueError("Zielgeschwindigkeit nicht erreichbar")
     # Beharrungsfahrt mit Release Speed bis Balisengruppe am EoA
-    s_release, t_release = calc.cruise(Input.train_indication_point-s_decel,
-                                       Totals.track_release_speed, Input.train_min_cruise_time)
+    s_release, t_release = calc.cruise(input.train_indication_point-s_decel,
+                                       totals.track_release_speed, input.train_min_cruise_time)
     # Beharrungsfahrt nach Balisengruppe am EoA
-    s_process, t_process = calc.processing(Totals.track_release_speed, Input.train_processing_time)
-    # Beschleunigung auf Ausgangsgeschwindigkeit
-    s_accel, t_accel, s_accel_steps, v_accel_steps, a_accel_steps = calc.speed_change_open(
-        Totals.track_release_speed, Totals.train_speed, Totals.train_acceleration)
+    s_process, t_process = calc.processing(totals.track_release_speed, input.train_processing_time)
     # Beharrungsfahrt mit Release Speed deckt bereits Processing mit ab
-    if s_decel+s_release-Input.train_indication_point >= s_process:
+    if s_decel+s_release-input.train_indication_point >= s_process:
         s_process = 0
         t_process = 0
+    # Beschleunigung auf zulässige Geschwindigkeit
+    s_accel, t_accel, s_accel_steps, v_accel_steps, a_accel_steps = calc.speed_change_open(
+        totals.track_release_speed, totals.train_speed, totals.train_acceleration_profile,
+        input.train_indication_point-s_decel-s_release-s_process)
 
     # Summen von Strecke und Zeit
     s_total = s_approach + s_decel + s_release + s_process + s_accel
     t_total = t_approach + t_decel + t_release + t_process + t_accel
     # markante Punkte speichern
-    distance_info.append(distance_info[-1] + s_approach)
-    speed_info.append(Totals.train_speed)
-    accel_info.append(0)
+    distance_info.extend(distance_info[-1] + np.array(s_approach_steps[1:]))
+    speed_info.extend(v_approach_steps[1:])
+    accel_info.extend(a_approach_steps)
     distance_info.extend(distance_info[-1] + np.array(s_decel_steps[1:]))
     speed_info.extend(v_decel_steps[1:])
     accel_info.extend(a_decel_steps)
     distance_info.append(distance_info[-1] + s_release)
-    speed_info.append(Totals.track_release_speed)
+    speed_info.append(totals.track_release_speed)
     accel_info.append(0)
     distance_info.append(distance_info[-1] + s_process)
-    speed_info.append(Totals.track_release_speed)
+    speed_info.append(totals.track_release_speed)
     accel_info.append(0)
     distance_info.extend(distance_info[-1] + np.array(s_accel_steps[1:]))
     speed_info.extend(v_accel_steps[1:])
     accel_info.extend(a_accel_steps)
     # Fahrzeit der Trajektorie speichern
-    running_time_intervals[-1] = t_approach + t_decel + t_release
-    # Logging
-    logger.debug(f"s_approach = {s_approach:.2f} m")
-    logger.debug(f"s_decel = {s_decel:.2f} m")
-    logger.debug(f"s_release = {s_release:.2f} m")
-    logger.debug(f"s_process = {s_process:.2f} m")
-    logger.debug(f"s_accel = {s_accel:.2f} m")
-    logger.debug(f"s_total_target = {s_total:.2f} m")
-    logger.debug(f"t_approach = {t_approach:.2f} s")
-    logger.debug(f"t_decel = {t_decel:.2f} s")
-    logger.debug(f"t_release = {t_release:.2f} s")
-    logger.debug(f"t_process = {t_process:.2f} s")
-    logger.debug(f"t_accel = {t_accel:.2f} s")
-    logger.debug(f"t_total_target = {t_total:.2f} s")
+    scenario.running_time_intervals[-1] = t_approach + t_decel + t_release
+    # Logging (Formatierung nur bei aktivem Debug-Level)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"s_approach = {s_approach:.2f} m")
+        logger.debug(f"s_decel = {s_decel:.2f} m")
+        logger.debug(f"s_release = {s_release:.2f} m")
+        logger.debug(f"s_process = {s_process:.2f} m")
+        logger.debug(f"s_accel = {s_accel:.2f} m")
+        logger.debug(f"s_total_target = {s_total:.2f} m")
+        logger.debug(f"t_approach = {t_approach:.2f} s")
+        logger.debug(f"t_decel = {t_decel:.2f} s")
+        logger.debug(f"t_release = {t_release:.2f} s")
+        logger.debug(f"t_process = {t_process:.2f} s")
+        logger.debug(f"t_accel = {t_accel:.2f} s")
+        logger.debug(f"t_total_target = {t_total:.2f} s")
     # Einheitenkonertierung und Rundung
     speed_info = np.round(np.array(speed_info)*constants.CONVERT_MPS_KPH, 2)
     distance_info = np.round(distance_info, 2)
@@ -263,15 +627,17 @@ def infill_at_target(distance_limit: float) -> tuple[float, float, np.ndarray, n
     return s_total, t_total, distance_info, speed_info, accel_info
 
 
-def infill_in_rear_of_IP(s_target: float, speed: float) -> tuple[float, float, np.ndarray,
-                                                                 np.ndarray, np.ndarray]:
+@instrumentation.counted
+def infill_in_rear_of_IP(scenario: Scenario, s_target: float, speed
+                         ) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
     """
     Berechnet die Trajektorie eines Zuges, der ungehindert fährt, weil die Aufwertung vor dem
     Indication Point erfolgt.
 
     Args:
+        scenario: Szenario
         s_total_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
-        speed: gefahrene Geschwindigkeit in m/s
+        speed: gefahrene Geschwindigkeit in m/s oder LineSpeedProfile
 
     Raises:
         ValueError: Distanz negativ
@@ -285,27 +651,23 @@ def infill_in_rear_of_IP(s_target: float, speed: float) -> tuple[float, float, n
         accel_info: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    input, totals = scenario.input, scenario.totals
     # Datencheck
     if s_target < 0:
         raise ValueError(f"Wert für 's_target' negativ ({s_target} m)")
-    if speed < 0:
+    if not isinstance(speed, calc.LineSpeedProfile) and speed < 0:
         raise ValueError(f"Wert für 'speed' negativ ({speed} m/s)")
-    # Initialisierung
-    distance_info = [0]
-    speed_info = [Totals.train_speed]
-    accel_info = []
     # Summen von Strecke und Zeit
-    s_total, t_total = calc.cruise(s_target, speed, 0)
-    # markante Punkte speichern
-    distance_info.append(distance_info[-1]+s_total)
-    speed_info.append(Totals.train_speed)
-    accel_info.append(0)
+    s_total, t_total, distance_info, speed_info, accel_info = calc.free_run(
+        s_target, speed, totals.track_distance_origin_target)
     # Fahrzeit der Trajektorie speichern
-    running_time_intervals[1] = calc.cruise(
-        Totals.track_distance_origin_target-Input.track_infill_1, speed, 0)[1]
-    # Logging
-    logger.debug(f"t_total_infill_1 = {t_total:.2f} s")
-    logger.debug(f"s_total_infill_1 = {s_total:.2f} m")
+    scenario.running_time_intervals[1] = calc.free_run(
+        totals.track_distance_origin_target-input.track_infill_1, speed,
+        totals.track_distance_origin_target)[1]
+    # Logging (Formatierung nur bei aktivem Debug-Level)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"t_total_infill_1 = {t_total:.2f} s")
+        logger.debug(f"s_total_infill_1 = {s_total:.2f} m")
     # Einheitenkonertierung und Rundung
     speed_info = np.round(np.array(speed_info)*constants.CONVERT_MPS_KPH, 2)
     distance_info = np.round(distance_info, 2)
@@ -313,7 +675,8 @@ def infill_in_rear_of_IP(s_target: float, speed: float) -> tuple[float, float, n
     return s_total, t_total, distance_info, speed_info, accel_info
 
 
-def infill_in_advance_of_IP(distance_1: int, s_target: float, counter: int
+@instrumentation.counted
+def infill_in_advance_of_IP(scenario: Scenario, distance_1: int, s_target: float, counter: int
                             ) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
     """
     Berechnet die Trajektorie eines Zuges, der an seinem Indication Point einen Bremsvorgang
@@ -321,6 +684,7 @@ def infill_in_advance_of_IP(distance_1: int, s_target: float, counter: int
     beschleunigt er wieder auf die gewünschte Geschwindigkeit.
 
     Args:
+        scenario: Szenario
         distance_1: Position der Infill-Balisengruppe vor dem EoA
         s_total_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
         counter: Abschnittsnummer vor dem Punkt der Aufwertung
@@ -337,80 +701,82 @@ def infill_in_advance_of_IP(distance_1: int, s_target: float, counter: int
         accel_info: markante Punkte - Beschleunigungen in m/s^2
     """
 
+    input, totals = scenario.input, scenario.totals
     # Datencheck
     if distance_1 < 0:
         raise ValueError(f"Wert für 'distance_1' negativ ({distance_1} m)")
     if s_target < 0:
         raise ValueError(f"Wert für 's_target' negativ ({s_target} m)")
+    # Fahrt mit zulässiger Geschwindigkeit bis Indication Point
+    s_approach, t_approach, s_approach_steps, v_approach_steps, a_approach_steps = \
+        calc.free_run(totals.track_distance_origin_target-input.train_indication_point,
+                      totals.train_speed_profile, totals.track_distance_origin_target)
     # Initialisierung
     distance_info = [0]
-    speed_info = [Totals.train_speed]
+    speed_info = [v_approach_steps[0]]
     accel_info = []
-    # Beharrungsfahrt bis Indication Point
-    s_approach, t_approach = calc.cruise(
-        Totals.track_distance_origin_target-Input.train_indication_point, Totals.train_speed, 0)
     # Bremsen von Indication Point bis Infill-Balisengruppe
     s_decel, t_decel, infill_speed, s_decel_steps, v_decel_steps, \
-        a_decel_steps = calc.speed_change_limit(Totals.train_speed, Totals.track_release_speed,
-                                                Totals.train_deceleration,
-                                                Input.train_indication_point-distance_1)
+        a_decel_steps = calc.speed_change_limit(totals.train_approach_speed,
+                                                totals.track_release_speed,
+                                                totals.train_deceleration_profile,
+                                                input.train_indication_point-distance_1,
+                                                input.train_indication_point)
     # Bremsen von Infill-Balisengruppe bis Ende Verarbeitungszeit
     s_process, t_process, process_speed, cruise_time, s_process_steps, v_process_steps, \
-        a_process_steps = calc.speed_change_fixed_time(infill_speed, Totals.track_release_speed,
-                                                       Totals.train_deceleration,
-                                                       Input.train_processing_time,
-                                                       Input.train_processing_time)
-    # Beharrungsfahrt zwischen Bremsen und Beschleunigen
-    s_release, t_release = calc.cruise(
-        np.maximum(Input.train_indication_point-distance_1-s_decel-s_process, 0), process_speed,
-        np.maximum(Input.train_min_cruise_time-cruise_time, 0))
-    # Beschleunigen nach Aufwertung bis Ausgangsgeschwindigkeit
+        a_process_steps = calc.speed_change_fixed_time(infill_speed, totals.track_release_speed,
+                                                       totals.train_deceleration_profile,
+                                                       input.train_processing_time,
+                                                       input.train_processing_time,
+                                                       input.train_indication_point-s_decel)
+    # Beharrungsfahrt zwischen Bremsen und Beschleunigen (höchstens zulässige Geschwindigkeit)
+    s_release, t_release, release_speed, s_release_steps, v_release_steps, \
+        a_release_steps = calc.cruise_limit(
+            np.maximum(input.train_indication_point-distance_1-s_decel-s_process, 0),
+            process_speed, np.maximum(input.train_min_cruise_time-cruise_time, 0),
+            totals.train_speed_profile, input.train_indication_point-s_decel-s_process)
+    # Beschleunigen nach Aufwertung bis zulässige Geschwindigkeit
     s_accel, t_accel, s_accel_steps, v_accel_steps, a_accel_steps = calc.speed_change_open(
-        process_speed, Totals.train_speed, Totals.train_acceleration)
-    # Beharrungsfahrt bis Ende Betrachtungsraum
-    s_cruise, t_cruise = calc.cruise(s_target-s_approach-s_decel-s_process-s_release-s_accel,
-                                     Totals.train_speed, 0)
+        release_speed, totals.train_speed, totals.train_acceleration_profile,
+        input.train_indication_point-s_decel-s_process-s_release)
+    # Fahrt mit zulässiger Geschwindigkeit bis Ende Betrachtungsraum
+    s_cruise, t_cruise, s_cruise_steps, v_cruise_steps, a_cruise_steps = calc.free_run(
+        s_target-s_approach-s_decel-s_process-s_release-s_accel, totals.train_speed_profile,
+        input.train_indication_point-s_decel-s_process-s_release-s_accel)
     # Summen von Strecke und Zeit
     s_total = s_approach + s_decel + s_process + s_release + s_accel + s_cruise
     t_total = t_approach + t_decel + t_process + t_release + t_accel + t_cruise
     # Fahrzeit der Trajektorie speichern
-    running_time_intervals[counter+1] = t_approach + t_decel
+    scenario.running_time_intervals[counter+1] = t_approach + t_decel
     # markante Punkte speichern
-    distance_info.append(distance_info[-1] + s_approach)
-    speed_info.append(Totals.train_speed)
-    accel_info.append(0)
-    distance_info.extend(distance_info[-1] + np.array(s_decel_steps[1:]))
-    speed_info.extend(v_decel_steps[1:])
-    accel_info.extend(a_decel_steps)
-    distance_info.extend(distance_info[-1] + np.array(s_process_steps[1:]))
-    speed_info.extend(v_process_steps[1:])
-    accel_info.extend(a_process_steps)
-    distance_info.append(distance_info[-1] + s_release)
-    speed_info.append(process_speed)
-    accel_info.append(0)
-    distance_info.extend(distance_info[-1] + np.array(s_accel_steps[1:]))
-    speed_info.extend(v_accel_steps[1:])
-    accel_info.extend(a_accel_steps)
-    distance_info.append(distance_info[-1] + s_cruise)
-    speed_info.append(Totals.train_speed)
-    accel_info.append(0)
-    # Logging
-    logger.debug(f"Speed at Infill: {infill_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
-    logger.debug(f"Speed after Processing: {process_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
-    logger.debug(f"s_approach = {s_approach:.2f} m")
-    logger.debug(f"s_decel = {s_decel:.2f} m")
-    logger.debug(f"s_process = {s_process:.2f} m")
-    logger.debug(f"s_release = {s_release:.2f} m")
-    logger.debug(f"s_accel = {s_accel:.2f} m")
-    logger.debug(f"s_cruise2 = {s_cruise:.2f} m")
-    logger.debug(f"s_total_target = {s_target:.2f} m")
-    logger.debug(f"t_approach = {t_approach:.2f} s")
-    logger.debug(f"t_decel = {t_decel:.2f} s")
-    logger.debug(f"t_process = {t_process:.2f} s")
-    logger.debug(f"t_release = {t_release:.2f} s")
-    logger.debug(f"t_accel = {t_accel:.2f} s")
-    logger.debug(f"t_cruise = {t_cruise:.2f} s")
-    logger.debug(f"t_total_infill_2 = {t_total:.2f} s")
+    for distance_steps, speed_steps, accel_steps in [
+            (s_approach_steps, v_approach_steps, a_approach_steps),
+            (s_decel_steps, v_decel_steps, a_decel_steps),
+            (s_process_steps, v_process_steps, a_process_steps),
+            (s_release_steps, v_release_steps, a_release_steps),
+            (s_accel_steps, v_accel_steps, a_accel_steps),
+            (s_cruise_steps, v_cruise_steps, a_cruise_steps)]:
+        distance_info.extend(distance_info[-1] + np.array(distance_steps[1:]))
+        speed_info.extend(speed_steps[1:])
+        accel_info.extend(accel_steps)
+    # Logging (Formatierung nur bei aktivem Debug-Level)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Speed at Infill: {infill_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
+        logger.debug(f"Speed after Processing: {process_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
+        logger.debug(f"s_approach = {s_approach:.2f} m")
+        logger.debug(f"s_decel = {s_decel:.2f} m")
+        logger.debug(f"s_process = {s_process:.2f} m")
+        logger.debug(f"s_release = {s_release:.2f} m")
+        logger.debug(f"s_accel = {s_accel:.2f} m")
+        logger.debug(f"s_cruise2 = {s_cruise:.2f} m")
+        logger.debug(f"s_total_target = {s_target:.2f} m")
+        logger.debug(f"t_approach = {t_approach:.2f} s")
+        logger.debug(f"t_decel = {t_decel:.2f} s")
+        logger.debug(f"t_process = {t_process:.2f} s")
+        logger.debug(f"t_release = {t_release:.2f} s")
+        logger.debug(f"t_accel = {t_accel:.2f} s")
+        logger.debug(f"t_cruise = {t_cruise:.2f} s")
+        logger.debug(f"t_total_infill_2 = {t_total:.2f} s")
     # Einheitenkonertierung und Rundung
     speed_info = np.round(np.array(speed_info)*constants.CONVERT_MPS_KPH, 2)
     distance_info = np.round(distance_info, 2)
@@ -418,8 +784,789 @@ def infill_in_advance_of_IP(distance_1: int, s_target: float, counter: int
     return s_total, t_total, distance_info, speed_info, accel_info
 
 
-def optimize(balises: int, steps: int, fixed_1: int, fixed_2: int, envelope: int) -> tuple[int,
-                                                                                           int]:
+@instrumentation.counted
+def infill_in_advance_of_IP_batch(scenario: Scenario, distances_1: np.ndarray, s_target: float
+                                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vektorisierte Variante von infill_in_advance_of_IP für ein Feld von Infill-Positionen. Es
+    werden nur die Summen, jedoch keine markanten Punkte berechnet. Die Abschnitte ab dem
+    Indication Point werden je Position in den Tabellen des Szenarios gehalten und nur einmal
+    berechnet (siehe incremental.py), elementweise Abschnitte werden stets neu berechnet.
+
+    Args:
+        scenario: Szenario
+        distances_1: Positionen der Infill-Balisengruppe vor dem EoA
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+
+    Raises:
+        ValueError: Infill-Distanz negativ
+        ValueError: gesamte Fahrstrecke negativ
+
+    Returns:
+        t_total: gesamte Fahrzeiten in s
+        infill_speed: Geschwindigkeiten an der Infill-Balisengruppe in m/s
+        process_speed: Geschwindigkeiten nach Ende der Verarbeitungszeit in m/s
+        running_time: Fahrzeiten bis zur Infill-Balisengruppe in s
+    """
+
+    input, totals, stages = scenario.input, scenario.totals, scenario.stages
+    positions = np.asarray(distances_1)
+    distances_1 = positions.astype(float)
+    # Datencheck
+    if np.any(distances_1 < 0):
+        raise ValueError(f"Wert für 'distance_1' negativ ({np.min(distances_1)} m)")
+    if s_target < 0:
+        raise ValueError(f"Wert für 's_target' negativ ({s_target} m)")
+    # Fahrt mit zulässiger Geschwindigkeit bis Indication Point
+    s_approach, t_approach = calc.free_run(
+        totals.track_distance_origin_target-input.train_indication_point,
+        totals.train_speed_profile, totals.track_distance_origin_target)[:2]
+    # Bremsen von Indication Point bis Infill-Balisengruppe
+    s_decel, t_decel, infill_speed = stages.evaluate(
+        "decel", positions, lambda distances: calc.speed_change_limit_batch(
+            totals.train_approach_speed, totals.track_release_speed,
+            totals.train_deceleration_profile, input.train_indication_point-distances,
+            input.train_indication_point), distances_1)
+    # Bremsen von Infill-Balisengruppe bis Ende Verarbeitungszeit
+    s_process, t_process, process_speed, cruise_time = stages.evaluate(
+        "process", positions, lambda speed, start: calc.speed_change_fixed_time_batch(
+            speed, totals.track_release_speed, totals.train_deceleration_profile,
+            input.train_processing_time, input.train_processing_time, start),
+        infill_speed, input.train_indication_point-s_decel)
+    # Beharrungsfahrt zwischen Bremsen und Beschleunigen (höchstens zulässige Geschwindigkeit)
+    s_release, t_release, release_speed = calc.cruise_limit_batch(
+        np.maximum(input.train_indication_point-distances_1-s_decel-s_process, 0), process_speed,
+        np.maximum(input.train_min_cruise_time-cruise_time, 0), totals.train_speed_profile,
+        input.train_indication_point-s_decel-s_process)
+    # Beschleunigen nach Aufwertung bis zulässige Geschwindigkeit
+    s_accel, t_accel = stages.evaluate(
+        "accel", positions, lambda speed, start: calc.speed_change_open_batch(
+            speed, totals.train_speed, totals.train_acceleration_profile, start),
+        release_speed, input.train_indication_point-s_decel-s_process-s_release)
+    # Fahrt mit zulässiger Geschwindigkeit bis Ende Betrachtungsraum
+    s_cruise, t_cruise = calc.free_run_batch(
+        s_target-s_approach-s_decel-s_process-s_release-s_accel, totals.train_speed_profile,
+        input.train_indication_point-s_decel-s_process-s_release-s_accel)
+    # Summe der Zeit und Fahrzeit bis zur Aufwertung
+    t_total = t_approach + t_decel + t_process + t_release + t_accel + t_cruise
+    running_time = t_approach + t_decel
+
+    return t_total, infill_speed, process_speed, running_time
+
+
+@instrumentation.counted
+def cached_infill_in_advance_of_IP(scenario: Scenario, distance_1: int, s_target: float,
+                                   counter: int
+                                   ) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Liefert die Trajektorie aus infill_in_advance_of_IP und berechnet sie je Infill-Position im
+    Zwischenspeicher des Szenarios nur einmal. Die zugehörige Fahrzeit bis zur Aufwertung wird mit
+    gespeichert und bei jedem Aufruf in running_time_intervals übernommen.
+
+    Args:
+        scenario: Szenario
+        distance_1: Position der Infill-Balisengruppe vor dem EoA
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        counter: Abschnittsnummer vor dem Punkt der Aufwertung
+
+    Raises:
+        ValueError: Infill-Distanz negativ
+        ValueError: gesamte Fahrstrecke negativ
+
+    Returns:
+        s_total: gesamte gefahrene Strecke in m
+        t_total: gesamte Fahrzeit in s
+        distance_info: markante Punkte - Distanzen in m
+        speed_info: markante Punkte - Geschwindigkeiten in m/s
+        accel_info: markante Punkte - Beschleunigungen in m/s^2
+    """
+
+    key = (distance_1, s_target)
+    if key not in scenario.trajectory_cache:
+        trajectory = infill_in_advance_of_IP(scenario, distance_1, s_target, counter)
+        scenario.trajectory_cache[key] = (trajectory, scenario.running_time_intervals[counter+1])
+    trajectory, running_time = scenario.trajectory_cache[key]
+    scenario.running_time_intervals[counter+1] = running_time
+
+    return trajectory
+
+
+def weighting_factors(scenario: Scenario, balises: int, distance_1, distance_2,
+                      running_times: list) -> list:
+    """
+    Berechnet die Gewichtungsfaktoren der Abschnitte vor, zwischen und nach den freien
+    Infill-Balisengruppen. Positionen und Fahrzeiten dürfen auch Felder sein.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distance_1: Position(en) der ersten freien Infill-Balisengruppe vor dem EoA in m
+        distance_2: Position(en) der zweiten freien Infill-Balisengruppe vor dem EoA in m
+        running_times: Fahrzeiten vor/zwischen/nach den Balisengruppen (wie running_time_intervals)
+
+    Raises:
+        none
+
+    Returns:
+        factors: Gewichtungsfaktoren in Reihenfolge Target -> IF -> IF
+    """
+
+    input = scenario.input
+    match balises:
+        case 2:
+            factors = [0, 0]  # Target -> IF -> IF
+            match input.tech_weighting:
+                case Weighting.TIME:
+                    factors = [running_times[3] - running_times[2],
+                               running_times[2] - running_times[1]]
+                case Weighting.DISTANCE:
+                    factors = [distance_1, input.track_infill_1 - distance_1]
+                case Weighting.EQUAL:
+                    factors = [1, 1]
+        case 3:
+            factors = [0, 0, 0]  # Target -> IF -> IF
+            match input.tech_weighting:
+                case Weighting.TIME:
+                    factors = [running_times[4] - running_times[3],
+                               running_times[3] - running_times[2],
+                               running_times[2] - running_times[1],
+                               ]
+                case Weighting.DISTANCE:
+                    factors = [distance_2,
+                               distance_1 - distance_2,
+                               input.track_infill_1 - distance_1]
+                case Weighting.EQUAL:
+                    factors = [1, 1, 1]
+
+    return factors
+
+
+def weighted_loss(scenario: Scenario, factors: list, delta_infill_2, delta_infill_3=0):
+    """
+    Berechnet den gewichteten Fahrzeitverlust aus den Gewichtungsfaktoren und den
+    Fahrzeitverlängerungen der Aufwertepunkte. Fahrzeitverlängerungen dürfen auch Felder sein.
+
+    Args:
+        scenario: Szenario
+        factors: Gewichtungsfaktoren in Reihenfolge Target -> IF -> IF
+        delta_infill_2: Fahrzeitverlängerung bei Aufwertung an der ersten freien Infill-BG in s
+        delta_infill_3: Fahrzeitverlängerung bei Aufwertung an der zweiten freien Infill-BG in s
+
+    Raises:
+        none
+
+    Returns:
+        mean_time_loss: gewichteter Fahrzeitverlust in s
+    """
+
+    result = scenario.result
+    if len(factors) == 2:
+        return (factors[0]*result.delta_target + factors[1]*delta_infill_2) / sum(factors)
+
+    return (factors[0]*result.delta_target + factors[1]*delta_infill_3
+            + factors[2]*delta_infill_2) / sum(factors)
+
+
+def limits_2(scenario: Scenario, balises: int, distance_1: int, fixed_2: int, envelope: int
+             ) -> tuple[int, int]:
+    """
+    Bestimmt die Grenzen der Schleife über die zweite freie Infill-Balisengruppe.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distance_1: Position der ersten freien Infill-Balisengruppe vor dem EoA in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+
+    Raises:
+        none
+
+    Returns:
+        start_2: erste Position in m
+        limit_2: Grenze (exklusiv) in m
+    """
+
+    input = scenario.input
+    start_2 = 1
+    limit_2 = 1 + 1 if balises == 2 else distance_1 - input.track_balise_group_distance + 1
+    if fixed_2 > 0:
+        start_2 = fixed_2 - envelope
+        limit_2 = fixed_2 + envelope + 1
+
+    return start_2, limit_2
+
+
+def sweep_loop(scenario: Scenario, balises: int, distances_1: range, steps: int, fixed_2: int,
+               envelope: int, s_target: float, t_total_infill_1: float
+               ) -> tuple[float, int, int] | None:
+    """
+    Skalare Suche über alle Kombinationen der freien Infill-Balisengruppen. Bei drei
+    Balisengruppen wird der Fahrzeitverlust jeder Kombination in result.results gespeichert.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+    """
+
+    input, result = scenario.input, scenario.result
+    # Initialisierung
+    best = None
+    min_loss_prev = float("inf")
+    prune = input.tech_prune and balises == 3
+    # Debug-Ausgaben nur formatieren, wenn sie auch ausgegeben werden
+    debug = logger.isEnabledFor(logging.DEBUG)
+    # Schleife über Position der ersten freien Infillbalisengruppe
+    for distance_1 in distances_1:
+        # Initialisierung
+        min_loss_iter = float("inf")
+        start_2, limit_2 = limits_2(scenario, balises, distance_1, fixed_2, envelope)
+        # Trajektorie bei Aufwertung an erster freien Infillbalisengruppe berechnen
+        t_total_infill_2 = cached_infill_in_advance_of_IP(scenario, distance_1, s_target, 1)[1]
+        delta_infill_2 = t_total_infill_2 - t_total_infill_1
+        # Logging
+        if debug:
+            logger.debug(f"Delta Infill 1: {delta_infill_2:.2f} s")
+
+        # Blöcke der zweiten freien Infillbalisengruppe, die den bisher besten
+        # Fahrzeitverlust nicht unterschreiten können, überspringen
+        distances_2 = range(start_2, limit_2, steps)
+        if prune:
+            running_time_2 = scenario.running_time_intervals[2]
+            incumbent = min(min_loss_prev, result.min_loss_time)
+            kept = []
+            for block in range(0, len(distances_2), PRUNE_BLOCK_SIZE):
+                block_2 = distances_2[block:block+PRUNE_BLOCK_SIZE]
+                edges = []
+                for distance_2 in [block_2[0], block_2[-1]]:
+                    t_total_infill_3 = cached_infill_in_advance_of_IP(scenario, distance_2,
+                                                                      s_target, 2)[1]
+                    edges.append((t_total_infill_3 - t_total_infill_1,
+                                  scenario.running_time_intervals[3]))
+                (delta_a, running_a), (delta_b, running_b) = edges
+                bound = prune_bounds(scenario, distance_1, delta_infill_2, running_time_2,
+                                     block_2[0], block_2[-1], min(delta_a, delta_b),
+                                     max(delta_a, delta_b), min(running_a, running_b),
+                                     max(running_a, running_b))
+                if bound > incumbent + search.PRUNE_TOLERANCE * abs(incumbent):
+                    result.pruning["pruned"] += len(block_2)
+                else:
+                    kept.extend(block_2)
+            result.pruning["combinations"] += len(distances_2)
+            distances_2 = kept
+
+        # Schleife über Position der zweiten freien Infillbalisengruppe
+        for distance_2 in distances_2:
+            delta_infill_3 = 0
+            if balises == 3:
+                # Trajektorie bei Aufwertung an zweiter freien Infillbalisengruppe berechnen
+                t_total_infill_3 = cached_infill_in_advance_of_IP(scenario, distance_2, s_target,
+                                                                  2)[1]
+                delta_infill_3 = t_total_infill_3 - t_total_infill_1
+                if debug:
+                    logger.debug(f"Delta Infill 2: {delta_infill_3:.2f} s")
+            # mittleren Fahrzeitverlust berechnen
+            factors = weighting_factors(scenario, balises, distance_1, distance_2,
+                                        scenario.running_time_intervals)
+            mean_time_loss = weighted_loss(scenario, factors, delta_infill_2, delta_infill_3)
+
+            # Logging
+            match balises:
+                case 2 if debug:
+                    logger.debug(f"Distance: {distance_1} m "
+                                 f"-> Weighted Additional Runtime: {mean_time_loss:.2f} s")
+                case 3 if debug:
+                    logger.debug(f"Distances: {distance_2} m & {distance_1} m "
+                                 f"-> Weighted Additional Runtime: {mean_time_loss:.2f} s")
+
+            # beste Kombination merken
+            if best is None or mean_time_loss <= best[0]:
+                best = (float(mean_time_loss), distance_1, distance_2)
+            # aktueller mininimaler Fahrzeitverlust
+            min_loss_iter = np.minimum(min_loss_iter, mean_time_loss)
+            # Fehler bei negativem Fahrzeitverlust
+            if mean_time_loss < 0:
+                raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
+            # 2D-Array für Ergebnis
+            if balises == 3:
+                result.results[distance_1-1, distance_2-1] = mean_time_loss
+            elif result.loss_curve is not None:
+                result.loss_curve[distance_1-1] = mean_time_loss
+
+        # minimaler Zeitverlust der vorherigen Iteration
+        min_loss_prev = np.minimum(min_loss_prev, min_loss_iter)
+
+    return best
+
+
+def sweep_vector(scenario: Scenario, balises: int, distances_1: range, steps: int, fixed_2: int,
+                 envelope: int, s_target: float, t_total_infill_1: float
+                 ) -> tuple[float, int, int] | None:
+    """
+    Vektorisierte Suche über alle Positionen der freien Infill-Balisengruppe bei zwei
+    Balisengruppen. Die Verlustkurve wird mit wenigen Feldoperationen berechnet; bei
+    Gleichstand gewinnt wie in sweep_loop die zuletzt berechnete Position.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+    """
+
+    # Positionen der zweiten Balisengruppe sind bei zwei Balisengruppen unabhängig von distance_1
+    distances_2 = range(*limits_2(scenario, balises, 0, fixed_2, envelope), steps)
+    if len(distances_1) == 0 or len(distances_2) == 0:
+        return None
+    distances_1 = np.asarray(distances_1)
+    # Verlustkurve über alle Positionen
+    t_total_infill_2, running_time_2 = infill_in_advance_of_IP_batch(scenario, distances_1,
+                                                                     s_target)[::3]
+    delta_infill_2 = t_total_infill_2 - t_total_infill_1
+    running_times = list(scenario.running_time_intervals)
+    running_times[2] = running_time_2
+    factors = weighting_factors(scenario, balises, distances_1, distances_2[-1], running_times)
+    mean_time_loss = weighted_loss(scenario, factors, delta_infill_2)
+    # Fehler bei negativem Fahrzeitverlust
+    if np.any(mean_time_loss < 0):
+        raise ValueError(f"Fahrzeitverlust negativ ({np.min(mean_time_loss)} s)")
+    if scenario.result.loss_curve is not None:
+        scenario.result.loss_curve[distances_1-1] = mean_time_loss
+    # letztes Minimum entspricht der Auswahl mit '<=' in sweep_loop
+    valid = ~np.isnan(mean_time_loss)
+    if not np.any(valid):
+        return None
+    index = len(mean_time_loss) - 1 - np.argmin(np.where(valid, mean_time_loss, np.inf)[::-1])
+
+    return float(mean_time_loss[index]), int(distances_1[index]), distances_2[-1]
+
+
+def sweep_surface(scenario: Scenario, balises: int, distances_1: range, steps: int, fixed_2: int,
+                  envelope: int, s_target: float, t_total_infill_1: float
+                  ) -> tuple[float, int, int] | None:
+    """
+    Vektorisierte Suche über die gesamte Verlustfläche bei drei Balisengruppen. Die
+    Fahrzeitverlängerungen und Fahrzeiten werden je Position einmal berechnet und die Fläche
+    blockweise per Broadcasting aufgebaut. Bei Gleichstand gewinnt wie in sweep_loop die zuletzt
+    berechnete Kombination.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+    """
+
+    input, result = scenario.input, scenario.result
+    if len(distances_1) == 0:
+        return None
+    distances_1 = np.asarray(distances_1)
+    # Positionen der zweiten Balisengruppe über alle Zeilen
+    distances_2 = np.arange(*limits_2(scenario, balises, int(np.max(distances_1)), fixed_2,
+                                      envelope), steps)
+    if len(distances_2) == 0:
+        return None
+    # Fahrzeitverlängerungen und Fahrzeiten je Position
+    t_total_infill_2, running_time_2 = infill_in_advance_of_IP_batch(scenario, distances_1,
+                                                                     s_target)[::3]
+    t_total_infill_3, running_time_3 = infill_in_advance_of_IP_batch(scenario, distances_2,
+                                                                     s_target)[::3]
+    delta_infill_2 = t_total_infill_2 - t_total_infill_1
+    delta_infill_3 = t_total_infill_3 - t_total_infill_1
+    running_times = list(scenario.running_time_intervals)
+    running_times[3] = running_time_3[np.newaxis, :]
+
+    # Verlustfläche blockweise aufbauen, um den Speicherbedarf zu begrenzen
+    best = None
+    rows = max(1, SURFACE_BLOCK_SIZE // len(distances_2))
+    for block in range(0, len(distances_1), rows):
+        block_1 = distances_1[block:block+rows, np.newaxis]
+        running_times[2] = running_time_2[block:block+rows, np.newaxis]
+        factors = weighting_factors(scenario, balises, block_1, distances_2[np.newaxis, :],
+                                    running_times)
+        mean_time_loss = weighted_loss(scenario, factors,
+                                       delta_infill_2[block:block+rows, np.newaxis],
+                                       delta_infill_3[np.newaxis, :])
+        # nur Kombinationen mit Mindestabstand, sofern keine Vorgabe besteht
+        mask = np.ones(mean_time_loss.shape, dtype=bool)
+        if fixed_2 <= 0:
+            mask = distances_2[np.newaxis, :] <= block_1 - input.track_balise_group_distance
+        mask &= ~np.isnan(mean_time_loss)
+        # Fehler bei negativem Fahrzeitverlust
+        if np.any(mean_time_loss[mask] < 0):
+            raise ValueError(f"Fahrzeitverlust negativ ({np.min(mean_time_loss[mask])} s)")
+        # 2D-Array für Ergebnis
+        index_1, index_2 = np.nonzero(mask)
+        result.results[block_1[index_1, 0]-1, distances_2[index_2]-1] = mean_time_loss[mask]
+        if not np.any(mask):
+            continue
+        # letztes Minimum in Zeilenreihenfolge entspricht der Auswahl mit '<=' in sweep_loop
+        flat = np.where(mask, mean_time_loss, np.inf).ravel()
+        index = len(flat) - 1 - np.argmin(flat[::-1])
+        if best is None or flat[index] <= best[0]:
+            index_1, index_2 = divmod(index, len(distances_2))
+            best = (float(flat[index]), int(block_1[index_1, 0]), int(distances_2[index_2]))
+
+    return best
+
+
+def prune_bounds(scenario: Scenario, distance_1, delta_infill_2, running_time_2, lower_2,
+                 upper_2, delta_lower, delta_upper, running_lower, running_upper):
+    """
+    Berechnet eine untere Schranke des gewichteten Fahrzeitverlusts bei drei Balisengruppen für
+    eine Position der ersten freien Infill-Balisengruppe und einen Block von Positionen der
+    zweiten. Abschnitt und Fahrzeitverlängerung der ersten freien Balisengruppe sind je Zeile
+    bekannt. Fahrzeitverlängerung und Fahrzeit sind wie in search.lower_bounds() monoton in der
+    Position, sodass sie im Block zwischen ihren Werten an den Blockgrenzen liegen. Die Summe der
+    Gewichtungsfaktoren ist für alle Kombinationen gleich. Alle Größen dürfen auch Felder sein.
+
+    Args:
+        scenario: Szenario
+        distance_1: Position(en) der ersten freien Infill-Balisengruppe vor dem EoA in m
+        delta_infill_2: Fahrzeitverlängerung(en) bei Aufwertung an distance_1 in s
+        running_time_2: Fahrzeit(en) bis zur Aufwertung an distance_1 in s
+        lower_2: kleinste Position(en) des Blocks der zweiten freien Balisengruppe in m
+        upper_2: größte Position(en) des Blocks der zweiten freien Balisengruppe in m
+        delta_lower: kleinste Fahrzeitverlängerung(en) im Block in s
+        delta_upper: größte Fahrzeitverlängerung(en) im Block in s
+        running_lower: kleinste Fahrzeit(en) bis zur Aufwertung im Block in s
+        running_upper: größte Fahrzeit(en) bis zur Aufwertung im Block in s
+
+    Raises:
+        none
+
+    Returns:
+        bound: untere Schranke des gewichteten Fahrzeitverlusts in s
+    """
+
+    result = scenario.result
+    running_times = list(scenario.running_time_intervals)
+    running_times[2] = running_time_2
+    # Ecke mit kürzestem Abschnitt bis zum EoA und längstem Abschnitt zur ersten Balisengruppe
+    running_times[3] = running_upper
+    near = weighting_factors(scenario, 3, distance_1, lower_2, running_times)
+    # Ecke mit längstem Abschnitt bis zum EoA und kürzestem Abschnitt zur ersten Balisengruppe
+    running_times[3] = running_lower
+    far = weighting_factors(scenario, 3, distance_1, upper_2, running_times)
+    factor_lower = np.maximum(far[1], 0)
+    bound = (near[2] * delta_infill_2
+             + np.minimum(np.maximum(near[0], 0) * result.delta_target,
+                          far[0] * result.delta_target)
+             + np.minimum.reduce([factor_lower * delta_lower, factor_lower * delta_upper,
+                                  near[1] * delta_lower, near[1] * delta_upper]))
+
+    return bound / (near[0] + near[1] + near[2])
+
+
+def sweep_pruned(scenario: Scenario, balises: int, distances_1: range, steps: int, fixed_2: int,
+                 envelope: int, s_target: float, t_total_infill_1: float
+                 ) -> tuple[float, int, int] | None:
+    """
+    Vektorisierte Suche bei drei Balisengruppen wie sweep_surface mit exaktem Pruning. Die
+    Positionen der zweiten freien Infill-Balisengruppe werden je Zeile in Blöcke geteilt und je
+    Block eine untere Schranke berechnet (siehe prune_bounds). Die Blöcke werden in Reihenfolge
+    ihrer Schranke berechnet; Blöcke, deren Schranke über dem bisher besten Fahrzeitverlust liegt,
+    werden übersprungen. Bei Gleichstand gewinnt wie in sweep_loop die in Zeilenreihenfolge
+    letzte Kombination, sodass das Ergebnis dem von sweep_surface entspricht. In result.results
+    werden nur die berechneten Kombinationen gespeichert.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+    """
+
+    input, result = scenario.input, scenario.result
+    if len(distances_1) == 0:
+        return None
+    distances_1 = np.asarray(distances_1)
+    # Positionen der zweiten Balisengruppe über alle Zeilen
+    distances_2 = np.arange(*limits_2(scenario, balises, int(np.max(distances_1)), fixed_2,
+                                      envelope), steps)
+    if len(distances_2) == 0:
+        return None
+    # Fahrzeitverlängerungen und Fahrzeiten je Position
+    t_total_infill_2, running_time_2 = infill_in_advance_of_IP_batch(scenario, distances_1,
+                                                                     s_target)[::3]
+    t_total_infill_3, running_time_3 = infill_in_advance_of_IP_batch(scenario, distances_2,
+                                                                     s_target)[::3]
+    delta_infill_2 = t_total_infill_2 - t_total_infill_1
+    delta_infill_3 = t_total_infill_3 - t_total_infill_1
+
+    # Blöcke der zweiten Balisengruppe und zulässige Kombinationen je Zeile und Block
+    starts = np.arange(0, len(distances_2), PRUNE_BLOCK_SIZE)
+    ends = np.minimum(starts + PRUNE_BLOCK_SIZE, len(distances_2))
+    counts = np.broadcast_to(ends - starts, (len(distances_1), len(starts)))
+    if fixed_2 <= 0:  # nur Kombinationen mit Mindestabstand, sofern keine Vorgabe besteht
+        limits = np.searchsorted(distances_2, distances_1 - input.track_balise_group_distance,
+                                 side="right")
+        counts = np.clip(limits[:, np.newaxis] - starts[np.newaxis, :], 0, ends - starts)
+    rows, blocks = np.nonzero(counts > 0)
+    counts = counts[rows, blocks]
+    # Schranken je Zeile und Block
+    edges = np.stack([starts[blocks], ends[blocks] - 1])
+    bounds = prune_bounds(scenario, distances_1[rows], delta_infill_2[rows],
+                          running_time_2[rows], distances_2[edges[0]], distances_2[edges[1]],
+                          np.min(delta_infill_3[edges], axis=0),
+                          np.max(delta_infill_3[edges], axis=0),
+                          np.min(running_time_3[edges], axis=0),
+                          np.max(running_time_3[edges], axis=0))
+    order = np.argsort(bounds, kind="stable")
+    rows, blocks, counts, bounds = rows[order], blocks[order], counts[order], bounds[order]
+    result.pruning["combinations"] += int(np.sum(counts))
+
+    # Blöcke in Reihenfolge ihrer Schranke berechnen
+    best = None
+    incumbent = result.min_loss_time
+    running_times = list(scenario.running_time_intervals)
+    # Anzahl Blöcke je Berechnung verdoppeln, bis die Blockgröße der Verlustfläche erreicht ist
+    pairs = PRUNE_FIRST_BLOCKS
+    batch = 0
+    evaluated = 0
+    while batch < len(rows):
+        threshold = incumbent + search.PRUNE_TOLERANCE * abs(incumbent)
+        keep = ~(bounds[batch:batch+pairs] > threshold)
+        if not np.any(keep):
+            break
+        batch_rows = rows[batch:batch+pairs][keep]
+        batch_counts = counts[batch:batch+pairs][keep]
+        batch_blocks = blocks[batch:batch+pairs][keep]
+        batch += pairs
+        pairs = min(2 * pairs, max(1, SURFACE_BLOCK_SIZE // PRUNE_BLOCK_SIZE))
+        evaluated += int(np.sum(batch_counts))
+        # Kombinationen der Blöcke (Spalten ab Blockbeginn)
+        index_1 = np.repeat(batch_rows, batch_counts)
+        offsets = np.arange(len(index_1)) - np.repeat(np.cumsum(batch_counts) - batch_counts,
+                                                      batch_counts)
+        index_2 = np.repeat(starts[batch_blocks], batch_counts) + offsets
+        running_times[2] = running_time_2[index_1]
+        running_times[3] = running_time_3[index_2]
+        factors = weighting_factors(scenario, balises, distances_1[index_1],
+                                    distances_2[index_2], running_times)
+        mean_time_loss = weighted_loss(scenario, factors, delta_infill_2[index_1],
+                                       delta_infill_3[index_2])
+        valid = ~np.isnan(mean_time_loss)
+        # Fehler bei negativem Fahrzeitverlust
+        if np.any(mean_time_loss[valid] < 0):
+            raise ValueError(f"Fahrzeitverlust negativ ({np.min(mean_time_loss[valid])} s)")
+        # 2D-Array für Ergebnis
+        result.results[distances_1[index_1[valid]]-1, distances_2[index_2[valid]]-1] = \
+            mean_time_loss[valid]
+        if not np.any(valid):
+            continue
+        # letztes Minimum in Zeilenreihenfolge entspricht der Auswahl mit '<=' in sweep_loop
+        mean_time_loss = np.where(valid, mean_time_loss, np.inf)
+        candidates = np.flatnonzero(mean_time_loss == np.min(mean_time_loss))
+        index = candidates[np.lexsort((index_2[candidates], index_1[candidates]))[-1]]
+        candidate = (float(mean_time_loss[index]), int(distances_1[index_1[index]]),
+                     int(distances_2[index_2[index]]))
+        if best is None or candidate[0] < best[0] or (candidate[0] == best[0]
+                                                       and candidate[1:] > best[1:]):
+            best = candidate
+            incumbent = min(incumbent, best[0])
+    result.pruning["pruned"] += int(np.sum(counts)) - evaluated
+
+    return best
+
+
+def sweep_chunk(input_data: dict, sweep, balises: int, distances_1: range, steps: int,
+                fixed_2: int, envelope: int, s_target: float, t_total_infill_1: float,
+                running_times: list, delta_target: float
+                ) -> tuple[tuple[float, int, int] | None, np.ndarray, np.ndarray, np.ndarray,
+                           dict, instrumentation.Metrics]:
+    """
+    Führt eine Suche für einen Teilbereich der ersten freien Infill-Balisengruppe in einem
+    Prozess des Prozesspools aus. Das Szenario wird im Prozess aus den Parametern neu erstellt und
+    der Zustand des aufrufenden Szenarios explizit übergeben. Die Aufrufzähler des Prozesses
+    werden mit zurückgegeben.
+
+    Args:
+        input_data: Inhalt der Parameter-JSON des Szenarios
+        sweep: Suchfunktion (sweep_loop, sweep_vector, sweep_surface oder sweep_pruned)
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+        running_times: Fahrzeiten vor/zwischen/nach den Balisengruppen
+        delta_target: Fahrzeitverlängerung bei Aufwertung am EoA in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+        rows: Zeilen der berechneten Kombinationen in result.results (bzw. result.loss_curve)
+        columns: Spalten der berechneten Kombinationen in result.results (bzw. 0)
+        values: Fahrzeitverluste der berechneten Kombinationen in s
+        pruning: übersprungene und insgesamt zulässige Kombinationen beim Pruning
+        metrics: Messung des Prozesses
+    """
+
+    # Zustand des aufrufenden Szenarios übernehmen
+    scenario = Scenario(input_data)
+    result = scenario.result
+    scenario.running_time_intervals[:] = running_times
+    result.delta_target = delta_target
+    if balises == 3:
+        result.results = results_store.ResultsStore(scenario.input.track_infill_1)
+    else:
+        result.loss_curve = np.full(scenario.input.track_infill_1, np.nan)
+    # Suche im Teilbereich
+    with instrumentation.activate(scenario.metrics):
+        best = sweep(scenario, balises, distances_1, steps, fixed_2, envelope, s_target,
+                     t_total_infill_1)
+    # nur die berechneten Kombinationen der Verlustfläche bzw. -kurve zurückgeben
+    if balises != 3:
+        rows = np.asarray(distances_1) - 1
+        return best, rows, np.zeros(len(rows), dtype=int), result.loss_curve[rows], \
+            result.pruning, scenario.metrics
+    entries = result.results.entries(np.asarray(distances_1) - 1)
+    result.results.close()
+
+    return (best, *entries, result.pruning, scenario.metrics)
+
+
+def sweep_parallel(scenario: Scenario, sweep, balises: int, distances_1: range, steps: int,
+                   fixed_2: int, envelope: int, s_target: float, t_total_infill_1: float
+                   ) -> tuple[float, int, int] | None:
+    """
+    Teilt die Positionen der ersten freien Infill-Balisengruppe in Teilbereiche auf und sucht
+    diese parallel in einem Prozesspool. Die Teilergebnisse werden in der Reihenfolge der
+    Positionen zusammengeführt, sodass die Auswahl mit '<=' wie bei der seriellen Suche erfolgt.
+
+    Args:
+        scenario: Szenario
+        sweep: Suchfunktion (sweep_loop, sweep_vector, sweep_surface oder sweep_pruned)
+        balises: Gesamtzahl der Infill-Balisengruppen
+        distances_1: Positionen der ersten freien Infill-Balisengruppe in m
+        steps: Schrittweite der Balisenpositionierung in m
+        fixed_2: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
+        envelope: Suchumgebung um Mittelpunkt aus fixed_2 in m
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        best: minimaler Fahrzeitverlust mit Positionen (None, falls keine Kombination)
+    """
+
+    input, result = scenario.input, scenario.result
+    # Teilbereiche bilden
+    chunks = np.array_split(np.asarray(distances_1),
+                            input.tech_workers*PARALLEL_CHUNKS_PER_WORKER)
+    chunks = [range(int(chunk[0]), int(chunk[-1])+1, steps) for chunk in chunks if len(chunk)]
+    logger.info(f"Parallele Suche mit {input.tech_workers} Prozessen in {len(chunks)} Teilen")
+    # Teilbereiche parallel berechnen und in Reihenfolge zusammenführen
+    best = None
+    with concurrent.futures.ProcessPoolExecutor(max_workers=input.tech_workers) as executor:
+        futures = [executor.submit(sweep_chunk, input.input_data, sweep, balises, chunk, steps,
+                                   fixed_2, envelope, s_target, t_total_infill_1,
+                                   list(scenario.running_time_intervals), result.delta_target)
+                   for chunk in chunks]
+        for future in futures:
+            chunk_best, rows, columns, values, pruning, metrics = future.result()
+            scenario.metrics.merge(metrics)
+            for name, count in pruning.items():
+                result.pruning[name] += count
+            if len(values) and balises == 3:
+                result.results[rows, columns] = values
+            elif len(values) and result.loss_curve is not None:
+                result.loss_curve[rows] = values
+            if chunk_best is not None and (best is None or chunk_best[0] <= best[0]):
+                best = chunk_best
+
+    return best
+
+
+@instrumentation.phase("trajectories")
+def store_best(scenario: Scenario, balises: int, best: tuple[float, int, int], s_target: float,
+               t_total_infill_1: float) -> None:
+    """
+    Übernimmt die beste Kombination in das Ergebnis und berechnet dafür die markanten Punkte der
+    Trajektorien.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        best: minimaler Fahrzeitverlust mit Positionen
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    result = scenario.result
+    result.min_loss_time, result.infill_distance_1, result.infill_distance_2 = best
+    # Trajektorie bei Aufwertung an erster freien Infillbalisengruppe
+    t_total_infill_2, result.best_distance_infill_2, result.best_speed_infill_2, \
+        result.best_accel_infill_2 = cached_infill_in_advance_of_IP(
+            scenario, result.infill_distance_1, s_target, 1)[1:]
+    result.best_delta_infill_2 = t_total_infill_2 - t_total_infill_1
+    # Trajektorie bei Aufwertung an zweiter freien Infillbalisengruppe
+    if balises == 3:
+        t_total_infill_3, result.best_distance_infill_3, result.best_speed_infill_3, \
+            result.best_accel_infill_3 = cached_infill_in_advance_of_IP(
+                scenario, result.infill_distance_2, s_target, 2)[1:]
+        result.best_delta_infill_3 = t_total_infill_3 - t_total_infill_1
+    result.best_factors = weighting_factors(scenario, balises, result.infill_distance_1,
+                                            result.infill_distance_2,
+                                            scenario.running_time_intervals)
+
+
+def optimize(scenario: Scenario, balises: int, steps: int, fixed_1: int, fixed_2: int,
+             envelope: int) -> tuple[int, int]:
     """
     Führt die Optimierung der Balisenstandorte für vorgegebene Grenzen und Schrittweiten durch.
     Für jede berechnete Kombination wird der gewichtete Fahrzeitverlust bestimmt und immer die
@@ -428,6 +1575,7 @@ def optimize(balises: int, steps: int, fixed_1: int, fixed_2: int, envelope: int
     sowie das Plotten angestoßen
 
     Args:
+        scenario: Szenario
         balises: Gesamtzahl der Infill-Balisengruppen
         steps: Schrittweite der Balisenpositionierung in m
         fixed_1: Vorgabe einer Infill-Balisengruppe in m vor dem EoA (0 = keine Vorgabe)
@@ -438,196 +1586,691 @@ def optimize(balises: int, steps: int, fixed_1: int, fixed_2: int, envelope: int
         ValueError: Fahrzeitverlust negativ
 
     Returns:
-        Output.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
-        Output.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
+        result.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
+        result.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
     """
 
-    # Initialisierung
-    min_loss_prev = float("inf")
-    best_accel_infill_3 = []
-    best_factors = []
+    input, result = scenario.input, scenario.result
     # Grenzen setzen
-    if Input.track_infill_2 > 0:  # zwei Infillbalisengruppen vorgegeben
-        start_1 = Input.track_infill_2
+    if input.track_infill_2 > 0:  # zwei Infillbalisengruppen vorgegeben
+        start_1 = input.track_infill_2
         limit_1 = start_1 + 1
     else:  # nur eine Infillbalisengruppe vorgegeben
-        start_1 = 1 + Input.track_balise_group_distance
-        limit_1 = np.minimum(Input.train_indication_point, Input.track_infill_1
-                             ) - Input.track_balise_group_distance
+        start_1 = 1 + input.track_balise_group_distance
+        limit_1 = np.minimum(input.train_indication_point, input.track_infill_1
+                             ) - input.track_balise_group_distance
     # Grenzen setzen
     if fixed_1 > 0:
-        if Input.track_infill_2 > 0:  # Position eine weiteren Balisengruppe ist vorgegeben
+        if input.track_infill_2 > 0:  # Position eine weiteren Balisengruppe ist vorgegeben
             start_1 = fixed_1
             limit_1 = fixed_1 + 1
         else:  # keine weitere Position ist vorgegeben
             start_1 = fixed_1 - envelope
             limit_1 = fixed_1 + envelope + 1
 
+    # Trajektorien bei Infill am EoA und an der festen Infillbalisengruppe
+    s_total_target, t_total_infill_1 = reference_trajectories(scenario)
+    # Logging
+    logger.debug(f"Delta Target: {result.delta_target:.2f} s")
+    # Suche über die Positionen der freien Infillbalisengruppen
+    distances_1 = range(int(start_1), int(limit_1), steps)
+    match input.tech_engine, balises:
+        case Engine.VECTOR, 2:
+            sweep = sweep_vector
+        case Engine.VECTOR, 3:
+            sweep = sweep_pruned if input.tech_prune else sweep_surface
+        case _:
+            sweep = sweep_loop
+    pruning = dict(result.pruning)
+    if input.tech_workers > 1 and len(distances_1) >= PARALLEL_MIN_POSITIONS:
+        best = sweep_parallel(scenario, sweep, balises, distances_1, steps, fixed_2, envelope,
+                              s_total_target, t_total_infill_1)
+    else:
+        best = sweep(scenario, balises, distances_1, steps, fixed_2, envelope, s_total_target,
+                     t_total_infill_1)
+    # Logging
+    logger.debug(f"Trajektorien im Zwischenspeicher: {len(scenario.trajectory_cache)}")
+    if input.tech_prune and balises == 3:
+        combinations = result.pruning["combinations"] - pruning["combinations"]
+        pruned = result.pruning["pruned"] - pruning["pruned"]
+        logger.info(f"Pruning: {pruned} von {combinations} Kombinationen übersprungen "
+                    f"({pruned / max(combinations, 1):.1%})")
+
+    # Ergebnisse speichern wenn Verbesserung erreicht wird
+    if best is not None and best[0] <= result.min_loss_time:
+        store_best(scenario, balises, best, s_total_target, t_total_infill_1)
+
+    # Output der Ergebnisse
+    if steps == 1:
+        report_results(scenario, balises)
+
+    return result.infill_distance_1, result.infill_distance_2
+
+
+def report_results(scenario: Scenario, balises: int, plot: bool = True) -> None:
+    """
+    Gibt das Ergebnis bei zwei oder drei Infill-Balisengruppen aus, schreibt die JSON und stößt
+    das Plotten an.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        plot: Plots nach tech_plot_2d und tech_plot_3d erstellen (False = keine Plots)
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    input, totals, result = scenario.input, scenario.totals, scenario.result
+    list_infill = [result.infill_distance_1, input.track_infill_1]
+    match balises:
+        case 2:
+            logger.info(f"Min. gewichteter Fahrzeitverlust: {result.min_loss_time:.2f} s "
+                        f"bei {result.infill_distance_1} m & {input.track_infill_1} m")
+        case 3:
+            list_infill.append(result.infill_distance_2)
+            logger.info(f"Min. gewichteter Fahrzeitverlust: {result.min_loss_time:.2f} s "
+                        f"bei {result.infill_distance_2} m, {result.infill_distance_1} m &"
+                        f" {input.track_infill_1} m")
+
+    # json Output
+    result.infill_positions = sorted(list_infill, reverse=True)
+    export_results(scenario, list_infill)
+    plot_2d = plot and input.tech_plot_2d
+    plot_3d = plot and input.tech_plot_3d and balises == 3
+    # Logging
+    if plot_2d or plot_3d:
+        logging.info("plotten...")
+    loglevel = logging.getLogger().getEffectiveLevel()
+    if logging.getLevelName(loglevel) != 'INFO':
+        logging.getLogger().setLevel(logging.INFO)
+    # Plot-Module (matplotlib, pandas) erst bei Bedarf laden, ohne Plots bleibt der Start schnell
+    if plot_2d or plot_3d:
+        import plots
+    # plotten der 2D-Trajektorien
+    if plot_2d:
+        with scenario.metrics.phase("plot_2d"):
+            plots.plot_trajectory(result.accel_infill_1, result.best_accel_infill_2,
+                                  result.best_accel_infill_3, result.accel_target, input,
+                                  totals, result, result.best_factors)
+    # plotten des 3D-Fahrzeitverlusts bei drei Infillbalisengruppen
+    if plot_3d:
+        with scenario.metrics.phase("plot_3d"):
+            plots.plot_3d_shape(result.results, input, result)
+    logging.getLogger().setLevel(loglevel)
+
+
+def chain_weights(scenario: Scenario, distance_a, distance_b, running_time_a, running_time_b):
+    """
+    Berechnet den Gewichtungsfaktor des Abschnitts zwischen zwei aufeinanderfolgenden
+    Balisengruppen. Positionen und Fahrzeiten dürfen auch Felder sein.
+
+    Args:
+        scenario: Szenario
+        distance_a: Position(en) der Balisengruppe am Abschnittsbeginn vor dem EoA in m
+        distance_b: Position(en) der Balisengruppe am Abschnittsende vor dem EoA in m
+        running_time_a: Fahrzeit(en) bis zur Aufwertung am Abschnittsbeginn in s
+        running_time_b: Fahrzeit(en) bis zur Aufwertung am Abschnittsende in s
+
+    Raises:
+        none
+
+    Returns:
+        factor: Gewichtungsfaktor(en) des Abschnitts
+    """
+
+    input = scenario.input
+    match input.tech_weighting:
+        case Weighting.TIME:
+            return running_time_b - running_time_a
+        case Weighting.DISTANCE:
+            return distance_a - distance_b
+        case Weighting.EQUAL:
+            return np.ones(np.broadcast(distance_a, distance_b).shape)
+
+
+@instrumentation.phase("trajectories")
+def reference_trajectories(scenario: Scenario) -> tuple[float, float]:
+    """
+    Berechnet die Trajektorien bei Aufwertung am EoA und an der festen Infill-Balisengruppe und
+    speichert sie im Ergebnis.
+
+    Args:
+        scenario: Szenario
+
+    Raises:
+        none
+
+    Returns:
+        s_total_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+    """
+
+    input, totals, result = scenario.input, scenario.totals, scenario.result
     # Trajektorie bei Infill an Balisengruppe am EoA
-    s_total_target, t_total_target, Output.distance_target, Output.speed_target, \
-        accel_target = infill_at_target(Input.track_infill_1)
+    s_total_target, t_total_target, result.distance_target, result.speed_target, \
+        result.accel_target = infill_at_target(scenario, input.track_infill_1)
     # Relation Indication Point zu erste Infillbalisengruppe
-    if Input.train_indication_point > Input.track_infill_1:  # Regelfall
-        t_total_infill_1, Output.distance_infill_1, Output.speed_infill_1, \
-            accel_infill_1 = infill_in_advance_of_IP(Input.track_infill_1, s_total_target, 0)[1:]
+    if input.train_indication_point > input.track_infill_1:  # Regelfall
+        t_total_infill_1, result.distance_infill_1, result.speed_infill_1, \
+            result.accel_infill_1 = cached_infill_in_advance_of_IP(scenario, input.track_infill_1,
+                                                                   s_total_target, 0)[1:]
     else:  # Indication Point noch vor erster Infillbalisengruppe
-        t_total_infill_1, Output.distance_infill_1, Output.speed_infill_1, \
-            accel_infill_1 = infill_in_rear_of_IP(s_total_target, Totals.train_speed)[1:]
-
+        t_total_infill_1, result.distance_infill_1, result.speed_infill_1, \
+            result.accel_infill_1 = infill_in_rear_of_IP(scenario, s_total_target,
+                                                         totals.train_speed_profile)[1:]
     # Fahrzeitverlängerung bei Infill an Balisengruppe am EoA
-    Output.delta_target = t_total_target - t_total_infill_1
+    result.delta_target = t_total_target - t_total_infill_1
+
+    return s_total_target, t_total_infill_1
+
+
+def optimize_chain(scenario: Scenario, balises: int, steps: int) -> list[int]:
+    """
+    Führt die Optimierung für eine beliebige Anzahl Infill-Balisengruppen per dynamischer
+    Programmierung durch. Die Summe der Gewichtungsfaktoren ist für alle Anordnungen gleich,
+    sodass der gewichtete Fahrzeitverlust eine Summe über aufeinanderfolgende Abschnitte ist.
+    Je Ebene wird für jede Position der minimale Restverlust bis zum EoA bestimmt, womit der
+    Aufwand O(N·M²) statt O(M^N) beträgt. Vorgegebene Positionen aus balise_positions werden als
+    Ebene mit nur einer Position berücksichtigt. Bei Gleichstand wird wie in optimize() jeweils
+    die größere Position gewählt.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        steps: Schrittweite der Balisenpositionierung in m
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        result.infill_positions: Optimale Balisenpositionen vor dem EoA in m (absteigend)
+    """
+
+    input, result = scenario.input, scenario.result
+    s_total_target, t_total_infill_1 = reference_trajectories(scenario)
+    running_time_infill_1 = scenario.running_time_intervals[1]
+    running_time_target = scenario.running_time_intervals[-1]
+
+    # Raster der Positionen je Ebene (Ebene 1 = erste freie Balisengruppe nach infill_1)
+    limit_1 = min(input.train_indication_point, input.track_infill_1) - \
+        input.track_balise_group_distance
+    grids = []
+    for level in range(1, balises):
+        fixed = input.track_balise_positions[level]
+        if fixed > 0:
+            grids.append(np.array([fixed]))
+        elif level == 1:
+            grids.append(np.arange(1 + input.track_balise_group_distance, limit_1, steps))
+        else:
+            grids.append(np.arange(1, limit_1, steps))
+    # Fahrzeitverlängerungen und Fahrzeiten je Position
+    positions = np.unique(np.concatenate(grids))
+    t_total, running_time = infill_in_advance_of_IP_batch(scenario, positions,
+                                                          s_total_target)[::3]
+    delta = [(t_total - t_total_infill_1)[np.searchsorted(positions, grid)] for grid in grids]
+    running = [running_time[np.searchsorted(positions, grid)] for grid in grids]
+
+    # letzte Ebene: Abschnitt bis zum EoA
+    remaining = (chain_weights(scenario, grids[-1], 0, running[-1], running_time_target)
+                 * result.delta_target)
+    choices = []
+    # Ebenen rückwärts: minimaler Restverlust je Position
+    for level in range(len(grids)-2, -1, -1):
+        grid_a, grid_b = grids[level], grids[level+1]
+        best_value = np.full(len(grid_a), np.inf)
+        best_choice = np.zeros(len(grid_a), dtype=int)
+        rows = max(1, SURFACE_BLOCK_SIZE // len(grid_b))
+        for block in range(0, len(grid_a), rows):
+            block_a = grid_a[block:block+rows, np.newaxis]
+            cost = (chain_weights(scenario, block_a, grid_b[np.newaxis, :],
+                                  running[level][block:block+rows, np.newaxis],
+                                  running[level+1][np.newaxis, :]) * delta[level+1][np.newaxis, :]
+                    + remaining[np.newaxis, :])
+            cost = np.where(grid_b[np.newaxis, :] <= block_a - input.track_balise_group_distance,
+                            cost, np.inf)
+            # letztes Minimum entspricht der größten Position bei Gleichstand
+            index = cost.shape[1] - 1 - np.argmin(cost[:, ::-1], axis=1)
+            best_value[block:block+rows] = cost[np.arange(len(index)), index]
+            best_choice[block:block+rows] = index
+        remaining = best_value
+        choices.insert(0, best_choice)
+    # erste Ebene: Abschnitt ab der festen Infill-Balisengruppe
+    total = chain_weights(scenario, input.track_infill_1, grids[0], running_time_infill_1,
+                          running[0]) * delta[0] + remaining
+    if len(total) == 0 or np.all(np.isinf(total)):
+        raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+    index = len(total) - 1 - np.argmin(total[::-1])
+
+    # Rückverfolgung der gewählten Positionen
+    indices = [index]
+    for choice in choices:
+        indices.append(choice[indices[-1]])
+    chain = [int(grid[i]) for grid, i in zip(grids, indices)]
+    # gewichteten Fahrzeitverlust normieren
+    distances = [input.track_infill_1, *chain, 0]
+    running_times = [running_time_infill_1, *[r[i] for r, i in zip(running, indices)],
+                     running_time_target]
+    factors = [float(chain_weights(scenario, distances[k], distances[k+1], running_times[k],
+                                   running_times[k+1])) for k in range(len(distances)-1)]
+    mean_time_loss = float(total[index]) / sum(factors)
+    # Fehler bei negativem Fahrzeitverlust
+    if mean_time_loss < 0:
+        raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
+
+    # Ergebnisse speichern
+    result.min_loss_time = mean_time_loss
+    result.infill_positions = [input.track_infill_1, *chain]
+    result.infill_distance_1 = chain[0]
+    result.infill_distance_2 = chain[1] if len(chain) > 1 else result.infill_distance_2
+    result.best_factors = factors[::-1]  # Target -> IF -> IF
+    report_chain(scenario)
+
+    return result.infill_positions
+
+
+def report_chain(scenario: Scenario) -> None:
+    """
+    Gibt das Ergebnis ab vier Infill-Balisengruppen aus und schreibt die JSON.
+
+    Args:
+        scenario: Szenario
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    input, result = scenario.input, scenario.result
+    logger.info(f"Min. gewichteter Fahrzeitverlust: {result.min_loss_time:.2f} s bei "
+                f"{', '.join(str(position) for position in result.infill_positions[::-1])} m")
+    export_results(scenario, result.infill_positions)
+    if input.tech_plot_2d or input.tech_plot_3d:
+        logger.info("Plots sind nur für 2 oder 3 Infill-Balisengruppen verfügbar")
+
+
+def optimize_adaptive(scenario: Scenario, balises: int) -> tuple[int, int]:
+    """
+    Führt die Optimierung bei zwei oder drei Infill-Balisengruppen mit der adaptiven Suche aus
+    search.py durch. Ausgehend vom Raster mit tech_steps werden nur die Bereiche bis 1 m
+    verfeinert, die nach ihrer unteren Schranke noch eine Verbesserung enthalten können. Das
+    Ergebnis entspricht der vollständigen Suche mit Schrittweite 1 m.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        result.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
+        result.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
+    """
+
+    input, result = scenario.input, scenario.result
+    s_total_target, t_total_infill_1 = reference_trajectories(scenario)
+    ranges, evaluate = search_problem(scenario, balises, s_total_target, t_total_infill_1)
+    mean_time_loss, points, statistics = search.adaptive_search(
+        input, result, ranges, evaluate, functools.partial(chain_weights, scenario),
+        scenario.running_time_intervals[1], scenario.running_time_intervals[-1])
+    # Fehler bei negativem Fahrzeitverlust
+    if mean_time_loss < 0:
+        raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
     # Logging
-    logger.debug(f"Delta Target: {Output.delta_target:.2f} s")
-    # Schleife über Position der ersten freien Infillbalisengruppe
-    for distance_1 in range(start_1, limit_1, steps):
-        # Initialisierung
-        min_loss_iter = float("inf")
-        start_2 = 1
-        # Grenzen setzen
-        limit_2 = 1 + 1 if balises == 2 else distance_1 - Input.track_balise_group_distance + 1
-        if fixed_2 > 0:
-            start_2 = fixed_2 - envelope
-            limit_2 = fixed_2 + envelope + 1
+    logger.info(f"Adaptive Suche: {statistics['evaluations']} von {statistics['exhaustive']} "
+                f"Trajektorien berechnet ({statistics['saved']} eingespart, "
+                f"{statistics['rounds']} Runden)")
 
-        # Schleife über Position der zweiten freien Infillbalisengruppe
-        for distance_2 in range(start_2, limit_2, steps):
-            # Trajektorie bei Aufwertung an zweiter freien Infillbalisengruppe berechnen
-            t_total_infill_2, distance_infill_2, speed_infill_2, \
-                accel_infill_2 = infill_in_advance_of_IP(distance_1, s_total_target, 1)[1:]
-            delta_infill_2 = t_total_infill_2 - t_total_infill_1
-            # Logging
-            logger.debug(f"Delta Infill 1: {delta_infill_2:.2f} s")
+    # Ergebnisse speichern
+    store_best(scenario, balises, (mean_time_loss, points[0], points[1] if balises == 3 else 1),
+               s_total_target, t_total_infill_1)
+    report_results(scenario, balises)
 
-            match balises:
-                case 2:
-                    # Gewichtungsfaktoren berechnen
-                    factors = [0, 0]  # Target -> IF -> IF
-                    match Input.tech_weighting:
-                        case Weighting.TIME:
-                            factors = [running_time_intervals[3] - running_time_intervals[2],
-                                       running_time_intervals[2] - running_time_intervals[1]]
-                        case Weighting.DISTANCE:
-                            factors = [distance_1, Input.track_infill_1 - distance_1]
-                        case Weighting.EQUAL:
-                            factors = [1, 1]
-
-                    # mittleren Fahrzeitverlust berechnen
-                    mean_time_loss = (factors[0]*Output.delta_target + factors[1]*delta_infill_2
-                                      ) / sum(factors)
-                case 3:
-                    # Trajektorie bei Aufwertung an zweiter freien Infillbalisengruppe berechnen
-                    t_total_infill_3, distance_infill_3, speed_infill_3, \
-                        accel_infill_3 = infill_in_advance_of_IP(distance_2, s_total_target, 2)[1:]
-                    delta_infill_3 = t_total_infill_3 - t_total_infill_1
-                    logger.debug(f"Delta Infill 2: {delta_infill_3:.2f} s")
-                    # Gewichtungsfaktoren berechnen
-                    factors = [0, 0, 0]  # Target -> IF -> IF
-                    match Input.tech_weighting:
-                        case Weighting.TIME:
-                            factors = [running_time_intervals[4] - running_time_intervals[3],
-                                       running_time_intervals[3] - running_time_intervals[2],
-                                       running_time_intervals[2] - running_time_intervals[1],
-                                       ]
-                        case Weighting.DISTANCE:
-                            factors = [distance_2,
-                                       distance_1 - distance_2,
-                                       Input.track_infill_1 - distance_1]
-                        case Weighting.EQUAL:
-                            factors = [1, 1, 1]
-
-                    # mittleren Fahrzeitverlust berechnen
-                    mean_time_loss = (factors[0]*Output.delta_target + factors[1]*delta_infill_3
-                                      + factors[2]*delta_infill_2) / sum(factors)
+    return result.infill_distance_1, result.infill_distance_2
 
-            # Logging
-            match balises:
-                case 2:
-                    logger.debug(f"Distance: {distance_1} m "
-                                 f"-> Weighted Additional Runtime: {mean_time_loss:.2f} s")
-                case 3:
-                    logger.debug(f"Distances: {distance_2} m & {distance_1} m "
-                                 f"-> Weighted Additional Runtime: {mean_time_loss:.2f} s")
 
-            # Ergebnisse speichern wenn Verbesserung erreicht wird
-            if mean_time_loss <= Output.min_loss_time:
-                Output.min_loss_time = mean_time_loss
-                Output.infill_distance_1 = distance_1
-                Output.infill_distance_2 = distance_2
-                Output.best_distance_infill_2 = distance_infill_2
-                Output.best_speed_infill_2 = speed_infill_2
-                Output.best_delta_infill_2 = delta_infill_2
-                best_accel_infill_2 = accel_infill_2
-                best_factors = factors
-
-                if balises == 3:
-                    Output.best_distance_infill_3 = distance_infill_3
-                    Output.best_speed_infill_3 = speed_infill_3
-                    Output.best_delta_infill_3 = delta_infill_3
-                    best_accel_infill_3 = accel_infill_3
+def optimize_continuous(scenario: Scenario, balises: int) -> tuple[float, float]:
+    """
+    Führt die Optimierung bei zwei oder drei Infill-Balisengruppen mit der kontinuierlichen Suche
+    aus search.py durch. Die Positionen werden ausgehend vom Raster mit tech_steps ohne Raster
+    bis auf search.CONTINUOUS_TOLERANCE bestimmt.
 
-            # aktueller mininimaler Fahrzeitverlust
-            min_loss_iter = np.minimum(min_loss_iter, mean_time_loss)
-            # Fehler bei negativem Fahrzeitverlust
-            if mean_time_loss < 0:
-                raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
-            # 2D-Array für Ergebnis
-            if balises == 3:
-                Output.results[distance_1-1, distance_2-1] = mean_time_loss
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
 
-        # minimaler Zeitverlust der vorherigen Iteration
-        min_loss_prev = np.minimum(min_loss_prev, min_loss_iter)
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+        ValueError: Fahrzeitverlust negativ
 
-    # Output der Ergebnisse
-    if steps == 1:
-        list_infill = [Output.infill_distance_1, Input.track_infill_1]
-        match balises:
-            case 2:
-                logger.info(f"Min. gewichteter Fahrzeitverlust: {Output.min_loss_time:.2f} s "
-                            f"bei {Output.infill_distance_1} m & {Input.track_infill_1} m")
-            case 3:
-                list_infill.append(Output.infill_distance_2)
-                logger.info(f"Min. gewichteter Fahrzeitverlust: {Output.min_loss_time:.2f} s "
-                            f"bei {Output.infill_distance_2} m, {Output.infill_distance_1} m &"
-                            f" {Input.track_infill_1} m")
-
-        # json Output
-        output_data = Input.input_data
-        list_infill.sort(reverse=True)
-        output_data["results"] = {
-            "infill_positions": list_infill,
-            "additional_runtime": round(Output.min_loss_time, 2)
-        }
-        path = "output/json"
-        if not os.path.exists(path):
-            os.makedirs(path)
-        with open(f"./{path}/{Input.timestr}_results.json", "w") as outfile:
-            json.dump(output_data, outfile, indent=4)
-        # Logging
-        if Input.tech_plot_2d or Input.tech_plot_3d:
-            logging.info("plotten...")
-        loglevel = logging.getLogger().getEffectiveLevel()
-        if logging.getLevelName(loglevel) != 'INFO':
-            logging.getLogger().setLevel(logging.INFO)
-        # plotten der 2D-Trajektorien
-        if Input.tech_plot_2d:
-            plots.plot_trajectory(accel_infill_1, best_accel_infill_2, best_accel_infill_3,
-                                  accel_target, Input, Totals, Output, best_factors)
-        # plotten des 3D-Fahrzeitverlusts bei drei Infillbalisengruppen
-        if (Input.tech_plot_3d and balises == 3):
-            plots.plot_3d_shape(pd.DataFrame(Output.results), Input, Output)
-        logging.getLogger().setLevel(loglevel)
-
-    return Output.infill_distance_1, Output.infill_distance_2
+    Returns:
+        result.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
+        result.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
+    """
 
+    input, result = scenario.input, scenario.result
+    s_total_target, t_total_infill_1 = reference_trajectories(scenario)
+    ranges, evaluate = search_problem(scenario, balises, s_total_target, t_total_infill_1)
+    mean_time_loss, points, statistics = search.continuous_search(
+        input, result, ranges, evaluate, functools.partial(chain_weights, scenario),
+        scenario.running_time_intervals[1], scenario.running_time_intervals[-1])
+    # Fehler bei negativem Fahrzeitverlust
+    if mean_time_loss < 0:
+        raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
+    # Logging
+    logger.info(f"Kontinuierliche Suche: {statistics['evaluations']} Trajektorien berechnet "
+                f"({statistics['grid']} im Startraster, {statistics['refined']} in der "
+                f"Verfeinerung ab {statistics['starts']} Startpunkten)")
 
-def main() -> None:
+    # Ergebnisse speichern
+    store_best(scenario, balises, (mean_time_loss, points[0], points[1] if balises == 3 else 1),
+               s_total_target, t_total_infill_1)
+    report_results(scenario, balises)
+
+    return result.infill_distance_1, result.infill_distance_2
+
+
+def optimize_anytime(scenario: Scenario, balises: int) -> tuple[int, int]:
+    """
+    Führt die Optimierung bei zwei oder drei Infill-Balisengruppen mit der Suche mit Zeitbudget
+    aus search.py durch. Die Frist beginnt mit dem Aufruf (tech_time_budget in s), danach wird
+    das bisher beste Ergebnis mit Abdeckung des Suchraums und Abschätzung der
+    Optimalitätslücke übernommen. Die Trajektorien des Ergebnisses zählen zum Zeitbudget, die
+    Überschreitung der Frist wird in result.anytime ausgegeben. Plots lassen sich nicht im
+    Zeitbudget begrenzen und entfallen.
+
+    Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        result.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
+        result.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
+    """
+
+    input, result = scenario.input, scenario.result
+    tic = time.perf_counter()
+    deadline = tic + input.tech_time_budget
+    s_total_target, t_total_infill_1 = reference_trajectories(scenario)
+    ranges, evaluate = search_problem(scenario, balises, s_total_target, t_total_infill_1)
+    mean_time_loss, points, statistics = search.anytime_search(
+        input, result, ranges, evaluate, functools.partial(chain_weights, scenario),
+        scenario.running_time_intervals[1], scenario.running_time_intervals[-1], deadline)
+    duration = time.perf_counter() - tic
+    # Fehler bei negativem Fahrzeitverlust
+    if mean_time_loss < 0:
+        raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
+    result.anytime = {
+        "complete": statistics["complete"],
+        "coverage": round(statistics["coverage"], 4),
+        "gap": round(statistics["gap"], 4),
+        "evaluations": statistics["evaluations"],
+        "exhaustive": statistics["exhaustive"],
+        "rounds": statistics["rounds"],
+        "search_time": round(duration, 3)
+    }
+    # Logging
+    state = "optimal" if statistics["complete"] else "Frist erreicht"
+    logger.info(f"Suche mit Zeitbudget ({state}) nach {duration:0.2f} s: "
+                f"{statistics['coverage']:.1%} des Suchraums entschieden, Optimalitätslücke "
+                f"höchstens {statistics['gap']:0.2f} s, {statistics['evaluations']} von "
+                f"{statistics['exhaustive']} Trajektorien berechnet "
+                f"({statistics['rounds']} Runden)")
+
+    # Ergebnisse speichern, Überschreitung der Frist bis zur Übernahme des Ergebnisses
+    store_best(scenario, balises, (mean_time_loss, points[0], points[1] if balises == 3 else 1),
+               s_total_target, t_total_infill_1)
+    overshoot = max(time.perf_counter() - deadline, 0.0)
+    result.anytime["overshoot"] = round(overshoot, 3)
+    if overshoot > 0:
+        logger.info(f"Frist um {overshoot:0.3f} s überschritten")
+    if input.tech_plot_2d or input.tech_plot_3d:
+        logger.info("Plots entfallen bei der Suche mit Zeitbudget")
+    report_results(scenario, balises, plot=False)
+
+    return result.infill_distance_1, result.infill_distance_2
+
+
+def search_problem(scenario: Scenario, balises: int, s_target: float, t_total_infill_1: float
+                   ) -> tuple[list, object]:
     """
-    Einstiegspunkt der Optimierung. Es werden die notwendigen Checks durchgeführt, bevor in einem
-    zweistufigen Verfahren die optimale Platzierung der Infill-Balisengruppen gefunden wird.
+    Bestimmt die Bereiche der freien Infill-Balisengruppen und die Funktion der
+    Fahrzeitverlängerungen für die Suchverfahren aus search.py.
 
     Args:
+        scenario: Szenario
+        balises: Gesamtzahl der Infill-Balisengruppen
+        s_target: Distanz bis zum Wiedererreichen der zulässigen Geschwindigkeit in m
+        t_total_infill_1: Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe in s
+
+    Raises:
         none
 
+    Returns:
+        ranges: kleinste und größte Position je freier Balisengruppe in m (absteigend)
+        evaluate: Funktion der Fahrzeitverlängerungen und Fahrzeiten für ein Feld von Positionen
+    """
+
+    input = scenario.input
+    # Bereiche der freien Balisengruppen (vorgegebene Positionen als einzelner Punkt)
+    upper_1 = min(input.train_indication_point, input.track_infill_1) - \
+        input.track_balise_group_distance - 1
+    ranges = [(input.track_infill_2,) * 2 if input.track_infill_2 > 0 else
+              (1 + input.track_balise_group_distance, upper_1)]
+    if balises == 3:
+        ranges.append((input.track_infill_3,) * 2 if input.track_infill_3 > 0 else
+                      (1, ranges[0][1] - input.track_balise_group_distance))
+
+    def evaluate(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        t_total, running_time = infill_in_advance_of_IP_batch(scenario, positions,
+                                                              s_target)[::3]
+        return t_total - t_total_infill_1, running_time
+
+    return ranges, evaluate
+
+
+def fleet_trains(scenario: Scenario, balises: int) -> list[tuple]:
+    """
+    Erstellt je Zug der Flotte ein Szenario mit gemeinsamer Strecke, prüft die Daten und
+    berechnet die Trajektorien bei Aufwertung am EoA und an der festen Infill-Balisengruppe.
+
+    Args:
+        scenario: Szenario mit Flotte
+        balises: Gesamtzahl der Infill-Balisengruppen
+
+    Raises:
+        ValueError: mehr als drei Infill-Balisengruppen
+        ValueError: Daten eines Zuges ungültig
+
+    Returns:
+        trains: Name, Verkehrsanteil, Szenario, Distanz bis zum Wiedererreichen der zulässigen
+            Geschwindigkeit in m und Fahrzeit bei Aufwertung an der festen Infill-Balisengruppe
+            in s je Zug
+    """
+
+    input = scenario.input
+    if balises > 3:
+        raise ValueError("Flottenmodus nur für 2 oder 3 Infill-Balisengruppen")
+    directory = os.path.dirname(input.output_directory)
+    trains = []
+    for name, share, data in input.fleet:
+        input_data = {key: value for key, value in input.input_data.items() if key != "fleet"}
+        input_data["train"] = data
+        train = Scenario(input_data, directory)
+        # Ausgaben je Zug mit Name im Dateinamen
+        train.input.timestr = f"{input.timestr}_{name}"
+        train.metrics = scenario.metrics
+        try:
+            checks.checks(train.input, train.totals)
+        except ValueError as error:
+            raise ValueError(f"Zug '{name}': {error}") from error
+        trains.append((name, share, train, *reference_trajectories(train)))
+
+    return trains
+
+
+def optimize_fleet(scenario: Scenario, balises: int, steps: int) -> tuple[int, int]:
+    """
+    Führt die Optimierung bei zwei oder drei Infill-Balisengruppen für eine Flotte mehrerer Züge
+    durch. Minimiert wird die Summe der gewichteten Fahrzeitverluste der Züge, gewichtet mit
+    ihren Verkehrsanteilen. Je Zug werden die Fahrzeitverlängerungen aller Kandidaten in einem
+    vektorisierten Aufruf mit den vorkompilierten Brems- und Anfahrkurven des Zuges berechnet.
+    Wie in run() wird zunächst mit Schrittweite steps und danach mit 1 m um das Ergebnis gesucht.
+    Bei Gleichstand wird wie in optimize() die größere Position gewählt.
+
+    Args:
+        scenario: Szenario mit Flotte
+        balises: Gesamtzahl der Infill-Balisengruppen
+        steps: Schrittweite der groben Suche in m
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+        ValueError: Fahrzeitverlust negativ
+
+    Returns:
+        result.infill_distance_1: Optimale Balisenposition Infill 1 vor dem EoA in m
+        result.infill_distance_2: Optimale Balisenposition Infill 2 vor dem EoA in m
+    """
+
+    input, result = scenario.input, scenario.result
+    trains = fleet_trains(scenario, balises)
+    # Bereiche der freien Balisengruppen, die für alle Züge zulässig sind
+    problems = []
+    for _, share, train, s_target, t_total_infill_1 in trains:
+        ranges, evaluate = search_problem(train, balises, s_target, t_total_infill_1)
+        values = search.Evaluations(evaluate, input.track_infill_1)
+        problems.append((share, ranges, values, (
+            functools.partial(chain_weights, train), input.track_infill_1,
+            train.running_time_intervals[1], train.running_time_intervals[-1],
+            train.result.delta_target, input.track_balise_group_distance)))
+    ranges = [(max(problem[1][level][0] for problem in problems),
+               min(problem[1][level][1] for problem in problems)) for level in range(balises-1)]
+    if any(lower > upper for lower, upper in ranges):
+        raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+
+    def fleet_loss(points: np.ndarray) -> tuple[np.ndarray, list]:
+        total = np.zeros(len(points))
+        losses = []
+        for share, _, values, context in problems:
+            values.require(points.ravel())
+            losses.append(search.chain_loss(points, values, *context)[0])
+            total = total + share * losses[-1]
+        return total, losses
+
+    best = None
+    for envelope in [None, steps]:
+        if envelope is None:  # grobe Suche über alle Bereiche
+            grids = [np.unique(np.append(np.arange(lower, upper + 1, steps), upper))
+                     for lower, upper in ranges]
+        else:  # feine Suche mit 1 m um das Ergebnis der groben Suche
+            grids = [np.arange(max(lower, point - envelope), min(upper, point + envelope) + 1)
+                     for (lower, upper), point in zip(ranges, best)]
+        points = np.array(list(itertools.product(*grids)), dtype=int).reshape(-1, len(ranges))
+        loss, losses = fleet_loss(points)
+        finite = np.isfinite(loss)
+        if not np.any(finite):
+            raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+        if balises == 3:
+            result.results[points[finite, 0]-1, points[finite, 1]-1] = loss[finite]
+        # letztes Minimum in Reihenfolge der Positionen
+        candidates = np.flatnonzero(loss == np.min(loss))
+        index = candidates[np.lexsort(points[candidates].T[::-1])[-1]]
+        best = points[index]
+    mean_time_loss = float(loss[index])
+    # Fehler bei negativem Fahrzeitverlust
+    if mean_time_loss < 0:
+        raise ValueError(f"Fahrzeitverlust negativ ({mean_time_loss} s)")
+
+    # Ergebnisse speichern
+    result.min_loss_time = mean_time_loss
+    result.infill_distance_1 = int(best[0])
+    result.infill_distance_2 = int(best[1]) if balises == 3 else 1
+    result.fleet = [{"name": name, "share": round(share, 4),
+                     "additional_runtime": round(float(train_losses[index]), 2)}
+                    for (name, share, *_), train_losses in zip(trains, losses)]
+    report_fleet(scenario, balises, trains)
+
+    return result.infill_distance_1, result.infill_distance_2
+
+
+def report_fleet(scenario: Scenario, balises: int, trains: list[tuple]) -> None:
+    """
+    Berechnet je Zug der Flotte die Trajektorien an den optimalen Positionen, gibt die
+    Aufschlüsselung je Zug aus, schreibt die JSON und stößt das Plotten an (Trajektorien je Zug,
+    Verlustfläche der Flotte). Das Ergebnis des Szenarios übernimmt die Trajektorien des Zuges mit
+    dem größten Verkehrsanteil.
+
+    Args:
+        scenario: Szenario mit Flotte
+        balises: Gesamtzahl der Infill-Balisengruppen
+        trains: Züge der Flotte (siehe fleet_trains())
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    input, result = scenario.input, scenario.result
+    for (name, share, train, s_target, t_total_infill_1), entry in zip(trains, result.fleet):
+        store_best(train, balises, (entry["additional_runtime"], result.infill_distance_1,
+                                    result.infill_distance_2), s_target, t_total_infill_1)
+        entry["delta_target"] = round(float(train.result.delta_target), 2)
+        entry["delta_infill"] = [round(float(train.result.best_delta_infill_2), 2)]
+        if balises == 3:
+            entry["delta_infill"].append(round(float(train.result.best_delta_infill_3), 2))
+        logger.info(f"Zug {name} (Anteil {share:.1%}): gewichteter Fahrzeitverlust "
+                    f"{entry['additional_runtime']:.2f} s")
+    # Trajektorien des Zuges mit dem größten Verkehrsanteil übernehmen
+    main = max(trains, key=lambda train: train[1])[2].result
+    for field in ["distance_infill_1", "best_distance_infill_2", "best_distance_infill_3",
+                  "distance_target", "speed_infill_1", "best_speed_infill_2",
+                  "best_speed_infill_3", "speed_target", "accel_infill_1", "best_accel_infill_2",
+                  "best_accel_infill_3", "accel_target", "best_factors", "delta_target",
+                  "best_delta_infill_2", "best_delta_infill_3"]:
+        setattr(result, field, getattr(main, field))
+
+    # Ausgabe wie bei einem Zug, Trajektorien je Zug
+    plot_2d = input.tech_plot_2d
+    input.tech_plot_2d = False
+    try:
+        report_results(scenario, balises)
+    finally:
+        input.tech_plot_2d = plot_2d
+    if plot_2d:
+        import plots
+        with scenario.metrics.phase("plot_2d"):
+            for _, _, train, _, _ in trains:
+                plots.plot_trajectory(train.result.accel_infill_1,
+                                      train.result.best_accel_infill_2,
+                                      train.result.best_accel_infill_3, train.result.accel_target,
+                                      train.input, train.totals, train.result,
+                                      train.result.best_factors)
+
+
+@instrumentation.phase("export")
+def export_results(scenario: Scenario, list_infill: list) -> None:
+    """
+    Schreibt die Input-Parameter zusammen mit den Ergebnissen als JSON in den Ausgabeordner.
+    Bei drei Balisengruppen wird auf Wunsch zusätzlich die Verlustfläche exportiert.
+
+    Args:
+        scenario: Szenario
+        list_infill: Positionen der Infill-Balisengruppen vor dem EoA in m
+
     Raises:
         none
 
@@ -635,38 +2278,181 @@ def main() -> None:
         none
     """
 
+    input, result = scenario.input, scenario.result
+    output_data = dict(input.input_data)
+    list_infill = sorted(list_infill, reverse=True)
+    output_data["results"] = {
+        "infill_positions": list_infill,
+        "additional_runtime": round(result.min_loss_time, 2)
+    }
+    if result.fleet:
+        output_data["results"]["fleet"] = result.fleet
+    if result.anytime:
+        output_data["results"]["anytime"] = result.anytime
+    path = os.path.join(input.output_directory, "json")
+    if not os.path.exists(path):
+        os.makedirs(path)
+    with open(os.path.join(path, f"{input.timestr}_results.json"), "w") as outfile:
+        json.dump(output_data, outfile, indent=4)
+    # Verlustfläche als .npy oder .npz
+    if input.tech_export_surface and result.results is not None:
+        result.results.export(os.path.join(path, f"{input.timestr}_results_surface."
+                                                 f"{input.tech_export_surface}"))
+
+
+def run(scenario: Scenario) -> Result:
+    """
+    Führt die Optimierung eines Szenarios ohne Warten auf eine Eingabe aus. Es werden die
+    notwendigen Checks durchgeführt, bevor in einem zweistufigen Verfahren die optimale
+    Platzierung der Infill-Balisengruppen gefunden wird. Ab vier Infill-Balisengruppen erfolgt die
+    Optimierung per dynamischer Programmierung. Mit Zwischenspeicher (tech_cache) wird ein
+    gespeichertes Ergebnis desselben Szenarios ohne Optimierung übernommen und nur ausgegeben.
+
+    Args:
+        scenario: Szenario
+
+    Raises:
+        ValueError: Daten ungültig oder keine zulässige Anordnung
+
+    Returns:
+        result: Ergebnis der Optimierung
+    """
+
+    input, totals, result = scenario.input, scenario.totals, scenario.result
     # Timer starten
     tic = time.perf_counter()
     # Hinweis auf nicht gute Platzierung der weitesten Infillbalisengruppe
-    if Input.train_indication_point > Input.track_infill_1:
+    if input.train_indication_point > input.track_infill_1:
         logger.info("Indication Point liegt vor erstem Infillpunkt")
     # Informationen
-    logger.info(f"Geschwindigkeit: {Totals.train_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
-    logger.info(f"Gewichtungsmethode: {Weighting(Input.tech_weighting).name}")
-    # Datenchecks durchführen
-    checks.checks(Input, Totals)
-
-    # Unterscheidung ob ein Lauf oder zwei Läufe notwendig
-    if (((Input.track_balises == 3)
-        and (Input.track_infill_1*Input.track_infill_2*Input.track_infill_3 > 0))   # 1 Lauf
-            or ((Input.track_balises == 2) and (Input.track_infill_1*Input.track_infill_2))):
-        logger.info("Durchlauf 1 von 1")
-        distance_1, distance_2 = optimize(balises=Input.track_balises, steps=1,
-                                          fixed_1=Input.track_infill_2,
-                                          fixed_2=Input.track_infill_3, envelope=0)
-    else:  # 2 Läufe notwendig
-        logger.info("Durchlauf 1 von 2")
-        distance_1, distance_2 = optimize(balises=Input.track_balises, steps=Input.tech_steps,
-                                          fixed_1=0, fixed_2=0, envelope=0)
-        logger.info("Durchlauf 2 von 2")
-        distance_1, distance_2 = optimize(balises=Input.track_balises, steps=1, fixed_1=distance_1,
-                                          fixed_2=distance_2, envelope=Input.tech_steps)
+    logger.info(f"Geschwindigkeit: {totals.train_speed*constants.CONVERT_MPS_KPH:.2f} km/h")
+    logger.info(f"Gewichtungsmethode: {Weighting(input.tech_weighting).name}")
+    metrics = scenario.metrics
+    with instrumentation.activate(metrics):
+        # Datenchecks durchführen
+        with metrics.phase("checks"):
+            checks.checks(input, totals)
+
+        # Ergebnis aus dem Zwischenspeicher übernehmen, falls vorhanden
+        cache = (result_cache.ResultCache(input.tech_cache, input.tech_cache_limit)
+                 if input.tech_cache else None)
+        key = result_cache.scenario_key(input.input_data)
+        with metrics.phase("cache"):
+            cached = cache is not None and cache.load(key, result)
+        # Verlustfläche nur bei drei, Verlustkurve nur bei zwei Balisengruppen anlegen
+        if input.track_balises == 3 and not cached:
+            result.results = results_store.ResultsStore(input.track_infill_1)
+        elif input.track_balises == 2 and not cached:
+            result.loss_curve = np.full(input.track_infill_1, np.nan)
+        # Unterscheidung ob ein Lauf oder zwei Läufe notwendig
+        if cached:
+            logger.info(f"Ergebnis aus dem Zwischenspeicher ({key[:12]})")
+            with metrics.phase("report"):
+                if input.fleet:
+                    report_fleet(scenario, input.track_balises,
+                                 fleet_trains(scenario, input.track_balises))
+                elif input.track_balises > 3:
+                    report_chain(scenario)
+                else:
+                    report_results(scenario, balises=input.track_balises)
+        elif input.fleet:  # Flotte mehrerer Züge
+            logger.info(f"Durchlauf 1 von 1 (Flotte mit {len(input.fleet)} Zügen)")
+            with metrics.phase("optimize_fleet"):
+                optimize_fleet(scenario, balises=input.track_balises, steps=input.tech_steps)
+        elif input.track_balises > 3:  # dynamische Programmierung mit Schrittweite 1 m
+            logger.info("Durchlauf 1 von 1 (dynamische Programmierung)")
+            with metrics.phase("optimize_chain"):
+                optimize_chain(scenario, balises=input.track_balises, steps=1)
+        elif (((input.track_balises == 3)
+            and (input.track_infill_1*input.track_infill_2*input.track_infill_3 > 0))  # 1 Lauf
+                or ((input.track_balises == 2) and (input.track_infill_1*input.track_infill_2))):
+            logger.info("Durchlauf 1 von 1")
+            with metrics.phase("optimize_1"):
+                optimize(scenario, balises=input.track_balises, steps=1,
+                         fixed_1=input.track_infill_2, fixed_2=input.track_infill_3, envelope=0)
+        elif input.tech_search == Search.ADAPTIVE:  # adaptive Suche bis 1 m
+            logger.info("Durchlauf 1 von 1 (adaptive Suche)")
+            with metrics.phase("optimize_adaptive"):
+                optimize_adaptive(scenario, balises=input.track_balises)
+        elif input.tech_search == Search.CONTINUOUS:  # kontinuierliche Suche ohne Raster
+            logger.info("Durchlauf 1 von 1 (kontinuierliche Suche)")
+            with metrics.phase("optimize_continuous"):
+                optimize_continuous(scenario, balises=input.track_balises)
+        elif input.tech_search == Search.ANYTIME:  # Suche mit Zeitbudget
+            logger.info(f"Durchlauf 1 von 1 (Suche mit Zeitbudget {input.tech_time_budget} s)")
+            with metrics.phase("optimize_anytime"):
+                optimize_anytime(scenario, balises=input.track_balises)
+        else:  # 2 Läufe notwendig
+            logger.info("Durchlauf 1 von 2")
+            with metrics.phase("optimize_1"):
+                distance_1, distance_2 = optimize(scenario, balises=input.track_balises,
+                                                  steps=input.tech_steps, fixed_1=0, fixed_2=0,
+                                                  envelope=0)
+            logger.info("Durchlauf 2 von 2")
+            with metrics.phase("optimize_2"):
+                optimize(scenario, balises=input.track_balises, steps=1, fixed_1=distance_1,
+                         fixed_2=distance_2, envelope=input.tech_steps)
+        # abgebrochene Suche mit Zeitbudget nicht zwischenspeichern (Ergebnis nicht optimal)
+        if cache is not None and not cached and result.anytime.get("complete", True):
+            with metrics.phase("cache"):
+                cache.store(key, result)
 
     # Timer stoppen
     toc = time.perf_counter()
+    result.duration = toc - tic
     # Abschluss
-    logger.info(f"Dauer: {toc - tic:0.2f} Sekunden")
-    input("Enter zum Beenden...")
+    logger.info(f"Dauer: {result.duration:0.2f} Sekunden")
+    metrics.add("total", result.duration)
+    metrics.write(os.path.join(input.output_directory, "json", f"{input.timestr}_metrics.json"))
+
+    return result
+
+
+def main() -> None:
+    """
+    Einstiegspunkt der Optimierung. Das Szenario wird aus der Datei parameters.json im
+    Arbeitsverzeichnis geladen, nach der Optimierung wird auf eine Eingabe gewartet. Mit
+    --headless werden keine Plots erstellt (matplotlib und pandas werden nicht geladen) und es
+    wird nicht auf eine Eingabe gewartet.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Optimierung der Infill-Balisengruppen")
+    parser.add_argument("--headless", action="store_true",
+                        help="ohne Plots und ohne Warten auf Eingabe")
+    args = parser.parse_args()
+    try:
+        os.chdir("./infill_optimization")
+    except:
+        pass
+    # Datei parameter.json laden
+    try:
+        scenario = Scenario.from_file("./parameters.json")
+    except FileNotFoundError:
+        logger.error("Datei 'parameters.json' wurde nicht gefunden.")
+        if not args.headless:
+            input("Enter zum Beenden...")
+        exit(1)
+    except ValueError as error:
+        logger.error(error)
+        if not args.headless:
+            input("Enter zum Beenden...")
+        exit(1)
+
+    if args.headless:
+        scenario.input.tech_plot_2d = False
+        scenario.input.tech_plot_3d = False
+    scenario.run()
+    if not args.headless:
+        input("Enter zum Beenden...")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,17 @@
 """
-Version 1.08
+Version 1.17
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 1.17, 2026-10-17 cw: Bereich der Streckengeschwindigkeit, IP bei Geschwindigkeit am IP
+- 1.16, 2026-10-17 cw: Streckengeschwindigkeit wieder als Wert im Text
+- 1.15, 2026-10-17 cw: 3D-Plot aus verkleinerter Verlustfläche (Blöcke in Auflösung des Plots)
+- 1.14, 2026-10-17 cw: Bereich von Gradienten- und Geschwindigkeitsprofilen im Text
+- 1.13, 2026-10-17 cw: Heatmaps der Parameterstudie
+- 1.12, 2026-10-17 cw: Rotation des 3D-Plots parallel oder als Animation (gif/mp4)
+- 1.11, 2026-10-17 cw: Trajektorien adaptiv abgetastet statt im Zentimeterraster
+- 1.10, 2026-10-17 cw: 3D-Plot liest die gepackte Verlustfläche
+- 1.09, 2026-10-17 cw: Ausgabeordner und verrechnete Stufenfunktionen aus dem Szenario
 - 1.08, 2024-07-03 cw: Bugfix Plot der Trajektorien
 - 1.07, 2024-04-08 cw: Einheitliche Dateinamenpräfixe & PEP 8 Konformität
 - 1.06, 2024-04-05 cw: Bugfix Ausgabe auf Plot der Trajektorien
@@ -14,12 +23,20 @@ Change History:
 - 1.00, 2023-07-12 cw: Initialer Stand mit Dokumentation und Versionierung
 """
 
+import concurrent.futures
+import io
+import logging
 import pandas as pd
 import matplotlib as mpl
+import matplotlib.animation
 import matplotlib.pyplot as plt
+import matplotlib.transforms
 import os
 import numpy as np
+import pickle
+import time
 
+from PIL import Image
 from progress.bar import IncrementalBar
 
 import constants
@@ -31,14 +48,25 @@ FILETYPE = "png"
 LOC_DE = "de"
 LOC_EN = "en"
 LOCALE = [LOC_DE, LOC_EN]
+# Rotation des 3D-Plots
+ROTATE_FRAMES = 360  # Anzahl Einzelbilder (1° je Bild)
+ROTATE_ANGLE_START = 300  # Azimut des ersten Einzelbilds in °
+ROTATE_ELEVATION = 30  # Höhenwinkel in °
+ROTATE_FPS = 30  # Bilder je Sekunde der Animation
+ROTATE_ANIMATION_DPI = 50  # Auflösung der Animation (halbe Größe der Einzelbilder)
+ROTATE_FORMATS = ["png", "gif", "mp4"]
+# maximale Anzahl Zeilen und Spalten der Fläche im 3D-Plot
+SURFACE_COUNT = 200
 
+logger = logging.getLogger(__name__)
 
-def plot_3d_shape(data: pd.DataFrame, input, output) -> None:
+
+def plot_3d_shape(results, input, output) -> None:
     """
     Plottet den gewichteten Fahrzeitverlust als 3D-Shape über alle möglichen Balisenpositionen.
 
     Args:
-        data: gewichteter Fahrzeitverlust über die möglichen Balisenpositionen
+        results: Verlustfläche (results_store.ResultsStore) über die möglichen Balisenpositionen
         input: Klasse der Input-Parameter
         output: Klasse der Berechnungsergebnisse
 
@@ -51,7 +79,10 @@ def plot_3d_shape(data: pd.DataFrame, input, output) -> None:
 
     if input.tech_locale not in LOCALE:
         raise ValueError("locale not found")
-    # Daten interpolieren außerhalb des optimalen Bereichs
+    # Daten blockweise verkleinert aus dem gepackten Speicher lesen und außerhalb des optimalen
+    # Bereichs interpolieren (plot_surface zeichnet höchstens SURFACE_COUNT Zeilen und Spalten)
+    starts, array = results.downsample(SURFACE_COUNT)
+    data = pd.DataFrame(array, index=starts, columns=starts)
     data.interpolate(method="linear", axis=0, limit=10, inplace=True)
     data.interpolate(method="linear", axis=1, limit=10, inplace=True)
     # Hilfswerte
@@ -63,16 +94,14 @@ def plot_3d_shape(data: pd.DataFrame, input, output) -> None:
     fig = plt.figure(figsize=(1920*px, 1080*px))
     ax = fig.add_subplot(projection="3d")
     # Daten vorbereiten
-    x = data.columns + 1
-    y = data.index + 1
-    Z = data[x-1][y-1]
-    X, Y = np.meshgrid(x-1, y-1)
+    Z = data.to_numpy()
+    X, Y = np.meshgrid(data.columns, data.index)
     # Projektion auf x-y-Ebene
     ax.contourf(X, Y, Z, zdir="z", offset=min_plot, alpha=0.7, levels=50,
                 norm=mpl.colors.Normalize(vmin=min_value, vmax=max_value), cmap="RdYlGn_r")
     # 3D-Ansicht
     ax.plot_surface(X, Y, Z, norm=mpl.colors.Normalize(vmin=min_value, vmax=max_value),
-                    cmap="RdYlGn_r", rcount=200, ccount=200)
+                    cmap="RdYlGn_r", rcount=SURFACE_COUNT, ccount=SURFACE_COUNT)
     # 3D-Achsenkreuz
     ax.plot([0, input.track_infill_1], [output.infill_distance_1, output.infill_distance_1],
             [min_plot, min_plot], color="black")
@@ -92,25 +121,136 @@ def plot_3d_shape(data: pd.DataFrame, input, output) -> None:
         ax.set_zlabel("weighted additional runtime [s]")
 
     # speichern
-    path = "output"
+    path = input.output_directory
     if not os.path.exists(path):
         os.makedirs(path)
-    plt.savefig(f"./{path}/{input.timestr}_plot_3d.{FILETYPE}", bbox_inches="tight",
+    fig.savefig(f"{path}/{input.timestr}_plot_3d.{FILETYPE}", bbox_inches="tight",
                 pad_inches=0.5)
-    # Einzelbilder für Animation
+    # Einzelbilder oder Animation der Rotation
     if input.tech_rotate_plot:
-        path = path + "/rotate"
+        export_rotation(fig, ax, input)
+    plt.close(fig)
+
+
+def rotation_bbox(fig, ax) -> mpl.transforms.Bbox:
+    """
+    Bestimmt einen gemeinsamen Bildausschnitt für alle Einzelbilder der Rotation, damit er nicht
+    für jedes Bild neu berechnet werden muss. Dazu werden die engen Ausschnitte bei vier um 90°
+    versetzten Blickwinkeln vereinigt.
+
+    Args:
+        fig: Figure des 3D-Plots
+        ax: 3D-Achse des Plots
+
+    Raises:
+        none
+
+    Returns:
+        bbox: Bildausschnitt in inch (mit 0.5 inch Rand)
+    """
+
+    renderer = fig.canvas.get_renderer()
+    bboxes = []
+    for angle in range(ROTATE_ANGLE_START, ROTATE_ANGLE_START+360, 90):
+        ax.view_init(elev=ROTATE_ELEVATION, azim=angle)
+        bboxes.append(fig.get_tightbbox(renderer))
+
+    return mpl.transforms.Bbox.union(bboxes).padded(0.5)
+
+
+def render_frames(figure: bytes, angles: list, path: str, bbox: mpl.transforms.Bbox) -> int:
+    """
+    Speichert Einzelbilder der Rotation, auch in einem Prozess des Prozesspools.
+
+    Args:
+        figure: per pickle serialisierte Figure des 3D-Plots
+        angles: Azimute der Einzelbilder in °
+        path: Ordner der Einzelbilder
+        bbox: Bildausschnitt in inch
+
+    Raises:
+        none
+
+    Returns:
+        frames: Anzahl gespeicherter Einzelbilder
+    """
+
+    fig = pickle.loads(figure)
+    ax = fig.axes[0]
+    for angle in angles:
+        ax.view_init(elev=ROTATE_ELEVATION, azim=angle)
+        fig.savefig(f"{path}/plot_3d_{angle-ROTATE_ANGLE_START+1:03d}.{FILETYPE}",
+                    bbox_inches=bbox)
+    plt.close(fig)
+
+    return len(angles)
+
+
+def export_rotation(fig, ax, input) -> None:
+    """
+    Exportiert die Rotation des 3D-Plots als Einzelbilder (png, bei mehreren Prozessen im
+    Prozesspool) oder als eine Animation (gif über Pillow, mp4 über ffmpeg). Die Dauer wird in
+    Bildern je Sekunde ausgegeben.
+
+    Args:
+        fig: Figure des 3D-Plots
+        ax: 3D-Achse des Plots
+        input: Klasse der Input-Parameter
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    angles = list(range(ROTATE_ANGLE_START, ROTATE_ANGLE_START+ROTATE_FRAMES))
+    rotate_format = input.tech_rotate_format
+    if rotate_format == "mp4" and not mpl.animation.writers.is_available("ffmpeg"):
+        logger.warning("ffmpeg nicht verfügbar, Animation wird als gif gespeichert")
+        rotate_format = "gif"
+    tic = time.perf_counter()
+    if rotate_format == "png":
+        path = os.path.join(input.output_directory, "rotate")
         if not os.path.exists(path):
             os.makedirs(path)
-        bar = IncrementalBar("Einzelbilder plotten", max=360, suffix="%(percent).1f%% "
-                             + "abgeschlossen - Restdauer: Ungefähr %(eta)d Sekunden")
-        angle_start = 300
-        for angle in range(angle_start, angle_start+360, 1):
-            ax.view_init(elev=30, azim=angle)
-            plt.savefig(f"./{path}/plot_3d_{angle-angle_start+1:03d}.{FILETYPE}",
-                        bbox_inches="tight", pad_inches=0.5)
-            bar.next()
-        bar.finish()
+        bbox = rotation_bbox(fig, ax)
+        figure = pickle.dumps(fig)
+        if input.tech_workers > 1:
+            chunks = [angles[worker::input.tech_workers] for worker in range(input.tech_workers)]
+            with concurrent.futures.ProcessPoolExecutor(input.tech_workers) as executor:
+                list(executor.map(render_frames, [figure]*len(chunks), chunks,
+                                  [path]*len(chunks), [bbox]*len(chunks)))
+        else:
+            bar = IncrementalBar("Einzelbilder plotten", max=len(angles),
+                                 suffix="%(percent).1f%% abgeschlossen - Restdauer: Ungefähr "
+                                 + "%(eta)d Sekunden")
+            for angle in angles:
+                render_frames(figure, [angle], path, bbox)
+                bar.next()
+            bar.finish()
+    else:
+        path = os.path.join(input.output_directory, f"{input.timestr}_plot_3d.{rotate_format}")
+        if rotate_format == "gif":
+            # Bilder mit gemeinsamer Palette, um den Speicherbedarf gering zu halten
+            frames = []
+            for angle in angles:
+                ax.view_init(elev=ROTATE_ELEVATION, azim=angle)
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", dpi=ROTATE_ANIMATION_DPI)
+                image = Image.open(buffer).convert("RGB")
+                frames.append(image.quantize(palette=frames[0]) if frames else image.quantize())
+            frames[0].save(path, save_all=True, append_images=frames[1:], loop=0,
+                           duration=round(1000/ROTATE_FPS))
+        else:
+            writer = mpl.animation.FFMpegWriter(fps=ROTATE_FPS)
+            with writer.saving(fig, path, dpi=ROTATE_ANIMATION_DPI):
+                for angle in angles:
+                    ax.view_init(elev=ROTATE_ELEVATION, azim=angle)
+                    writer.grab_frame()
+    duration = time.perf_counter() - tic
+    logger.info(f"Rotation: {len(angles)} Bilder ({rotate_format}) in {duration:.1f} s "
+                f"({len(angles)/duration:.1f} Bilder/s)")
 
 
 def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarray,
@@ -148,16 +288,16 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
     plot_max_distance = np.ceil(max_distance/250) * 250 + 25
     offset = totals.track_distance_origin_target
     # Trajektorie bei Aufwertung an Infill 1 = ungehindert
-    trajectory_1 = trajectory.clean(output.distance_infill_1, output.speed_infill_1, accel_1,
+    trajectory_1 = trajectory.render(output.distance_infill_1, output.speed_infill_1, accel_1,
                                     plot_max_distance)
     # Trajektorie bei Aufwertung an Infill 2
-    trajectory_2 = trajectory.clean(output.best_distance_infill_2, output.best_speed_infill_2,
+    trajectory_2 = trajectory.render(output.best_distance_infill_2, output.best_speed_infill_2,
                                     accel_2, plot_max_distance)
     # Trajektorie bei Aufwertung an Infill 3
-    trajectory_3 = trajectory.clean(output.best_distance_infill_3, output.best_speed_infill_3,
+    trajectory_3 = trajectory.render(output.best_distance_infill_3, output.best_speed_infill_3,
                                     accel_3, plot_max_distance)
     # Trajektorie bei Aufwertung am Target
-    trajectory_4 = trajectory.clean(output.distance_target, output.speed_target, accel_4,
+    trajectory_4 = trajectory.render(output.distance_target, output.speed_target, accel_4,
                                     plot_max_distance)
     # Balisengruppen
     balises = np.array([0, output.infill_distance_1, input.track_infill_1])
@@ -184,8 +324,10 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
         raise NotImplementedError("unable to plot")
     # Indication Point mit Beschriftung
     indication_plot_x = totals.track_distance_origin_target-input.train_indication_point-offset
-    plt.scatter(indication_plot_x, max_speed, s=80, marker="X", color="orange")
-    plt.annotate("IP", (indication_plot_x, max_speed), textcoords="offset points", xytext=(0, 7),
+    indication_plot_y = totals.train_approach_speed*constants.CONVERT_MPS_KPH
+    plt.scatter(indication_plot_x, indication_plot_y, s=80, marker="X", color="orange")
+    plt.annotate("IP", (indication_plot_x, indication_plot_y), textcoords="offset points",
+                 xytext=(0, 7),
                  ha="center")
     # Balisengruppen als Dreiecke
     plt.scatter(balises_plot-offset, [0]*len(balises_plot), s=100, marker=mpl.markers.CARETUPBASE,
@@ -215,18 +357,18 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
     # Text für Ausgabe der Stufenfunktionen von Anfahren und Bremsen
     label_accel = ""
     label_decel = ""
-    for x in range(len(input.train_acceleration[1])):
-        if x < len(input.train_acceleration[1])-1:
-            label_accel += f"{input.train_acceleration[0,x]*3.6:.1f} $km/h$ "\
-                f"< {input.train_acceleration[1,x+1]:.2f} $m/s^2$ > "
+    for x in range(len(totals.train_acceleration[1])):
+        if x < len(totals.train_acceleration[1])-1:
+            label_accel += f"{totals.train_acceleration[0,x]*3.6:.1f} $km/h$ "\
+                f"< {totals.train_acceleration[1,x+1]:.2f} $m/s^2$ > "
         else:
-            label_accel += f"{input.train_acceleration[0,x]*3.6:.1f} $km/h$"
-    for x in range(len(input.train_deceleration[1])-1, -1, -1):
+            label_accel += f"{totals.train_acceleration[0,x]*3.6:.1f} $km/h$"
+    for x in range(len(totals.train_deceleration[1])-1, -1, -1):
         if x > 0:
-            label_decel += f"{input.train_deceleration[0,x]*3.6:.1f} $km/h$ "\
-                f"< {input.train_deceleration[1,x]:.2f} $m/s^2$ > """
+            label_decel += f"{totals.train_deceleration[0,x]*3.6:.1f} $km/h$ "\
+                f"< {totals.train_deceleration[1,x]:.2f} $m/s^2$ > """
         else:
-            label_decel += f"{input.train_deceleration[0,x]*3.6:.1f} $km/h$"
+            label_decel += f"{totals.train_deceleration[0,x]*3.6:.1f} $km/h$"
     if len(label_accel.replace("$", "")) > 150:
         if locale == LOC_DE:
             label_accel = "zu viele Werte"
@@ -260,13 +402,20 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
             label_timeloss_1 = (f"\nadditional run time with infill at {output.infill_distance_2} "
                                 f"$m$ in rear of EoA: {output.best_delta_infill_3:.2f} $s$\n")
             label_timeloss_2 = f"weight: {factors[1]:.3f}\n"
+    # Gradiente und Streckengeschwindigkeit als Wert oder Bereich des Profils
+    gradients = input.track_gradient_profile[1]
+    label_gradient = (f"{gradients[0]:.1f}" if len(gradients) == 1
+                      else f"{np.min(gradients):.1f} - {np.max(gradients):.1f}")
+    line_speeds = input.track_line_speed_profile[1]
+    label_line_speed = (f"{line_speeds[0]:.0f}" if len(line_speeds) == 1
+                        else f"{np.min(line_speeds):.0f} - {np.max(line_speeds):.0f}")
     # Text mit Berechungsparametern
     if locale == LOC_DE:
         label = f"""
         PARAMETER STRECKE\n
-        Geschwindigkeit: {input.track_line_speed:.0f} $km/h$\n
+        Geschwindigkeit: {label_line_speed} $km/h$\n
         Release Speed: {input.track_release_speed:.0f} $km/h$\n
-        Neigung: {input.track_gradient:.1f} """ + u"\u2030" + f"""\n
+        Neigung: {label_gradient} """ + u"\u2030" + f"""\n
         Anzahl Infill-Balisengruppen: {input.track_balises}\n
         Festlegte Infill-Balisengruppe(n) {label_fixed} $m$ vor EoA\n
         Mindestabstand Balisengruppen: {input.track_balise_group_distance} $m$\n
@@ -297,9 +446,9 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
     elif locale == LOC_EN:
         label = f"""
         PARAMETERS INFRASTRUCTURE\n
-        line speed: {input.track_line_speed:.0f} $km/h$\n
+        line speed: {label_line_speed} $km/h$\n
         release speed: {input.track_release_speed:.0f} $km/h$\n
-        gradient: {input.track_gradient:.1f} """ + u"\u2030" + f"""\n
+        gradient: {label_gradient} """ + u"\u2030" + f"""\n
         number of infill balise groups: {input.track_balises}\n
         fixed infill balise group(s) {label_fixed} $m$ vor EoA\n
         minimum distance between balise groups: {input.track_balise_group_distance} $m$\n
@@ -330,8 +479,45 @@ def plot_trajectory(accel_1: np.ndarray, accel_2: np.ndarray, accel_3: np.ndarra
     label = label.replace("nan, ", "")
     plt.annotate(label, (plot_max_distance-35-offset, 0), ha="right", linespacing=0.6)
     # speichern
-    path = "output"
+    path = input.output_directory
     if not os.path.exists(path):
         os.makedirs(path)
     plt.savefig(
-        f"./{path}/{input.timestr}_trajectory.{FILETYPE}", bbox_inches="tight", pad_inches=0.5)
+        f"{path}/{input.timestr}_trajectory.{FILETYPE}", bbox_inches="tight", pad_inches=0.5)
+
+
+def plot_sweep(table: pd.DataFrame, x: str, y: str, columns: list[str], path: str) -> None:
+    """
+    Erstellt je Spalte der Ergebnistabelle einer Parameterstudie eine Heatmap über zwei variierte
+    Parameter.
+
+    Args:
+        table: Ergebnistabelle der Parameterstudie (eine Zeile je Punkt)
+        x: Parameter der x-Achse
+        y: Parameter der y-Achse
+        columns: darzustellende Spalten (Fahrzeitverlust, Positionen)
+        path: Zieldatei
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    fig, axes = plt.subplots(1, len(columns), figsize=(5.5*len(columns), 4.5), squeeze=False,
+                             layout="constrained")
+    for ax, column in zip(axes[0], columns):
+        pivot = table.pivot_table(index=y, columns=x, values=column, aggfunc="first",
+                                  dropna=False)
+        mesh = ax.pcolormesh(pivot.columns.to_numpy(dtype=float),
+                             pivot.index.to_numpy(dtype=float),
+                             pivot.to_numpy(dtype=float), shading="nearest", cmap="viridis")
+        fig.colorbar(mesh, ax=ax)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.set_title(column)
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
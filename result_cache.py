@@ -0,0 +1,221 @@
+"""
+Version 1.03
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.03, 2026-10-17 cw: Verlustkurve bei zwei Balisengruppen und Abdeckung der Suche mit Zeitbudget
+- 1.02, 2026-10-17 cw: Flotte im Schlüssel, Aufschlüsselung je Zug im Eintrag
+- 1.01, 2026-10-17 cw: Positionen ohne Umwandlung in Ganzzahlen (kontinuierliche Suche)
+- 1.00, 2026-10-17 cw: Zwischenspeicher der Ergebnisse auf der Festplatte je Szenario-Hash
+"""
+
+import hashlib
+import json
+import logging
+import numpy as np
+import os
+import tempfile
+
+import results_store
+
+logger = logging.getLogger(__name__)
+
+# Version des Speicherformats und der Berechnung, bei Änderungen erhöhen
+# (alte Einträge verfallen)
+CACHE_VERSION = 2
+# Dateiendung der Einträge
+EXTENSION = ".npz"
+# skalare Ergebnisse
+SCALAR_FIELDS = ["min_loss_time", "infill_distance_1", "infill_distance_2", "delta_target",
+                 "best_delta_infill_2", "best_delta_infill_3"]
+# Ergebnisse als Felder (Gewichtungsfaktoren und Trajektorien)
+ARRAY_FIELDS = ["best_factors", "distance_infill_1", "best_distance_infill_2",
+                "best_distance_infill_3", "distance_target", "speed_infill_1",
+                "best_speed_infill_2", "best_speed_infill_3", "speed_target", "accel_infill_1",
+                "best_accel_infill_2", "best_accel_infill_3", "accel_target"]
+
+
+def scenario_key(input_data: dict) -> str:
+    """
+    Bildet den Schlüssel eines Szenarios aus den für die Berechnung relevanten Parametern
+    (Abschnitte 'track', 'train' und 'fleet' sowie steps, weighting und search aus 'tech'). Plot-,
+    Sprach- und Ausführungsparameter gehen nicht ein.
+
+    Args:
+        input_data: Inhalt der Parameter-JSON
+
+    Raises:
+        none
+
+    Returns:
+        key: SHA-256 der kanonischen JSON als Hex-String
+    """
+
+    track = dict(input_data["track"])
+    track["balise_positions"] = sorted(track["balise_positions"], reverse=True)
+    tech = input_data["tech"]
+    relevant = {"version": CACHE_VERSION, "track": track, "train": input_data["train"],
+                "steps": tech["steps"], "weighting": tech["weighting"],
+                "search": tech.get("search", "TWO_PASS")}
+    if input_data.get("fleet"):
+        relevant["fleet"] = input_data["fleet"]
+    text = json.dumps(relevant, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """"
+    Speichert Ergebnisse von Optimierungen als komprimierte .npz-Dateien je Szenario-Schlüssel
+    in einem Ordner. Übersteigt die Größe des Ordners das Limit, werden die am längsten nicht
+    verwendeten Einträge (Änderungszeit der Datei) gelöscht.
+    """
+
+    def __init__(self, directory: str, limit: float) -> None:
+        """
+        Legt den Ordner des Zwischenspeichers bei Bedarf an.
+
+        Args:
+            directory: Ordner des Zwischenspeichers
+            limit: maximale Größe des Ordners in MB
+
+        Raises:
+            ValueError: Limit nicht positiv
+
+        Returns:
+            none
+        """
+
+        if limit <= 0:
+            raise ValueError("Größe des Zwischenspeichers nicht positiv")
+        self.directory = directory
+        self.limit = int(limit * 2**20)
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """
+        Pfad des Eintrags eines Schlüssels.
+        """
+
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def load(self, key: str, result) -> bool:
+        """
+        Übernimmt ein gespeichertes Ergebnis in das Ergebnis des Szenarios und markiert den
+        Eintrag als zuletzt verwendet.
+
+        Args:
+            key: Schlüssel des Szenarios
+            result: Ergebnis des Szenarios
+
+        Raises:
+            none
+
+        Returns:
+            found: Eintrag gefunden und gelesen
+        """
+
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                for field in SCALAR_FIELDS:
+                    setattr(result, field, data[field].item())
+                for field in ARRAY_FIELDS:
+                    setattr(result, field, data[field])
+                result.infill_positions = data["infill_positions"].tolist()
+                result.best_factors = data["best_factors"].tolist()
+                if "fleet" in data:
+                    result.fleet = json.loads(data["fleet"].item())
+                if "anytime" in data:
+                    result.anytime = json.loads(data["anytime"].item())
+                if "loss_curve" in data:
+                    result.loss_curve = data["loss_curve"]
+                if "surface_size" in data:
+                    result.results = results_store.ResultsStore.from_packed(
+                        int(data["surface_size"]), data["surface_values"])
+        except FileNotFoundError:
+            return False
+        except (OSError, KeyError, ValueError) as error:
+            logger.warning(f"Eintrag {key[:12]} des Zwischenspeichers unlesbar: {error}")
+            return False
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return True
+
+    def store(self, key: str, result) -> None:
+        """
+        Speichert das Ergebnis eines Szenarios. Die Datei wird zunächst temporär geschrieben und
+        dann umbenannt, sodass parallele Prozesse keinen unvollständigen Eintrag lesen.
+
+        Args:
+            key: Schlüssel des Szenarios
+            result: Ergebnis des Szenarios
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        data = {field: np.asarray(getattr(result, field)) for field in SCALAR_FIELDS}
+        data.update({field: np.asarray(getattr(result, field), dtype=float)
+                     for field in ARRAY_FIELDS})
+        data["infill_positions"] = np.asarray(result.infill_positions)
+        if result.fleet:
+            data["fleet"] = np.asarray(json.dumps(result.fleet))
+        if result.anytime:
+            data["anytime"] = np.asarray(json.dumps(result.anytime))
+        if result.loss_curve is not None:
+            data["loss_curve"] = np.asarray(result.loss_curve, dtype=float)
+        if result.results is not None:
+            data["surface_size"] = np.asarray(result.results.size)
+            data["surface_values"] = result.results.packed()
+        handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as outfile:
+                np.savez_compressed(outfile, **data)
+            os.replace(temporary, self.path(key))
+        except OSError as error:
+            logger.warning(f"Eintrag {key[:12]} des Zwischenspeichers nicht geschrieben: {error}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Löscht die am längsten nicht verwendeten Einträge, bis die Größe des Ordners das Limit
+        einhält.
+
+        Args:
+            none
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(EXTENSION):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # von anderem Prozess gelöscht
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.info(f"Eintrag {os.path.basename(path)[:12]} aus dem Zwischenspeicher gelöscht")
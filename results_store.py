@@ -0,0 +1,336 @@
+"""
+Version 1.02
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.02, 2026-10-17 cw: Verkleinerte Matrix blockweise aus dem gepackten Dreieck für den 3D-Plot
+- 1.01, 2026-10-17 cw: Gepacktes Dreieck für den Zwischenspeicher der Ergebnisse lesen/schreiben
+- 1.00, 2026-10-17 cw: Gepackte Dreiecksspeicherung der Verlustfläche als Memory-Map
+"""
+
+import numpy as np
+import os
+import tempfile
+
+# Datentyp der gespeicherten Fahrzeitverluste
+DTYPE = np.float32
+
+
+class ResultsStore:
+    """"
+    Speichert die Verlustfläche bei drei Infill-Balisengruppen als gepacktes unteres Dreieck
+    (Spalte <= Zeile) in einer Memory-Map. Indizes entsprechen der bisherigen Matrix
+    results[distance_1-1, distance_2-1]. Zeilen werden erst beim ersten Schreiben mit NaN
+    initialisiert, nie beschriebene Zeilen belegen daher keinen Speicher.
+    """
+
+    def __init__(self, size: int, path: str | None = None) -> None:
+        """
+        Legt den Speicher für size x size Positionen an.
+
+        Args:
+            size: Anzahl Positionen je Achse (Position der festen Infill-Balisengruppe in m)
+            path: Datei der Memory-Map (None = temporäre Datei, die beim Schließen gelöscht wird)
+
+        Raises:
+            ValueError: Anzahl Positionen kleiner als 1
+
+        Returns:
+            none
+        """
+
+        if size < 1:
+            raise ValueError("Anzahl Positionen kleiner als 1")
+        self.size = int(size)
+        self.path = path
+        self._file = tempfile.TemporaryFile() if path is None else None
+        self.values = np.memmap(self._file if path is None else path, dtype=DTYPE, mode="w+",
+                                shape=(self.size*(self.size+1)//2,))
+        # Zeilen, die bereits mit NaN initialisiert sind
+        self.filled = np.zeros(self.size, dtype=bool)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Form der entsprechenden vollständigen Matrix.
+        """
+
+        return self.size, self.size
+
+    def _index(self, key: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bestimmt die Position im gepackten Feld für Zeilen- und Spaltenindizes.
+
+        Args:
+            key: Zeilen- und Spaltenindizes (Skalare oder Felder, per Broadcasting kombiniert)
+
+        Raises:
+            none
+
+        Returns:
+            index: Position im gepackten Feld
+            valid: Index liegt im unteren Dreieck
+            rows: Zeilenindizes
+        """
+
+        rows, columns = np.broadcast_arrays(*(np.asarray(index, dtype=np.int64)
+                                              for index in key))
+        valid = (columns >= 0) & (columns <= rows) & (rows < self.size)
+
+        return rows*(rows+1)//2 + columns, valid, rows
+
+    def _fill(self, rows: np.ndarray) -> None:
+        """
+        Initialisiert noch nicht beschriebene Zeilen mit NaN.
+
+        Args:
+            rows: Zeilenindizes
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        for row in np.unique(rows[~self.filled[rows]]):
+            self.values[row*(row+1)//2:(row+1)*(row+2)//2] = np.nan
+            self.filled[row] = True
+
+    def __setitem__(self, key: tuple, values) -> None:
+        """
+        Schreibt Fahrzeitverluste. Indizes oberhalb der Diagonale werden verworfen.
+
+        Args:
+            key: Zeilen- und Spaltenindizes
+            values: Fahrzeitverluste in s
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        index, valid, rows = self._index(key)
+        values = np.broadcast_to(np.asarray(values, dtype=DTYPE), index.shape)
+        self._fill(rows[valid])
+        self.values[index[valid]] = values[valid]
+
+    def __getitem__(self, key: tuple):
+        """
+        Liest Fahrzeitverluste, nicht berechnete Kombinationen ergeben NaN.
+
+        Args:
+            key: Zeilen- und Spaltenindizes
+
+        Raises:
+            none
+
+        Returns:
+            values: Fahrzeitverluste in s
+        """
+
+        index, valid, rows = self._index(key)
+        values = np.full(index.shape, np.nan, dtype=DTYPE)
+        valid &= self.filled[np.where(valid, rows, 0)]
+        values[valid] = self.values[index[valid]]
+
+        return values[()] if values.ndim == 0 else values
+
+    def entries(self, rows=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gibt alle berechneten Kombinationen der angegebenen Zeilen zurück.
+
+        Args:
+            rows: Zeilenindizes (None = alle Zeilen)
+
+        Raises:
+            none
+
+        Returns:
+            rows: Zeilenindizes der berechneten Kombinationen
+            columns: Spaltenindizes der berechneten Kombinationen
+            values: Fahrzeitverluste in s
+        """
+
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        found = [[], [], []]
+        for row in rows[self.filled[rows]]:
+            values = np.asarray(self.values[row*(row+1)//2:(row+1)*(row+2)//2])
+            columns = np.flatnonzero(~np.isnan(values))
+            found[0].append(np.full(len(columns), row))
+            found[1].append(columns)
+            found[2].append(values[columns])
+        if not found[0]:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=DTYPE)
+
+        return tuple(np.concatenate(part) for part in found)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Erstellt die vollständige Matrix (NaN außerhalb der berechneten Kombinationen).
+
+        Args:
+            none
+
+        Raises:
+            none
+
+        Returns:
+            array: Fahrzeitverluste in s je [distance_1-1, distance_2-1]
+        """
+
+        rows, columns, values = self.entries()
+        array = np.full(self.shape, np.nan, dtype=DTYPE)
+        array[rows, columns] = values
+
+        return array
+
+    def downsample(self, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Erstellt eine auf höchstens count x count Blöcke verkleinerte Matrix mit dem kleinsten
+        berechneten Fahrzeitverlust je Block. Die Zeilen werden einzeln aus dem gepackten Dreieck
+        gelesen, die vollständige Matrix wird nicht angelegt.
+
+        Args:
+            count: maximale Anzahl Blöcke je Achse
+
+        Raises:
+            ValueError: Anzahl Blöcke kleiner als 1
+
+        Returns:
+            starts: erster Index je Block (Zeilen und Spalten)
+            array: kleinster Fahrzeitverlust in s je Block (NaN ohne berechnete Kombination)
+        """
+
+        if count < 1:
+            raise ValueError("Anzahl Blöcke kleiner als 1")
+        stride = -(-self.size // count)
+        starts = np.arange(0, self.size, stride)
+        array = np.full((len(starts), len(starts)), np.nan, dtype=DTYPE)
+        for row in np.flatnonzero(self.filled):
+            values = np.asarray(self.values[row*(row+1)//2:(row+1)*(row+2)//2])
+            blocks = starts[starts <= row]
+            # fmin ignoriert NaN, Blöcke ohne Wert bleiben NaN
+            minimum = np.fmin.reduceat(values, blocks)
+            block = row // stride
+            array[block, :len(blocks)] = np.fmin(array[block, :len(blocks)], minimum)
+
+        return starts, array
+
+    def packed(self) -> np.ndarray:
+        """
+        Kopiert das gepackte Dreieck, nie beschriebene Zeilen sind NaN.
+
+        Args:
+            none
+
+        Raises:
+            none
+
+        Returns:
+            values: gepacktes unteres Dreieck der Fahrzeitverluste in s
+        """
+
+        values = np.array(self.values)
+        for row in np.flatnonzero(~self.filled):
+            values[row*(row+1)//2:(row+1)*(row+2)//2] = np.nan
+
+        return values
+
+    @classmethod
+    def from_packed(cls, size: int, values: np.ndarray, target: str | None = None):
+        """
+        Erstellt die Verlustfläche aus einem gepackten Dreieck (siehe packed()).
+
+        Args:
+            size: Anzahl Positionen je Achse
+            values: gepacktes unteres Dreieck der Fahrzeitverluste in s
+            target: Datei der neuen Memory-Map (None = temporäre Datei)
+
+        Raises:
+            ValueError: Länge des gepackten Dreiecks passt nicht zur Anzahl Positionen
+
+        Returns:
+            store: Verlustfläche
+        """
+
+        store = cls(size, target)
+        if len(values) != len(store.values):
+            raise ValueError("Länge des gepackten Dreiecks passt nicht zur Anzahl Positionen")
+        store.values[:] = values
+        store.filled[:] = True
+
+        return store
+
+    def export(self, path: str) -> None:
+        """
+        Exportiert die Verlustfläche nach Dateiendung als vollständige Matrix (.npy) oder
+        komprimiert als gepacktes Dreieck (.npz mit size und values).
+
+        Args:
+            path: Zieldatei (.npy oder .npz)
+
+        Raises:
+            ValueError: Dateiendung nicht unterstützt
+
+        Returns:
+            none
+        """
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".npy":
+            np.save(path, self.to_array())
+        elif extension == ".npz":
+            np.savez_compressed(path, size=self.size, values=self.packed())
+        else:
+            raise ValueError(f"Dateiendung '{extension}' der Verlustfläche nicht unterstützt")
+
+    @classmethod
+    def load(cls, path: str, target: str | None = None):
+        """
+        Lädt eine mit export() geschriebene Verlustfläche.
+
+        Args:
+            path: Datei der Verlustfläche (.npy oder .npz)
+            target: Datei der neuen Memory-Map (None = temporäre Datei)
+
+        Raises:
+            ValueError: Dateiendung nicht unterstützt
+
+        Returns:
+            store: Verlustfläche
+        """
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".npy":
+            array = np.load(path)
+            store = cls(array.shape[0], target)
+            rows, columns = np.nonzero(~np.isnan(array))
+            store[rows, columns] = array[rows, columns]
+        elif extension == ".npz":
+            with np.load(path) as data:
+                store = cls.from_packed(int(data["size"]), data["values"], target)
+        else:
+            raise ValueError(f"Dateiendung '{extension}' der Verlustfläche nicht unterstützt")
+
+        return store
+
+    def close(self) -> None:
+        """
+        Schreibt die Memory-Map und schließt eine temporäre Datei.
+
+        Args:
+            none
+
+        Raises:
+            none
+
+        Returns:
+            none
+        """
+
+        self.values.flush()
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,305 @@
+"""
+Version 1.02
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.02, 2026-10-17 cw: Kurventabellen je Zug und Gradiente, Übernahme beim Erstellen des Szenarios
+- 1.01, 2026-10-17 cw: Signale mit Gradientenprofil kompilieren ihre Kurven selbst
+- 1.00, 2026-10-17 cw: Optimierung aller Signale einer Strecke mit gemeinsamen Kurventabellen
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import time
+from multiprocessing import shared_memory
+
+import calc_movements as calc
+import incremental
+import optimization_infill
+
+logging.basicConfig(
+        format="%(asctime)s.%(msecs)03d %(levelname)s {%(module)s} -> [%(funcName)s] %(message)s",
+        datefmt="%H:%M:%S",
+        level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spalten der Ergebnistabelle
+COLUMNS = ["signal", "line_speed", "gradient", "balises", "infill_positions",
+           "additional_runtime", "wall_time", "error"]
+
+# Kurventabellen je Zug und Gradiente im Prozess (gemeinsamer Speicherblock und vorkompilierte
+# Profile)
+_memory = None
+_curves = {}
+
+
+def load_route(data: dict) -> list[tuple[str, dict]]:
+    """
+    Bildet die Szenarien der Signale einer Strecke. Jeder Eintrag in 'signals' ergänzt den
+    Abschnitt 'track' des Basisszenarios (z.B. balise_positions, line_speed, gradient), ein
+    optionaler Abschnitt 'train' im Eintrag ergänzt den Zug (z.B. indication_point).
+
+    Args:
+        data: Inhalt der Strecken-JSON (Aufbau wie parameters.json mit Liste 'signals')
+
+    Raises:
+        ValueError: keine Signale angegeben
+        ValueError: Namen der Signale nicht eindeutig
+
+    Returns:
+        signals: Name und Parameter je Signal in Reihenfolge der Strecke
+    """
+
+    entries = data.get("signals") or []
+    if not entries:
+        raise ValueError("Keine Signale in 'signals' angegeben")
+    base = {key: value for key, value in data.items() if key != "signals"}
+    width = len(str(len(entries)))
+    signals = []
+    for number, entry in enumerate(entries, 1):
+        entry = dict(entry)
+        name = str(entry.pop("name", f"signal_{number:0{width}d}"))
+        train = entry.pop("train", {})
+        signals.append((name, incremental.apply_delta(base, {"track": entry, "train": train})))
+    names = [name for name, _ in signals]
+    if len(set(names)) < len(names):
+        raise ValueError("Namen der Signale nicht eindeutig")
+
+    return signals
+
+
+def curve_tables(signals: list[tuple[str, dict]]) -> tuple[list, np.ndarray]:
+    """
+    Berechnet die mit rotierenden Massen und Gradiente korrigierten Brems- und
+    Anfahrtabellen einmal je Schlüssel aus Zug und Gradiente (siehe
+    optimization_infill.curve_key()), sodass Signale mit eigenen Zugparametern eigene Kurven
+    erhalten. Signale mit Gradientenprofil werden übergangen und kompilieren ihre Kurven je
+    Abschnitt selbst.
+
+    Args:
+        signals: Name und Parameter je Signal
+
+    Raises:
+        ValueError: Parameter eines Signals unvollständig
+
+    Returns:
+        entries: Schlüssel, Anfang im Speicherblock und Anzahl Spalten der Brems- und der
+            Anfahrtabelle je Kurvensatz
+        tables: alle Tabellen hintereinander (je Tabelle Zeilen Geschwindigkeit in m/s und
+            Beschleunigung in m/s^2, zeilenweise abgelegt)
+    """
+
+    entries, tables, offset = [], [], 0
+    for _, data in signals:
+        gradient = data["track"]["gradient"]
+        if isinstance(gradient, dict):
+            continue
+        input = optimization_infill.Input(data)
+        key = optimization_infill.curve_key(input, gradient)
+        if key in (entry[0] for entry in entries):
+            continue
+        totals = optimization_infill.Totals(input)
+        deceleration, acceleration = totals.train_deceleration, totals.train_acceleration
+        entries.append((key, offset, deceleration.shape[1], acceleration.shape[1]))
+        tables.extend([deceleration.ravel(), acceleration.ravel()])
+        offset += deceleration.size + acceleration.size
+
+    return entries, np.concatenate(tables) if tables else np.zeros(0)
+
+
+def attach_curves(name: str, entries: list) -> None:
+    """
+    Bindet den gemeinsamen Speicherblock der Kurventabellen in einem Prozess des Prozesspools
+    schreibgeschützt ein und kompiliert die Profile je Kurvensatz einmal.
+
+    Args:
+        name: Name des Speicherblocks
+        entries: Schlüssel, Anfang und Anzahl Spalten je Kurvensatz (siehe curve_tables())
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    global _memory
+    _memory = shared_memory.SharedMemory(name=name)
+    _curves.clear()
+    for key, offset, columns_deceleration, columns_acceleration in entries:
+        size = 2 * (columns_deceleration + columns_acceleration)
+        table = np.ndarray((size,), dtype=float, buffer=_memory.buf, offset=offset * 8)
+        table.flags.writeable = False
+        deceleration = table[:2*columns_deceleration].reshape(2, -1)
+        acceleration = table[2*columns_deceleration:].reshape(2, -1)
+        _curves[key] = (deceleration, acceleration, calc.CompiledProfile(deceleration),
+                        calc.CompiledProfile(acceleration))
+
+
+def run_signal(name: str, data: dict, directory: str, plot: bool) -> dict:
+    """
+    Optimiert ein Signal in einem Prozess des Prozesspools mit den gemeinsamen Kurventabellen
+    seines Zuges und seiner Gradiente. Ausgaben landen im Unterordner output des Ordners des
+    Signals.
+
+    Args:
+        name: Name des Signals
+        data: Parameter des Signals (Aufbau wie parameters.json)
+        directory: Ordner der Signalausgaben
+        plot: Plots erstellen (sonst werden die Plot-Parameter deaktiviert)
+
+    Raises:
+        none
+
+    Returns:
+        row: Zeile der Ergebnistabelle
+    """
+
+    tic = time.perf_counter()
+    row = dict.fromkeys(COLUMNS)
+    row["signal"] = name
+    for key in ["line_speed", "gradient", "balises"]:
+        row[key] = data["track"].get(key)
+    # Profile als JSON in der Ergebnistabelle
+    for key in ["line_speed", "gradient"]:
+        if isinstance(row[key], dict):
+            row[key] = json.dumps(row[key])
+    if not plot:
+        data["tech"]["plot_trajectories"] = False
+        data["tech"]["plot_3d"] = False
+    path = os.path.join(directory, name)
+    try:
+        # Kurventabellen aus dem gemeinsamen Speicherblock übernehmen
+        scenario = optimization_infill.Scenario(data, path, _curves)
+        result = scenario.run()
+        row["infill_positions"] = ";".join(str(position) for position
+                                           in result.infill_positions)
+        row["additional_runtime"] = round(result.min_loss_time, 2)
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    row["wall_time"] = round(time.perf_counter() - tic, 3)
+
+    return row
+
+
+def run_route(data: dict, output: str, workers: int = 1, plot: bool = False) -> pd.DataFrame:
+    """
+    Optimiert alle Signale einer Strecke für einen Zug im Prozesspool. Die korrigierten
+    Kurventabellen werden je Zug und Gradiente einmal berechnet und über einen gemeinsamen
+    Speicherblock (multiprocessing.shared_memory) an alle Prozesse gegeben. Es wird eine
+    Ergebnistabelle (eine Zeile je Signal in Reihenfolge der Strecke) als CSV oder Parquet sowie
+    eine Zusammenfassung der Strecke als JSON geschrieben.
+
+    Args:
+        data: Inhalt der Strecken-JSON
+        output: Datei der Ergebnistabelle (.csv oder .parquet)
+        workers: Anzahl paralleler Prozesse
+        plot: Plots je Signal erstellen
+
+    Raises:
+        ValueError: Anzahl Prozesse kleiner als 1
+        ValueError: Dateiendung der Ergebnistabelle nicht unterstützt
+        ValueError: Signale ungültig
+
+    Returns:
+        table: Ergebnistabelle
+    """
+
+    if workers < 1:
+        raise ValueError("Anzahl Prozesse kleiner als 1")
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in [".csv", ".parquet"]:
+        raise ValueError(f"Dateiendung '{extension}' der Ergebnistabelle nicht unterstützt")
+    signals = load_route(data)
+    entries, tables = curve_tables(signals)
+    output = os.path.abspath(output)
+    directory = os.path.join(os.path.dirname(output), "signals")
+    os.makedirs(directory, exist_ok=True)
+    logger.info(f"{len(signals)} Signale mit {len(entries)} Kurvensätzen und {workers} Prozessen")
+
+    tic = time.perf_counter()
+    rows = []
+    memory = shared_memory.SharedMemory(create=True, size=max(tables.nbytes, 1))
+    try:
+        np.ndarray(tables.shape, dtype=float, buffer=memory.buf)[:] = tables
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=attach_curves,
+                initargs=(memory.name, entries)) as executor:
+            futures = [executor.submit(run_signal, name, signal, directory, plot)
+                       for name, signal in signals]
+            for future in futures:
+                rows.append(future.result())
+                if rows[-1]["error"]:
+                    logger.error(f"Signal {rows[-1]['signal']}: {rows[-1]['error']}")
+                else:
+                    logger.info(f"Signal {rows[-1]['signal']}: {rows[-1]['additional_runtime']} s"
+                                f" bei {rows[-1]['infill_positions']} m")
+    finally:
+        memory.close()
+        memory.unlink()
+    duration = time.perf_counter() - tic
+
+    table = pd.DataFrame(rows, columns=COLUMNS).astype({"balises": "Int64"})
+    if extension == ".csv":
+        table.to_csv(output, index=False)
+    else:
+        table.to_parquet(output, index=False)
+    logger.info(f"Ergebnistabelle: {output}")
+
+    # Zusammenfassung der Strecke
+    solved = table[table["error"].isna()]
+    summary = {
+        "signals": len(table),
+        "failed": int(table["error"].notna().sum()),
+        "balise_groups": int(solved["balises"].sum()),
+        "additional_runtime": round(float(solved["additional_runtime"].sum()), 2),
+        "mean_additional_runtime": (round(float(solved["additional_runtime"].mean()), 2)
+                                    if len(solved) else None),
+        "worst_signal": (solved.loc[solved["additional_runtime"].idxmax(), "signal"]
+                         if len(solved) else None),
+        "wall_time": round(duration, 3)
+    }
+    path = f"{os.path.splitext(output)[0]}_summary.json"
+    with open(path, "w") as outfile:
+        json.dump(summary, outfile, indent=4)
+    logger.info(f"Strecke: {summary['additional_runtime']} s Fahrzeitverlust über "
+                f"{summary['signals'] - summary['failed']} von {summary['signals']} Signalen "
+                f"({summary['balise_groups']} Infill-Balisengruppen), Zusammenfassung: {path}")
+
+    return table
+
+
+def main() -> None:
+    """
+    Einstiegspunkt der Streckenoptimierung über die Kommandozeile.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Optimierung aller Signale einer Strecke")
+    parser.add_argument("route", help="Strecken-JSON (parameters.json mit Liste 'signals')")
+    parser.add_argument("-o", "--output", default="output/route/results.csv",
+                        help="Ergebnistabelle (.csv oder .parquet)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Anzahl paralleler Prozesse")
+    parser.add_argument("--plot", action="store_true", help="Plots je Signal erstellen")
+    args = parser.parse_args()
+    with open(args.route) as infile:
+        data = json.load(infile)
+    run_route(data, args.output, args.workers, args.plot)
+
+
+if __name__ == "__main__":
+    main()
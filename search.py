@@ -0,0 +1,603 @@
+"""
+Version 1.05
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.05, 2026-10-17 cw: Frist innerhalb der Runden, Suche mit Zeitbudget grob nach fein
+- 1.04, 2026-10-17 cw: Verlustkurve bei zwei Balisengruppen
+- 1.03, 2026-10-17 cw: Rundung der kontinuierlichen Suche zur zulässigen Seite
+- 1.02, 2026-10-17 cw: Suche mit Zeitbudget (Startraster grob, Abbruch an der Frist mit Lücke)
+- 1.01, 2026-10-17 cw: Kontinuierliche Suche mit Brent-Verfahren und Koordinatensuche
+- 1.00, 2026-10-17 cw: Adaptive Suche mit Schranken als Alternative zum zweistufigen Verfahren
+"""
+
+import itertools
+import logging
+import math
+import numpy as np
+import time
+
+logger = logging.getLogger(__name__)
+
+# Anzahl der Zellen mit der geringsten unteren Schranke, die je Runde verfeinert werden
+ADAPTIVE_TOP_K = 32
+# relative Toleranz beim Verwerfen von Zellen (Rundungsfehler der Schranken)
+PRUNE_TOLERANCE = 1e-9
+# Toleranz der Positionen bei der kontinuierlichen Suche in m
+CONTINUOUS_TOLERANCE = 0.01
+# Anzahl Startpunkte der kontinuierlichen Suche (beste Kombinationen des Startrasters)
+CONTINUOUS_STARTS = 3
+# relative Toleranz, um die der Fahrzeitverlust der gerundeten Positionen über dem der
+# ungerundeten liegen darf (Änderung unterhalb der Auflösung der Suche)
+CONTINUOUS_ROUNDING_TOLERANCE = 1e-9
+# maximale Anzahl Durchläufe der Koordinatensuche je Startpunkt
+CONTINUOUS_MAX_SWEEPS = 20
+# maximale Anzahl Funktionsaufrufe je eindimensionaler Minimierung
+BRENT_MAX_EVALUATIONS = 100
+# Anzahl Rasterpunkte je freier Balisengruppe im Startraster der Suche mit Zeitbudget
+ANYTIME_GRID = 16
+# Anzahl Positionen je Aufruf der Trajektorienberechnung bei Frist (Prüfung dazwischen)
+ANYTIME_CHUNK = 64
+
+
+class Evaluations:
+    """
+    Beinhaltet die bereits berechneten Fahrzeitverlängerungen und Fahrzeiten je Position. Jede
+    Position wird höchstens einmal über die übergebene Funktion berechnet.
+    """
+
+    def __init__(self, evaluate, size: int) -> None:
+        self.evaluate = evaluate
+        self.delta = np.full(size + 1, np.nan)
+        self.running_time = np.full(size + 1, np.nan)
+        self.known = np.zeros(size + 1, dtype=bool)
+        self.count = 0
+
+    def require(self, positions: np.ndarray, deadline: float | None = None) -> bool:
+        """
+        Berechnet die noch unbekannten Positionen in einem Aufruf. Mit Frist werden sie in der
+        übergebenen Reihenfolge in Teilen zu ANYTIME_CHUNK Positionen berechnet und vor jedem
+        Teil die Frist geprüft.
+
+        Args:
+            positions: benötigte Positionen vor dem EoA in m
+            deadline: Frist als Wert von time.perf_counter() (None = ohne Frist)
+
+        Raises:
+            none
+
+        Returns:
+            complete: alle Positionen berechnet
+        """
+
+        if deadline is None:
+            positions = np.unique(positions)
+            chunk = max(len(positions), 1)
+        else:
+            # doppelte Positionen entfernen, Reihenfolge beibehalten
+            positions = positions[np.sort(np.unique(positions, return_index=True)[1])]
+            chunk = ANYTIME_CHUNK
+        positions = positions[~self.known[positions]]
+        for index in range(0, len(positions), chunk):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            part = positions[index:index+chunk]
+            self.delta[part], self.running_time[part] = self.evaluate(part)
+            self.known[part] = True
+            self.count += len(part)
+
+        return True
+
+
+def chain_loss(points: np.ndarray, values: Evaluations, weights, start: int, running_time_start:
+               float, running_time_end: float, delta_end: float, group_distance: int
+               ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Berechnet den gewichteten Fahrzeitverlust für Kombinationen freier Balisenpositionen. Die
+    Abschnitte werden wie in optimize() vom EoA aus aufsummiert.
+
+    Args:
+        points: Positionen der freien Balisengruppen je Kombination (absteigend je Zeile)
+        values: berechnete Fahrzeitverlängerungen und Fahrzeiten
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        start: Position der festen Infill-Balisengruppe vor dem EoA in m
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+        delta_end: Fahrzeitverlängerung bei Aufwertung am EoA in s
+        group_distance: Mindestabstand zwischen Balisengruppen in m
+
+    Raises:
+        none
+
+    Returns:
+        loss: gewichteter Fahrzeitverlust je Kombination (unzulässig = inf)
+        total: Summe der Gewichtungsfaktoren je Kombination
+    """
+
+    return combination_loss(points, values.delta[points], values.running_time[points], weights,
+                            start, running_time_start, running_time_end, delta_end,
+                            group_distance)
+
+
+def combination_loss(points: np.ndarray, delta: np.ndarray, running_time: np.ndarray, weights,
+                     start: float, running_time_start: float, running_time_end: float,
+                     delta_end: float, group_distance: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Berechnet den gewichteten Fahrzeitverlust für Kombinationen freier Balisenpositionen aus den
+    Fahrzeitverlängerungen und Fahrzeiten je Position (siehe chain_loss). Positionen dürfen
+    auch nicht ganzzahlig sein.
+
+    Args:
+        points: Positionen der freien Balisengruppen je Kombination (absteigend je Zeile)
+        delta: Fahrzeitverlängerungen je Position in s (Form wie points)
+        running_time: Fahrzeiten bis zur Aufwertung je Position in s (Form wie points)
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        start: Position der festen Infill-Balisengruppe vor dem EoA in m
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+        delta_end: Fahrzeitverlängerung bei Aufwertung am EoA in s
+        group_distance: Mindestabstand zwischen Balisengruppen in m
+
+    Raises:
+        none
+
+    Returns:
+        loss: gewichteter Fahrzeitverlust je Kombination (unzulässig = inf)
+        total: Summe der Gewichtungsfaktoren je Kombination
+    """
+
+    count, levels = points.shape
+    distances = np.column_stack([np.full(count, start), points, np.zeros(count, dtype=int)])
+    running_times = np.column_stack([np.full(count, running_time_start), running_time,
+                                     np.full(count, running_time_end)])
+    deltas = np.column_stack([delta, np.full(count, delta_end)])
+    weighted = np.zeros(count)
+    total = np.zeros(count)
+    for level in range(levels, -1, -1):  # Target -> IF -> IF
+        factor = weights(distances[:, level], distances[:, level+1], running_times[:, level],
+                         running_times[:, level+1])
+        weighted = weighted + factor * deltas[:, level]
+        total = total + factor
+    feasible = np.all(np.diff(points, axis=1) <= -group_distance, axis=1)
+
+    return np.where(feasible, weighted / total, np.inf), total
+
+
+def lower_bounds(lower: np.ndarray, upper: np.ndarray, values: Evaluations, weights, start: int,
+                 running_time_start: float, running_time_end: float, delta_end: float
+                 ) -> np.ndarray:
+    """
+    Berechnet eine untere Schranke des gewichteten Fahrzeitverlusts (ohne Normierung) je Zelle.
+    Fahrzeitverlängerung und Fahrzeit sind monoton in der Position, sodass ihre Werte innerhalb
+    einer Zelle zwischen den Werten an den Zellgrenzen liegen. Die Gewichtungsfaktoren werden
+    über ihre Intervallgrenzen abgeschätzt.
+
+    Args:
+        lower: untere Zellgrenzen je freier Balisengruppe in m
+        upper: obere Zellgrenzen je freier Balisengruppe in m
+        values: berechnete Fahrzeitverlängerungen und Fahrzeiten
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        start: Position der festen Infill-Balisengruppe vor dem EoA in m
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+        delta_end: Fahrzeitverlängerung bei Aufwertung am EoA in s
+
+    Raises:
+        none
+
+    Returns:
+        bound: untere Schranke der Summe gewichteter Fahrzeitverlängerungen je Zelle
+    """
+
+    count = len(lower)
+    start_column = np.full((count, 1), start)
+    end_column = np.zeros((count, 1), dtype=int)
+    distance_lower = np.hstack([start_column, lower, end_column])
+    distance_upper = np.hstack([start_column, upper, end_column])
+    delta_lower = np.minimum(values.delta[lower], values.delta[upper])
+    delta_upper = np.maximum(values.delta[lower], values.delta[upper])
+    delta_lower = np.hstack([delta_lower, np.full((count, 1), delta_end)])
+    delta_upper = np.hstack([delta_upper, np.full((count, 1), delta_end)])
+    running_lower = np.minimum(values.running_time[lower], values.running_time[upper])
+    running_upper = np.maximum(values.running_time[lower], values.running_time[upper])
+    running_lower = np.hstack([np.full((count, 1), running_time_start), running_lower,
+                               np.full((count, 1), running_time_end)])
+    running_upper = np.hstack([np.full((count, 1), running_time_start), running_upper,
+                               np.full((count, 1), running_time_end)])
+    bound = np.zeros(count)
+    for level in range(lower.shape[1] + 1):
+        factor_lower = weights(distance_lower[:, level], distance_upper[:, level+1],
+                               running_upper[:, level], running_lower[:, level+1])
+        factor_upper = weights(distance_upper[:, level], distance_lower[:, level+1],
+                               running_lower[:, level], running_upper[:, level+1])
+        factor_lower = np.maximum(factor_lower, 0)
+        bound = bound + np.minimum.reduce([factor_lower * delta_lower[:, level],
+                                           factor_lower * delta_upper[:, level],
+                                           factor_upper * delta_lower[:, level],
+                                           factor_upper * delta_upper[:, level]])
+
+    return bound
+
+
+def adaptive_search(input, output, ranges: list, evaluate, weights, running_time_start: float,
+                    running_time_end: float, steps: int | None = None,
+                    deadline: float | None = None) -> tuple[float, list[int], dict]:
+    """
+    Sucht die optimale Kombination freier Balisenpositionen mit 1 m Auflösung, ohne alle
+    Positionen zu berechnen. Ausgehend von einem Raster mit tech_steps werden die Zellen mit der
+    geringsten unteren Schranke wiederholt halbiert. Zellen, deren Schranke über dem bisher
+    besten Fahrzeitverlust liegt, werden verworfen. Die Suche endet, wenn keine Zelle mehr eine
+    Verbesserung enthalten kann, womit das Ergebnis bei 1 m Auflösung optimal ist. Mit Frist
+    beginnt die Suche mit einer Zelle über den ganzen Bereich, Zellen gröber als das Startraster
+    werden in jeder Runde halbiert (grob nach fein). Die Frist wird auch während der Berechnung
+    der Trajektorien einer Runde geprüft (je ANYTIME_CHUNK Positionen), Zellen mit nicht mehr
+    berechneter Mitte bleiben ungeteilt. Die Suche endet an der Frist mit dem bisher besten
+    Ergebnis; die Schranken der offenen Zellen ergeben dann eine Abschätzung der
+    Optimalitätslücke. Bei Gleichstand wird wie in optimize() die größere Position gewählt.
+
+    Args:
+        input: Klasse der Inputparameter
+        output: Klasse der Ergebnisse (delta_target, results, loss_curve)
+        ranges: kleinste und größte Position je freier Balisengruppe in m (absteigend)
+        evaluate: Funktion der Fahrzeitverlängerungen und Fahrzeiten für ein Feld von Positionen
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+        steps: Schrittweite des Startrasters in m (None = tech_steps)
+        deadline: Frist als Wert von time.perf_counter() (None = ohne Frist)
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+
+    Returns:
+        best_loss: minimaler gewichteter Fahrzeitverlust in s
+        best_points: Positionen der freien Balisengruppen vor dem EoA in m
+        statistics: Anzahl berechneter Trajektorien gegenüber der vollständigen Suche, Anteil
+            des entschiedenen Suchraums und Optimalitätslücke
+    """
+
+    start = input.track_infill_1
+    steps = steps or input.tech_steps
+    group_distance = input.track_balise_group_distance
+    values = Evaluations(evaluate, start)
+    context = (values, weights, start, running_time_start, running_time_end,
+               output.delta_target)
+
+    # Startraster und Zellen je freier Balisengruppe (mit Frist eine Zelle je Balisengruppe,
+    # deren Ecken stets berechnet werden, damit ein Ergebnis vorliegt)
+    intervals = []
+    for lower, upper in ranges:
+        stride = steps if deadline is None else max(upper - lower, 1)
+        grid = np.unique(np.append(np.arange(lower, upper + 1, stride), upper))
+        values.require(grid)
+        intervals.append(list(zip(grid[:-1], grid[1:])) if len(grid) > 1 else [(lower, upper)])
+    cells = np.array([[bound for interval in combination for bound in interval]
+                      for combination in itertools.product(*intervals)]).reshape(-1, len(ranges),
+                                                                                 2)
+    lower, upper = cells[:, :, 0], cells[:, :, 1]
+    # Zellen ohne zulässige Kombination verwerfen
+    feasible = np.all(lower[:, 1:] <= upper[:, :-1] - group_distance, axis=1)
+    lower, upper = lower[feasible], upper[feasible]
+    volume = np.sum(np.prod(upper - lower + 1, axis=1))
+
+    best_loss, best_points, total = np.inf, None, np.nan
+    bound = np.empty(0)
+    new_lower, new_upper = lower, upper
+    lower, upper = new_lower[:0], new_upper[:0]
+    rounds = 0
+    while True:
+        # Fahrzeitverlust an den Ecken der neuen Zellen
+        corners = np.unique(np.vstack([np.where(mask, new_upper, new_lower) for mask in
+                                       itertools.product([False, True], repeat=len(ranges))]),
+                            axis=0)
+        loss, totals = chain_loss(corners, values, weights, start, running_time_start,
+                                  running_time_end, output.delta_target, group_distance)
+        finite = np.isfinite(loss)
+        if len(ranges) == 2:
+            output.results[corners[finite, 0]-1, corners[finite, 1]-1] = loss[finite]
+        elif output.loss_curve is not None:
+            output.loss_curve[corners[finite, 0]-1] = loss[finite]
+        if np.any(finite):
+            # letztes Minimum in Reihenfolge der Positionen
+            candidates = np.flatnonzero(loss == np.min(loss))
+            index = candidates[np.lexsort(corners[candidates].T[::-1])[-1]]
+            if (loss[index] < best_loss or (loss[index] == best_loss
+                                            and tuple(corners[index]) > tuple(best_points))):
+                best_loss, best_points, total = loss[index], corners[index], totals[index]
+        lower = np.vstack([lower, new_lower])
+        upper = np.vstack([upper, new_upper])
+        bound = np.concatenate([bound, lower_bounds(new_lower, new_upper, *context)])
+        # Zellen ohne mögliche Verbesserung oder vollständig berechnete Zellen verwerfen
+        keep = (~(bound / total > best_loss + PRUNE_TOLERANCE * abs(best_loss))
+                & np.any(upper - lower > 1, axis=1))
+        lower, upper, bound = lower[keep], upper[keep], bound[keep]
+        if len(lower) == 0 or (deadline is not None and time.perf_counter() >= deadline):
+            break
+        # Zellen gröber als das Startraster und Zellen mit geringster Schranke entlang der
+        # längsten Seite halbieren
+        rounds += 1
+        order = np.argsort(bound, kind="stable")
+        coarse = np.max(upper[order] - lower[order], axis=1) > steps
+        selected = coarse | (np.cumsum(~coarse) <= ADAPTIVE_TOP_K)
+        refine, rest = order[selected], order[~selected]
+        split_lower, split_upper, split_bound = lower[refine], upper[refine], bound[refine]
+        lower, upper, bound = lower[rest], upper[rest], bound[rest]
+        axis = np.argmax(split_upper - split_lower, axis=1)
+        rows = np.arange(len(refine))
+        middle = (split_lower[rows, axis] + split_upper[rows, axis]) // 2
+        # Mitten in Reihenfolge der Schranken berechnen, bei erreichter Frist bleiben die Zellen
+        # ohne berechnete Mitte ungeteilt
+        values.require(middle, deadline)
+        known = values.known[middle]
+        lower = np.vstack([lower, split_lower[~known]])
+        upper = np.vstack([upper, split_upper[~known]])
+        bound = np.concatenate([bound, split_bound[~known]])
+        split_lower, split_upper, middle = split_lower[known], split_upper[known], middle[known]
+        axis, rows = axis[known], np.arange(len(middle))
+        first_upper = split_upper.copy()
+        first_upper[rows, axis] = middle
+        second_lower = split_lower.copy()
+        second_lower[rows, axis] = middle
+        new_lower = np.vstack([split_lower, second_lower])
+        new_upper = np.vstack([first_upper, split_upper])
+        feasible = np.all(new_lower[:, 1:] <= new_upper[:, :-1] - group_distance, axis=1)
+        new_lower, new_upper = new_lower[feasible], new_upper[feasible]
+
+    if best_points is None:
+        raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+    exhaustive = len(np.unique(np.concatenate([np.arange(lower, upper + 1)
+                                               for lower, upper in ranges])))
+    # Optimalitätslücke aus der geringsten Schranke der offenen Zellen
+    gap = max(float(best_loss - np.min(bound) / total), 0.0) if len(bound) else 0.0
+    statistics = {
+        "evaluations": values.count,
+        "exhaustive": exhaustive,
+        "saved": exhaustive - values.count,
+        "rounds": rounds,
+        "complete": len(bound) == 0,
+        "coverage": float(1 - np.sum(np.prod(upper - lower + 1, axis=1)) / volume),
+        "gap": gap
+    }
+
+    return float(best_loss), [int(point) for point in best_points], statistics
+
+
+def anytime_search(input, output, ranges: list, evaluate, weights, running_time_start: float,
+                   running_time_end: float, deadline: float) -> tuple[float, list[int], dict]:
+    """
+    Sucht die optimale Kombination freier Balisenpositionen innerhalb eines Zeitbudgets. Von
+    einer Zelle über den ganzen Bereich aus werden die Zellen halbiert, bis das Raster höchstens
+    ANYTIME_GRID Punkte je freier Balisengruppe hat (mindestens tech_steps), danach werden wie
+    in adaptive_search() die Zellen mit der geringsten unteren Schranke um die bisher besten
+    Kombinationen halbiert, bis die Frist erreicht ist oder das Ergebnis bei 1 m Auflösung
+    optimal ist. Die Frist wird auch innerhalb jeder Runde geprüft.
+
+    Args:
+        input: Klasse der Inputparameter
+        output: Klasse der Ergebnisse (delta_target, results, loss_curve)
+        ranges: kleinste und größte Position je freier Balisengruppe in m (absteigend)
+        evaluate: Funktion der Fahrzeitverlängerungen und Fahrzeiten für ein Feld von Positionen
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+        deadline: Frist als Wert von time.perf_counter()
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+
+    Returns:
+        best_loss: bisher bester gewichteter Fahrzeitverlust in s
+        best_points: Positionen der freien Balisengruppen vor dem EoA in m
+        statistics: Anzahl berechneter Trajektorien, Anteil des entschiedenen Suchraums und
+            Optimalitätslücke (siehe adaptive_search())
+    """
+
+    width = max(upper - lower for lower, upper in ranges)
+    steps = max(input.tech_steps, math.ceil(width / (ANYTIME_GRID - 1)), 1)
+
+    return adaptive_search(input, output, ranges, evaluate, weights, running_time_start,
+                           running_time_end, steps, deadline)
+
+
+def brent(function, lower: float, upper: float, tolerance: float) -> tuple[float, float, int]:
+    """
+    Minimiert eine Funktion einer Variablen im Intervall mit dem Verfahren nach Brent (parabolische
+    Interpolation mit goldenem Schnitt als Rückfallebene). Die Intervallgrenzen selbst werden
+    nicht ausgewertet.
+
+    Args:
+        function: zu minimierende Funktion
+        lower: untere Intervallgrenze
+        upper: obere Intervallgrenze
+        tolerance: absolute Toleranz der Stelle des Minimums
+
+    Raises:
+        none
+
+    Returns:
+        x: Stelle des Minimums
+        value: Funktionswert an der Stelle des Minimums
+        evaluations: Anzahl Funktionsaufrufe
+    """
+
+    golden = (3 - math.sqrt(5)) / 2
+    sqrt_eps = math.sqrt(np.finfo(float).eps)
+    # x: bester Punkt, w: zweitbester Punkt, v: vorheriger Wert von w
+    x = w = v = lower + golden * (upper - lower)
+    fx = fw = fv = function(x)
+    evaluations = 1
+    step = previous = 0.0
+    while evaluations < BRENT_MAX_EVALUATIONS:
+        middle = (lower + upper) / 2
+        tolerance_1 = sqrt_eps * abs(x) + tolerance / 3
+        tolerance_2 = 2 * tolerance_1
+        if abs(x - middle) <= tolerance_2 - (upper - lower) / 2:
+            break
+        parabolic = False
+        if abs(previous) > tolerance_1:
+            # Parabel durch x, w und v
+            r = (x - w) * (fx - fv)
+            q = (x - v) * (fx - fw)
+            p = (x - v) * q - (x - w) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            if abs(p) < abs(q * previous / 2) and q * (lower - x) < p < q * (upper - x):
+                parabolic = True
+                previous, step = step, p / q
+                if (x + step - lower) < tolerance_2 or (upper - x - step) < tolerance_2:
+                    step = math.copysign(tolerance_1, middle - x)
+        if not parabolic:
+            # goldener Schnitt in den größeren Teil des Intervalls
+            previous = (lower if x >= middle else upper) - x
+            step = golden * previous
+        u = x + math.copysign(max(abs(step), tolerance_1), step)
+        fu = function(u)
+        evaluations += 1
+        if fu <= fx:
+            if u >= x:
+                lower = x
+            else:
+                upper = x
+            v, fv, w, fw, x, fx = w, fw, x, fx, u, fu
+        else:
+            if u < x:
+                lower = u
+            else:
+                upper = u
+            if fu <= fw or w == x:
+                v, fv, w, fw = w, fw, u, fu
+            elif fu <= fv or v == x or v == w:
+                v, fv = u, fu
+
+    return x, fx, evaluations
+
+
+def continuous_search(input, output, ranges: list, evaluate, weights, running_time_start: float,
+                      running_time_end: float) -> tuple[float, list[float], dict]:
+    """
+    Sucht die optimale Kombination freier Balisenpositionen ohne Raster. Auf dem Startraster mit
+    tech_steps werden die besten, voneinander entfernten Kombinationen bestimmt. Ausgehend von
+    jeder wird je freier Balisengruppe das Minimum im Intervall von ±tech_steps um die aktuelle
+    Position mit dem Verfahren nach Brent gesucht, bei drei Balisengruppen abwechselnd
+    (Koordinatensuche), bis sich keine Position mehr um mehr als die Toleranz ändert. Der
+    Fahrzeitverlust ist stückweise glatt in der Position, sodass wenige Trajektorien für eine
+    Genauigkeit im Zentimeterbereich genügen.
+
+    Args:
+        input: Klasse der Inputparameter
+        output: Klasse der Ergebnisse (delta_target, results, loss_curve)
+        ranges: kleinste und größte Position je freier Balisengruppe in m (absteigend)
+        evaluate: Funktion der Fahrzeitverlängerungen und Fahrzeiten für ein Feld von Positionen
+        weights: Funktion der Gewichtungsfaktoren je Abschnitt
+        running_time_start: Fahrzeit bis zur Aufwertung an der festen Balisengruppe in s
+        running_time_end: Fahrzeit bis zum Erreichen des EoA in s
+
+    Raises:
+        ValueError: keine zulässige Anordnung der Infill-Balisengruppen
+
+    Returns:
+        best_loss: minimaler gewichteter Fahrzeitverlust in s
+        best_points: Positionen der freien Balisengruppen vor dem EoA in m
+        statistics: Anzahl berechneter Trajektorien im Startraster und in der Verfeinerung
+    """
+
+    start = input.track_infill_1
+    steps = input.tech_steps
+    group_distance = input.track_balise_group_distance
+    context = (weights, start, running_time_start, running_time_end, output.delta_target,
+               group_distance)
+
+    # Startraster (ganzzahlige Positionen) vollständig berechnen
+    values = Evaluations(evaluate, start)
+    grids = []
+    for lower, upper in ranges:
+        grids.append(np.unique(np.append(np.arange(lower, upper + 1, steps), upper)))
+        values.require(grids[-1])
+    combinations = np.array(list(itertools.product(*grids))).reshape(-1, len(ranges))
+    loss = chain_loss(combinations, values, *context)[0]
+    finite = np.isfinite(loss)
+    if not np.any(finite):
+        raise ValueError("Keine zulässige Anordnung der Infill-Balisengruppen")
+    if len(ranges) == 2:
+        output.results[combinations[finite, 0]-1, combinations[finite, 1]-1] = loss[finite]
+    elif output.loss_curve is not None:
+        output.loss_curve[combinations[finite, 0]-1] = loss[finite]
+
+    # beste Kombinationen mit einem Abstand von mindestens zwei Rasterschritten als Startpunkte
+    starts = []
+    for index in np.argsort(loss, kind="stable"):
+        if not finite[index] or len(starts) == CONTINUOUS_STARTS:
+            break
+        if all(np.max(np.abs(combinations[index] - other)) >= 2 * steps for other in starts):
+            starts.append(combinations[index])
+
+    refined = 0
+
+    def point_loss(points: np.ndarray, delta: np.ndarray, running_time: np.ndarray) -> float:
+        return float(combination_loss(points[np.newaxis, :], delta[np.newaxis, :],
+                                      running_time[np.newaxis, :], *context)[0][0])
+
+    best_loss, best_points = np.inf, None
+    for points in starts:
+        delta, running_time = values.delta[points], values.running_time[points]
+        points = points.astype(float)
+        current = point_loss(points, delta, running_time)
+        for _ in range(CONTINUOUS_MAX_SWEEPS):
+            moved = 0.0
+            for level, (lower, upper) in enumerate(ranges):
+                # zulässiges Intervall bei festen übrigen Positionen
+                if level > 0:
+                    upper = min(upper, points[level-1] - group_distance)
+                if level < len(ranges) - 1:
+                    lower = max(lower, points[level+1] + group_distance)
+                lower = max(lower, points[level] - steps)
+                upper = min(upper, points[level] + steps)
+                if upper - lower <= CONTINUOUS_TOLERANCE:
+                    continue
+                # nur die Trajektorie der variierten Balisengruppe wird neu berechnet
+                trials = {}
+
+                def line(position: float) -> float:
+                    nonlocal refined
+                    refined += 1
+                    trial = [array.copy() for array in (points, delta, running_time)]
+                    trial[0][level] = position
+                    (trial[1][level],), (trial[2][level],) = evaluate(np.array([position]))
+                    trials[position] = trial
+                    return point_loss(*trial)
+
+                position, value = brent(line, lower, upper, CONTINUOUS_TOLERANCE)[:2]
+                if value < current:
+                    moved = max(moved, abs(position - points[level]))
+                    (points, delta, running_time), current = trials[position], value
+            if moved <= CONTINUOUS_TOLERANCE:
+                break
+        if current < best_loss:
+            best_loss, best_points = current, points
+
+    # Positionen auf die Toleranz ab- oder aufrunden, sodass die gerundete Kombination zulässig
+    # bleibt (Mindestabstand, Indication Point); ist keine gerundete Kombination bis auf
+    # CONTINUOUS_ROUNDING_TOLERANCE so gut, bleibt die ungerundete
+    decimals = max(0, -math.floor(math.log10(CONTINUOUS_TOLERANCE)))
+    scale = 10**decimals
+    candidates = np.array(list(itertools.product(*[
+        np.unique([np.floor(point * scale) / scale, np.ceil(point * scale) / scale])
+        for point in best_points])))
+    positions, inverse = np.unique(candidates, return_inverse=True)
+    delta, running_time = evaluate(positions)
+    refined += len(positions)
+    inverse = inverse.reshape(candidates.shape)
+    loss = combination_loss(candidates, delta[inverse], running_time[inverse], *context)[0]
+    index = np.argmin(loss)
+    if loss[index] <= best_loss + CONTINUOUS_ROUNDING_TOLERANCE * abs(best_loss):
+        best_loss, best_points = loss[index], candidates[index]
+    statistics = {
+        "evaluations": values.count + refined,
+        "grid": values.count,
+        "refined": refined,
+        "starts": len(starts)
+    }
+
+    return float(best_loss), [float(point) for point in best_points], statistics
@@ -0,0 +1,309 @@
+"""
+Version 1.00
+Build on Python 3.11.9 with (see requirements.txt)
+Contact: wink@via.rwth-aachen.de
+Change History:
+- 1.00, 2026-10-17 cw: Parameterstudie über Bereiche von track- und train-Parametern
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import json
+import logging
+import math
+import os
+import pandas as pd
+import tempfile
+import time
+
+import incremental
+import optimization_infill
+
+logging.basicConfig(
+        format="%(asctime)s.%(msecs)03d %(levelname)s {%(module)s} -> [%(funcName)s] %(message)s",
+        datefmt="%H:%M:%S",
+        level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Abschnitte der Parameter-JSON, deren Parameter variiert werden können
+SECTIONS = ["track", "train"]
+# Spalten der Ergebnistabelle nach den variierten Parametern und Positionen
+COLUMNS = ["additional_runtime", "wall_time", "error"]
+
+
+def parse_range(text: str) -> tuple[str, list]:
+    """
+    Liest den Bereich eines Parameters im Format "abschnitt.parameter=start:stop:schritt" (stop
+    inklusive) oder als Liste "abschnitt.parameter=wert,wert,...".
+
+    Args:
+        text: Bereich des Parameters, z.B. "train.processing_time=1:3:0.5"
+
+    Raises:
+        ValueError: Format ungültig
+        ValueError: Schrittweite nicht positiv
+
+    Returns:
+        name: Name des Parameters (abschnitt.parameter)
+        values: Werte des Parameters
+    """
+
+    name, _, values = text.partition("=")
+    section, _, key = name.strip().partition(".")
+    if section not in SECTIONS or not key or not values:
+        raise ValueError(f"Bereich '{text}' ungültig (Format abschnitt.parameter=start:stop:"
+                         f"schritt oder abschnitt.parameter=wert,wert, abschnitt in {SECTIONS})")
+    try:
+        if ":" in values:
+            start, stop, step = (float(value) for value in values.split(":"))
+            if step <= 0:
+                raise ValueError(f"Schrittweite von '{name}' nicht positiv")
+            count = math.floor((stop-start)/step + 1e-9) + 1
+            values = [round(start + index*step, 10) for index in range(max(count, 0))]
+            if all(value == int(value) for value in values):
+                values = [int(value) for value in values]
+        else:
+            values = [json.loads(value) for value in values.split(",")]
+    except json.JSONDecodeError as error:
+        raise ValueError(f"Werte von '{name}' ungültig") from error
+    if not values:
+        raise ValueError(f"Bereich von '{name}' leer")
+
+    return f"{section}.{key}", values
+
+
+def rank(name: str) -> int:
+    """
+    Rang eines Parameters nach dem ersten abhängigen Abschnitt der Trajektorie (siehe
+    incremental.STAGES). Parameter früher Abschnitte werden in der äußeren Schleife variiert,
+    sodass aufeinanderfolgende Punkte möglichst viele Abschnittsergebnisse teilen.
+
+    Args:
+        name: Name des Parameters (abschnitt.parameter)
+
+    Raises:
+        none
+
+    Returns:
+        rank: Rang (0 = Bremsen bis zur Infill-Balisengruppe)
+    """
+
+    for index, (parameters, *_) in enumerate(incremental.STAGES.values()):
+        if name in parameters:
+            return index
+
+    return len(incremental.STAGES)
+
+
+def grid(ranges: dict[str, list], workers: int) -> list[list[dict]]:
+    """
+    Bildet alle Punkte des Gitters und teilt sie in Gruppen, die nacheinander in einem Prozess
+    berechnet werden. Eine Gruppe enthält nur Punkte mit gleichen Parametern des Bremsens bis zur
+    Infill-Balisengruppe; große Gruppen werden geteilt, bis jeder Prozess eine Gruppe erhält.
+
+    Args:
+        ranges: Werte je Parameter
+        workers: Anzahl paralleler Prozesse
+
+    Raises:
+        none
+
+    Returns:
+        groups: Punkte (Wert je Parameter) je Gruppe
+    """
+
+    names = sorted(ranges, key=rank)
+    groups = {}
+    for values in itertools.product(*(ranges[name] for name in names)):
+        point = dict(zip(names, values))
+        outer = tuple(point[name] for name in names if rank(name) == 0)
+        groups.setdefault(outer, []).append(point)
+    pieces = max(1, math.ceil(workers / len(groups)))
+    chunks = []
+    for group in groups.values():
+        size = math.ceil(len(group) / pieces)
+        chunks.extend(group[start:start+size] for start in range(0, len(group), size))
+
+    return chunks
+
+
+def to_delta(point: dict) -> dict:
+    """
+    Wandelt die Werte eines Punkts in geänderte Parameter im Aufbau der Parameter-JSON.
+
+    Args:
+        point: Wert je Parameter (abschnitt.parameter)
+
+    Raises:
+        none
+
+    Returns:
+        delta: geänderte Parameter
+    """
+
+    delta = {}
+    for name, value in point.items():
+        section, key = name.split(".", 1)
+        delta.setdefault(section, {})[key] = value
+
+    return delta
+
+
+def run_points(data: dict, points: list[dict]) -> list[dict]:
+    """
+    Berechnet die Punkte einer Gruppe in einem Prozess des Prozesspools. Jeder Punkt wird mit
+    Scenario.reoptimize() aus dem vorherigen berechnet, sodass Abschnittsergebnisse, die nicht
+    von den geänderten Parametern abhängen, wiederverwendet werden. Die Ausgaben der einzelnen
+    Optimierungen werden in einen temporären Ordner geschrieben.
+
+    Args:
+        data: Inhalt der Parameter-JSON (ohne Plots)
+        points: Wert je Parameter je Punkt
+
+    Raises:
+        none
+
+    Returns:
+        rows: Zeilen der Ergebnistabelle
+    """
+
+    logging.getLogger(optimization_infill.__name__).setLevel(logging.WARNING)
+    rows = []
+    previous = None
+    with tempfile.TemporaryDirectory() as directory:
+        for point in points:
+            tic = time.perf_counter()
+            row = dict(point)
+            try:
+                if previous is None:
+                    scenario = optimization_infill.Scenario(
+                        incremental.apply_delta(data, to_delta(point)), directory)
+                    scenario.run()
+                else:
+                    scenario = previous.reoptimize(to_delta(point))
+                result = scenario.result
+                for number, position in enumerate(result.infill_positions, 1):
+                    row[f"infill_{number}"] = position
+                row["additional_runtime"] = round(result.min_loss_time, 2)
+                if result.results is not None:
+                    result.results.close()
+                previous = scenario
+            except Exception as error:
+                row["error"] = f"{type(error).__name__}: {error}"
+            row["wall_time"] = round(time.perf_counter() - tic, 3)
+            rows.append(row)
+
+    return rows
+
+
+def run_sweep(data: dict, ranges: dict[str, list], output: str, workers: int = 1,
+              heatmap: bool = False) -> pd.DataFrame:
+    """
+    Berechnet die optimalen Positionen und den Fahrzeitverlust über alle Kombinationen der
+    Parameterbereiche im Prozesspool und schreibt eine Ergebnistabelle (eine Zeile je Punkt) als
+    CSV oder Parquet. Bei genau zwei variierten Parametern werden auf Wunsch Heatmaps des
+    Fahrzeitverlusts und der Positionen erstellt.
+
+    Args:
+        data: Inhalt der Parameter-JSON
+        ranges: Werte je Parameter (abschnitt.parameter)
+        output: Datei der Ergebnistabelle (.csv oder .parquet)
+        workers: Anzahl paralleler Prozesse
+        heatmap: Heatmaps erstellen
+
+    Raises:
+        ValueError: Anzahl Prozesse kleiner als 1
+        ValueError: Dateiendung der Ergebnistabelle nicht unterstützt
+        ValueError: Parameter nicht in der Parameter-JSON
+
+    Returns:
+        table: Ergebnistabelle
+    """
+
+    if workers < 1:
+        raise ValueError("Anzahl Prozesse kleiner als 1")
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in [".csv", ".parquet"]:
+        raise ValueError(f"Dateiendung '{extension}' der Ergebnistabelle nicht unterstützt")
+    for name in ranges:
+        section, key = name.split(".", 1)
+        if key not in data.get(section, {}):
+            raise ValueError(f"Parameter '{name}' nicht in den Parametern enthalten")
+    data = incremental.apply_delta(data, {"tech": {"plot_trajectories": False,
+                                                   "plot_3d": False}})
+    groups = grid(ranges, workers)
+    logger.info(f"{sum(len(group) for group in groups)} Punkte in {len(groups)} Gruppen mit "
+                f"{workers} Prozessen")
+
+    tic = time.perf_counter()
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for group in executor.map(run_points, itertools.repeat(data), groups):
+            rows.extend(group)
+    logger.info(f"Dauer: {time.perf_counter() - tic:0.2f} Sekunden")
+    for row in rows:
+        if row.get("error"):
+            point = ", ".join(f"{name}={row[name]}" for name in ranges)
+            logger.error(f"Punkt {point}: {row['error']}")
+
+    positions = sorted({column for row in rows for column in row if column.startswith("infill_")},
+                       key=lambda column: int(column.split("_")[1]))
+    table = pd.DataFrame(rows, columns=[*ranges, *positions, *COLUMNS])
+    table = table.sort_values(list(ranges), kind="stable", ignore_index=True)
+    table = table.astype({column: "Int64" for column in positions})
+    output = os.path.abspath(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    if extension == ".csv":
+        table.to_csv(output, index=False)
+    else:
+        table.to_parquet(output, index=False)
+    logger.info(f"Ergebnistabelle: {output}")
+
+    if heatmap:
+        if len(ranges) != 2:
+            logger.warning("Heatmaps nur bei genau zwei variierten Parametern")
+        else:
+            import plots
+            path = f"{os.path.splitext(output)[0]}_heatmap.{plots.FILETYPE}"
+            plots.plot_sweep(table, *ranges, ["additional_runtime", *positions[1:]], path)
+            logger.info(f"Heatmaps: {path}")
+
+    return table
+
+
+def main() -> None:
+    """
+    Einstiegspunkt der Parameterstudie über die Kommandozeile.
+
+    Args:
+        none
+
+    Raises:
+        none
+
+    Returns:
+        none
+    """
+
+    parser = argparse.ArgumentParser(description="Parameterstudie der Infill-Balisengruppen")
+    parser.add_argument("parameters", nargs="?", default="parameters.json",
+                        help="Parameter-JSON des Basisszenarios")
+    parser.add_argument("-p", "--parameter", action="append", required=True,
+                        help="Bereich eines Parameters, z.B. train.processing_time=1:3:0.5 oder "
+                             "train.indication_point=1500,1600 (mehrfach angeben)")
+    parser.add_argument("-o", "--output", default="output/sweep/results.csv",
+                        help="Ergebnistabelle (.csv oder .parquet)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Anzahl paralleler Prozesse")
+    parser.add_argument("--heatmap", action="store_true",
+                        help="Heatmaps bei zwei variierten Parametern erstellen")
+    args = parser.parse_args()
+    with open(args.parameters) as infile:
+        data = json.load(infile)
+    ranges = dict(parse_range(text) for text in args.parameter)
+    run_sweep(data, ranges, args.output, args.workers, args.heatmap)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Tests der inkrementellen Optimierung (Signaturen der Abschnittstabellen).
+"""
+
+import json
+import os
+
+import pytest
+
+import incremental
+import optimization_infill
+
+PARAMETERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "parameters.json")
+
+
+def scenario_data(**track) -> dict:
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"].update(balises=2, balise_positions=[1700, 0], **track)
+    data["tech"].update(plot_trajectories=False, plot_3d=False)
+    return data
+
+
+def test_line_speed_below_release_speed_rejected(tmp_path):
+    data = scenario_data(line_speed={"steps": [0, 1800], "values": [160, 10]})
+    with pytest.raises(ValueError):
+        optimization_infill.Scenario(data, str(tmp_path)).run()
+
+
+def test_signatures_follow_derived_train_speed():
+    # geringere Streckengeschwindigkeit ändert die maßgebende Geschwindigkeit und damit alle
+    # Abschnitte, geänderte processing_time nur Verarbeitung und Beschleunigen
+    base = optimization_infill.Scenario(scenario_data())
+    slower = optimization_infill.Scenario(scenario_data(line_speed=120))
+    data = scenario_data()
+    data["train"]["processing_time"] = 3.0
+    later = optimization_infill.Scenario(data)
+    assert all(base.stages.signatures[name] != slower.stages.signatures[name]
+               for name in incremental.STAGES)
+    assert base.stages.signatures["decel"] == later.stages.signatures["decel"]
+    assert base.stages.signatures["process"] != later.stages.signatures["process"]
+
+
+@pytest.mark.parametrize("delta", [
+    {"track": {"balise_positions": [2000, 0]}},
+    {"track": {"line_speed": 120}},
+    {"track": {"line_speed": {"steps": [0, 1200], "values": [160, 100]}}},
+    {"track": {"gradient": {"steps": [0, 900], "values": [0, 4]}}},
+    {"train": {"processing_time": 3.0}},
+])
+def test_reoptimize_matches_fresh_run(tmp_path, delta):
+    scenario = optimization_infill.Scenario(scenario_data(), str(tmp_path))
+    scenario.run()
+    reoptimized = scenario.reoptimize(delta).result
+    fresh = optimization_infill.Scenario(
+        incremental.apply_delta(scenario.input.input_data, delta), str(tmp_path)).run()
+    assert reoptimized.infill_positions == fresh.infill_positions
+    assert reoptimized.min_loss_time == pytest.approx(fresh.min_loss_time)
@@ -0,0 +1,152 @@
+"""
+Tests der Suchverfahren der Optimierung auf einem verkürzten Abschnitt (60 km/h, IP 450 m).
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import optimization_infill
+import results_store
+
+PARAMETERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "parameters.json")
+
+
+def scenario_data(balises: int = 3, **tech) -> dict:
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"].update(line_speed=60, balises=balises, balise_positions=[400] + [0]*(balises-1))
+    data["train"].update(speed=60, indication_point=450)
+    data["tech"].update(plot_trajectories=False, plot_3d=False, **tech)
+    return data
+
+
+@pytest.mark.parametrize("engine", ["VECTOR", "LOOP"])
+@pytest.mark.parametrize("steps", [1, 10])
+def test_pruning_matches_exhaustive_search(tmp_path, engine, steps):
+    exhaustive = optimization_infill.Scenario(
+        scenario_data(engine=engine, steps=steps, prune=False), str(tmp_path)).run()
+    pruned = optimization_infill.Scenario(
+        scenario_data(engine=engine, steps=steps, prune=True), str(tmp_path)).run()
+    assert pruned.infill_positions == exhaustive.infill_positions
+    assert pruned.min_loss_time == pytest.approx(exhaustive.min_loss_time, rel=1e-12)
+    assert pruned.pruning["pruned"] < pruned.pruning["combinations"]
+    # bei der vollständigen Suche mit 1 m muss das Pruning auch greifen
+    if steps == 1:
+        assert pruned.pruning["pruned"] > 0
+
+
+def test_pruning_matches_exhaustive_search_default_parameters(tmp_path):
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["tech"].update(plot_trajectories=False, plot_3d=False)
+    exhaustive = optimization_infill.Scenario(data, str(tmp_path)).run()
+    data["tech"]["prune"] = True
+    pruned = optimization_infill.Scenario(data, str(tmp_path)).run()
+    assert exhaustive.infill_positions == pruned.infill_positions == [1759, 705, 243]
+    assert pruned.min_loss_time == pytest.approx(exhaustive.min_loss_time, rel=1e-12)
+    assert round(pruned.min_loss_time, 2) == 52.01
+
+
+def brute_force(scenario: optimization_infill.Scenario, balises: int) -> tuple[float, list[int]]:
+    # alle Anordnungen der freien Balisengruppen mit Mindestabstand je Position der ersten freien
+    # Balisengruppe, bei Gleichstand wie optimize_chain() die größeren Positionen
+    input, result = scenario.input, scenario.result
+    group_distance = input.track_balise_group_distance
+    s_target, t_total_infill_1 = optimization_infill.reference_trajectories(scenario)
+    limit = min(input.train_indication_point, input.track_infill_1) - group_distance
+    positions = np.arange(1, limit)
+    t_total, running_time = optimization_infill.infill_in_advance_of_IP_batch(
+        scenario, positions, s_target)[::3]
+    delta = np.concatenate([[result.delta_target], t_total - t_total_infill_1])
+    running = np.concatenate([[scenario.running_time_intervals[-1]], running_time])
+    rest = np.array(np.meshgrid(*[positions]*(balises-2), indexing="ij")).reshape(balises-2, -1).T
+    best_loss, best_points = np.inf, None
+    for first in range(1 + group_distance, limit):
+        points = np.column_stack([np.full(len(rest), first), rest])
+        points = points[np.all(np.diff(points, axis=1) <= -group_distance, axis=1)]
+        if len(points) == 0:
+            continue
+        distances = np.column_stack([np.full(len(points), input.track_infill_1), points,
+                                     np.zeros(len(points), dtype=int)])
+        running_times = np.column_stack([np.full(len(points), scenario.running_time_intervals[1]),
+                                         running[points], np.full(len(points), running[0])])
+        weighted, total = 0, 0
+        for section in range(balises):
+            factor = optimization_infill.chain_weights(
+                scenario, distances[:, section], distances[:, section+1],
+                running_times[:, section], running_times[:, section+1])
+            weighted = weighted + factor * delta[distances[:, section+1]]
+            total = total + factor
+        loss = weighted / total
+        candidates = np.flatnonzero(loss == np.min(loss))
+        index = candidates[np.lexsort(points[candidates].T[::-1])[-1]]
+        if loss[index] <= best_loss:
+            best_loss, best_points = float(loss[index]), points[index].tolist()
+    return best_loss, [input.track_infill_1, *best_points]
+
+
+@pytest.mark.parametrize("weighting", ["TIME", "DISTANCE", "EQUAL"])
+@pytest.mark.parametrize("balises", [2, 3])
+def test_chain_matches_sweep(tmp_path, weighting, balises):
+    # ein Durchlauf über alle Positionen mit 1 m
+    sweep = optimization_infill.Scenario(scenario_data(balises, weighting=weighting),
+                                         str(tmp_path))
+    sweep.result.results = results_store.ResultsStore(sweep.input.track_infill_1)
+    optimization_infill.optimize(sweep, balises, steps=1, fixed_1=0, fixed_2=0, envelope=0)
+    chain = optimization_infill.Scenario(scenario_data(balises, weighting=weighting),
+                                         str(tmp_path))
+    optimization_infill.optimize_chain(chain, balises, steps=1)
+    positions = [sweep.input.track_infill_1, sweep.result.infill_distance_1,
+                 sweep.result.infill_distance_2][:balises]
+    assert chain.result.infill_positions == positions
+    assert chain.result.min_loss_time == pytest.approx(sweep.result.min_loss_time, rel=1e-12)
+
+
+@pytest.mark.parametrize("weighting", ["TIME", "DISTANCE", "EQUAL"])
+def test_chain_matches_brute_force(tmp_path, weighting):
+    chain = optimization_infill.Scenario(scenario_data(4, weighting=weighting),
+                                         str(tmp_path)).run()
+    loss, positions = brute_force(
+        optimization_infill.Scenario(scenario_data(4, weighting=weighting), str(tmp_path)), 4)
+    assert chain.infill_positions == positions
+    assert chain.min_loss_time == pytest.approx(loss, rel=1e-12)
+
+
+LINE_SPEED = {"steps": [0, 600, 1200], "values": [100, 160, 120]}
+
+
+@pytest.mark.parametrize("gradient", [0, {"steps": [0, 500, 1500], "values": [5, -10, 2]}])
+def test_line_speed_profile_batch_matches_scalar(gradient):
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"].update(line_speed=LINE_SPEED, gradient=gradient)
+    data["tech"].update(plot_trajectories=False, plot_3d=False)
+    scenario = optimization_infill.Scenario(data)
+    input = scenario.input
+    s_target, _ = optimization_infill.reference_trajectories(scenario)
+    positions = np.arange(1, min(input.train_indication_point, input.track_infill_1))
+    t_total = optimization_infill.infill_in_advance_of_IP_batch(scenario, positions, s_target)[0]
+    scalar = [optimization_infill.infill_in_advance_of_IP(scenario, int(position), s_target, 1)[1]
+              for position in positions[::50]]
+    np.testing.assert_allclose(scalar, t_total[::50], rtol=1e-12)
+    # spätere Aufwertung verlängert die Fahrzeit
+    assert np.all(np.diff(t_total) <= 1e-9)
+
+
+@pytest.mark.parametrize("line_speed, positions, loss", [
+    ({"steps": [0, 1200], "values": [160, 160]}, [1759, 705, 243], 52.01),
+    (LINE_SPEED, [1759, 945, 664], 98.19),
+])
+def test_line_speed_profile_default_parameters(tmp_path, line_speed, positions, loss):
+    # gleiche Werte im Profil entsprechen der konstanten Streckengeschwindigkeit
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"]["line_speed"] = line_speed
+    data["tech"].update(plot_trajectories=False, plot_3d=False)
+    result = optimization_infill.Scenario(data, str(tmp_path)).run()
+    assert result.infill_positions == positions
+    assert round(result.min_loss_time, 2) == loss
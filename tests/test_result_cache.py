@@ -0,0 +1,44 @@
+"""
+Tests des Zwischenspeichers der Ergebnisse auf der Festplatte.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import optimization_infill
+
+PARAMETERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "parameters.json")
+
+
+def scenario_data(cache: str, balises: int, **tech) -> dict:
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"].update(balises=balises, balise_positions=[1759] + [0]*(balises-1))
+    data["tech"].update(plot_trajectories=False, plot_3d=False, cache=cache, **tech)
+    return data
+
+
+@pytest.mark.parametrize("engine", ["VECTOR", "LOOP"])
+def test_loss_curve_restored(tmp_path, engine):
+    data = scenario_data(str(tmp_path / "cache"), 2, engine=engine)
+    computed = optimization_infill.Scenario(data, str(tmp_path)).run()
+    cached = optimization_infill.Scenario(data, str(tmp_path)).run()
+    curve = computed.loss_curve
+    assert np.nanmin(curve) == pytest.approx(computed.min_loss_time)
+    assert curve[computed.infill_distance_1-1] == pytest.approx(computed.min_loss_time)
+    np.testing.assert_array_equal(cached.loss_curve, curve)
+    assert cached.infill_positions == computed.infill_positions
+
+
+@pytest.mark.parametrize("balises", [2, 3])
+def test_anytime_statistics_restored(tmp_path, balises):
+    data = scenario_data(str(tmp_path / "cache"), balises, search="ANYTIME", time_budget=60)
+    computed = optimization_infill.Scenario(data, str(tmp_path)).run()
+    cached = optimization_infill.Scenario(data, str(tmp_path)).run()
+    assert computed.anytime["complete"]
+    assert cached.anytime == computed.anytime
+    assert cached.infill_positions == computed.infill_positions
@@ -0,0 +1,127 @@
+"""
+Tests der adaptiven Suche und ihrer unteren Schranken auf einem verkürzten Abschnitt.
+"""
+
+import functools
+import json
+import os
+
+import numpy as np
+import pytest
+
+import optimization_infill
+import results_store
+import search
+
+PARAMETERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "parameters.json")
+
+
+def scenario_data(balises: int = 3, **tech) -> dict:
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"].update(line_speed=60, balises=balises, balise_positions=[400] + [0]*(balises-1))
+    data["train"].update(speed=60, indication_point=450)
+    data["tech"].update(plot_trajectories=False, plot_3d=False, **tech)
+    return data
+
+
+@pytest.mark.parametrize("weighting", ["TIME", "DISTANCE", "EQUAL"])
+@pytest.mark.parametrize("balises", [2, 3])
+def test_adaptive_matches_full_search(tmp_path, weighting, balises):
+    # ein Durchlauf über alle Positionen mit 1 m (sweep_surface bei drei Balisengruppen)
+    full = optimization_infill.Scenario(scenario_data(balises, weighting=weighting),
+                                        str(tmp_path))
+    full.result.results = results_store.ResultsStore(full.input.track_infill_1)
+    optimization_infill.optimize(full, balises, steps=1, fixed_1=0, fixed_2=0, envelope=0)
+    adaptive = optimization_infill.Scenario(
+        scenario_data(balises, weighting=weighting, search="ADAPTIVE"), str(tmp_path)).run()
+    assert adaptive.infill_positions == full.result.infill_positions
+    assert adaptive.min_loss_time == pytest.approx(full.result.min_loss_time, rel=1e-12)
+
+
+@pytest.mark.parametrize("weighting", ["TIME", "DISTANCE", "EQUAL"])
+def test_lower_bounds_below_cell_minimum(weighting):
+    scenario = optimization_infill.Scenario(scenario_data(weighting=weighting))
+    input = scenario.input
+    s_target, t_total_infill_1 = optimization_infill.reference_trajectories(scenario)
+    ranges, evaluate = optimization_infill.search_problem(scenario, 3, s_target,
+                                                          t_total_infill_1)
+    values = search.Evaluations(evaluate, input.track_infill_1)
+    positions = np.arange(1, ranges[0][1] + 1)
+    values.require(positions)
+    # Schranken setzen monotone Fahrzeitverlängerungen und Fahrzeiten voraus
+    assert np.all(np.diff(values.delta[positions]) <= 0)
+    assert np.all(np.diff(values.running_time[positions]) <= 0)
+
+    weights = functools.partial(optimization_infill.chain_weights, scenario)
+    context = (weights, input.track_infill_1, scenario.running_time_intervals[1],
+               scenario.running_time_intervals[-1], scenario.result.delta_target)
+    generator = np.random.default_rng(1)
+    for _ in range(200):
+        corners = [np.sort(generator.integers(low, high + 1, size=2)) for low, high in ranges]
+        lower = np.array([[corner[0] for corner in corners]])
+        upper = np.array([[corner[1] for corner in corners]])
+        bound = search.lower_bounds(lower, upper, values, *context)[0]
+        assert np.isfinite(bound)
+        points = np.array(np.meshgrid(*[np.arange(low, high + 1) for low, high in
+                                        zip(lower[0], upper[0])], indexing="ij")
+                          ).reshape(2, -1).T
+        loss, total = search.chain_loss(points, values, *context,
+                                        input.track_balise_group_distance)
+        feasible = np.isfinite(loss)
+        if np.any(feasible):
+            weighted = loss[feasible] * total[feasible]
+            assert bound <= np.min(weighted) + 1e-9 * abs(np.min(weighted))
+
+
+def test_adaptive_matches_full_search_default_parameters(tmp_path):
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["tech"].update(plot_trajectories=False, plot_3d=False, search="ADAPTIVE")
+    adaptive = optimization_infill.Scenario(data, str(tmp_path)).run()
+    assert adaptive.infill_positions == [1759, 705, 243]
+    assert round(adaptive.min_loss_time, 2) == 52.01
+
+
+@pytest.mark.parametrize("weighting", ["TIME", "DISTANCE", "EQUAL"])
+@pytest.mark.parametrize("balises", [2, 3])
+def test_continuous_not_worse_than_grid(tmp_path, weighting, balises):
+    # gerundete Positionen bleiben zulässig und höchstens so schlecht wie das Optimum mit 1 m
+    grid = optimization_infill.Scenario(
+        scenario_data(balises, weighting=weighting, search="ADAPTIVE"), str(tmp_path)).run()
+    scenario = optimization_infill.Scenario(
+        scenario_data(balises, weighting=weighting, search="CONTINUOUS"), str(tmp_path))
+    continuous = scenario.run()
+    assert np.isfinite(continuous.min_loss_time)
+    assert continuous.min_loss_time <= grid.min_loss_time * (1 + 1e-9)
+    positions = continuous.infill_positions
+    assert all(first - second >= scenario.input.track_balise_group_distance
+               for first, second in zip(positions, positions[1:]))
+
+
+def test_anytime_stops_at_deadline(tmp_path):
+    with open(PARAMETERS) as infile:
+        data = json.load(infile)
+    data["track"]["balise_positions"] = [7300, 0, 0]
+    data["train"]["indication_point"] = 7200
+    data["tech"].update(plot_trajectories=False, plot_3d=False, search="ANYTIME",
+                        time_budget=0.05)
+    result = optimization_infill.Scenario(data, str(tmp_path)).run()
+    assert not result.anytime["complete"]
+    assert result.anytime["coverage"] < 1
+    # Überschreitung nur durch den letzten Teil der Trajektorien und das Ergebnis
+    assert result.anytime["overshoot"] < 0.1
+    assert np.isfinite(result.min_loss_time)
+
+
+@pytest.mark.parametrize("balises", [2, 3])
+def test_anytime_complete_matches_adaptive(tmp_path, balises):
+    anytime = optimization_infill.Scenario(
+        scenario_data(balises, search="ANYTIME", time_budget=60), str(tmp_path)).run()
+    adaptive = optimization_infill.Scenario(
+        scenario_data(balises, search="ADAPTIVE"), str(tmp_path)).run()
+    assert anytime.anytime["complete"] and anytime.anytime["gap"] == 0
+    assert anytime.anytime["overshoot"] == 0
+    assert anytime.infill_positions == adaptive.infill_positions
+    assert anytime.min_loss_time == pytest.approx(adaptive.min_loss_time, rel=1e-12)
@@ -1,8 +1,9 @@
 """
-Version 1.02
+Version 1.03
 Build on Python 3.11.9 with (see requirements.txt)
 Contact: wink@via.rwth-aachen.de
 Change History:
+- 1.03, 2026-10-17 cw: Adaptive Abtastung der Trajektorien mit fester Toleranz
 - 1.02, 2024-04-08 cw: PEP 8 Konformität
 - 1.01, 2023-07-26 cw: Behandlung bei leerem Inputparameter
 - 1.00, 2023-07-12 cw: Initialer Stand mit Dokumentation und Versionierung
@@ -63,3 +64,118 @@ def clean(points_distance: np.ndarray, points_speed: np.ndarray, points_accel: n
     data[-1, 1] = np.max(points_speed)
 
     return data
+
+
+def speed_at(distance: np.ndarray, distance_start: float, speed_start: float,
+             accel: float) -> np.ndarray:
+    """
+    Berechnet die Geschwindigkeit bei konstanter Beschleunigung über den Weg.
+
+    Args:
+        distance: Distanzen in m
+        distance_start: Distanz am Beginn des Abschnitts in m
+        speed_start: Geschwindigkeit am Beginn des Abschnitts in km/h
+        accel: Beschleunigung im Abschnitt in m/s^2
+
+    Raises:
+        none
+
+    Returns:
+        speed: Geschwindigkeiten in km/h
+    """
+
+    return constants.CONVERT_MPS_KPH*np.sqrt(np.maximum(
+        (speed_start*constants.CONVERT_KPH_MPS)**2 + 2*accel*(distance - distance_start), 0))
+
+
+def sample_segment(distance_start: float, distance_end: float, speed_start: float, accel: float,
+                   tolerance: float) -> np.ndarray:
+    """
+    Tastet einen Abschnitt konstanter Beschleunigung adaptiv ab. Intervalle werden so lange
+    halbiert, bis die Sehne zwischen zwei Stützstellen um höchstens tolerance von der Kurve
+    abweicht. Die größte Abweichung liegt dort, wo die Steigung der Kurve der Steigung der Sehne
+    entspricht (v * dv/ds = a), und wird exakt berechnet.
+
+    Args:
+        distance_start: Distanz am Beginn des Abschnitts in m
+        distance_end: Distanz am Ende des Abschnitts in m
+        speed_start: Geschwindigkeit am Beginn des Abschnitts in km/h
+        accel: Beschleunigung im Abschnitt in m/s^2
+        tolerance: maximale Abweichung in km/h
+
+    Raises:
+        none
+
+    Returns:
+        distances: Stützstellen in m einschließlich Beginn und Ende des Abschnitts
+    """
+
+    distances = np.array([distance_start, distance_end], dtype=float)
+    while True:
+        left, right = distances[:-1], distances[1:]
+        speed_left = speed_at(left, distance_start, speed_start, accel)
+        speed_right = speed_at(right, distance_start, speed_start, accel)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (speed_right - speed_left) / (right - left)
+            # Berührpunkt der zur Sehne parallelen Tangente
+            speed_touch = constants.CONVERT_MPS_KPH**2 * accel / slope
+            distance_touch = distance_start + ((speed_touch*constants.CONVERT_KPH_MPS)**2 - (
+                speed_start*constants.CONVERT_KPH_MPS)**2) / (2*accel)
+        distance_touch = np.clip(np.where(np.isnan(distance_touch), left, distance_touch), left,
+                                 right)
+        error = np.abs(speed_at(distance_touch, distance_start, speed_start, accel)
+                       - speed_left - slope*(distance_touch - left))
+        split = (error > tolerance) & (right - left > 1/constants.SCALE)
+        if not np.any(split):
+            return distances
+        distances = np.sort(np.append(distances, (left[split] + right[split]) / 2))
+
+
+def render(points_distance: np.ndarray, points_speed: np.ndarray, points_accel: np.ndarray,
+           plot_distance: float, tolerance: float = constants.RENDER_TOLERANCE) -> np.ndarray:
+    """
+    Erzeugt eine Liste von Punkten für ein Geschwindigkeits-Weg-Diagramm wie clean(), tastet
+    die Abschnitte aber adaptiv statt im Zentimeterraster ab. Abschnitte gleichbleibender
+    Geschwindigkeit bestehen nur aus ihren Endpunkten.
+
+    Args:
+        points_distance: markante Punkte - Distanzen in m
+        points_speed: markante Punkte - Geschwindigkeiten in km/h
+        points_accel: markante Punkte - Beschleunigungen in m/s^2
+        plot_distance: gesamte zu plottende Strecke in m
+        tolerance: maximale Abweichung von der exakten Trajektorie in km/h
+
+    Raises:
+        KeyError: Anzahl Elemente für Distanzen und Geschwindigkeiten nicht konsistent
+        KeyError: Anzahl Elemente für Beschleunigungen und Geschwindigkeiten nicht konsistent
+
+    Returns:
+        data: Liste von Geschwindigkeiten in km/h über die Wegstrecke in cm
+    """
+
+    if len(points_distance) * len(points_speed) * len(points_accel) == 0:
+        return np.nan
+    # Checks
+    if len(points_distance) != len(points_speed):
+        raise KeyError("ungleiche Anzahl Elemente für Distanz und Geschwindigkeit")
+    if len(points_distance)-1 != len(points_accel):
+        raise KeyError("unpassende Anzahl Elemente für Beschleunigung")
+    # Abschnitte abtasten
+    distances = []
+    speeds = []
+    for change in range(0, len(points_speed)-1):
+        if points_speed[change+1] == points_speed[change] or points_accel[change] == 0:
+            distance = np.array([points_distance[change], points_distance[change+1]])
+            speed = np.array([points_speed[change]]*2)
+        else:  # bremsen oder beschleunigen
+            distance = sample_segment(points_distance[change], points_distance[change+1],
+                                      points_speed[change], points_accel[change], tolerance)
+            speed = speed_at(distance, points_distance[change], points_speed[change],
+                             points_accel[change])
+        distances.append(distance)
+        speeds.append(speed)
+    # Endpunkt bestimmen
+    distances.append([plot_distance])
+    speeds.append([np.max(points_speed)])
+
+    return np.column_stack([np.concatenate(distances)*constants.SCALE, np.concatenate(speeds)])